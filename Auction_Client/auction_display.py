@@ -1,51 +1,39 @@
-from Blockchain import blockchain_client
-from .auction_utils import fetch_remote_auction_leader
-
-
-def display_auction_header(auction_id, wallet_address, pseudonym_id):
+def display_auction_header(auction_id, snapshot):
     """
     Prints auction header information.
 
-    - Reads current auction info (highest bid, close_date, etc.) from the blockchain.
-    - Uses blockchain time (latest block timestamp) to compute remaining time.
-    - Reads current leader pseudonym from the Peer_Server (via fetch_remote_auction_leader).
+    - `snapshot` is the room state kept by AuctionRoomWatcher (auction info read
+      from the blockchain, latest block timestamp, balance, leader pseudonym).
+    - Remaining time is computed using ONLY the blockchain timestamp.
     """
 
     try:
-
-        all_auctions = blockchain_client.get_all_auctions()
-        target_auction = next(
-            (a for a in all_auctions if str(a["id"]) == str(auction_id)),
-            None,
-        )
-
-        if not target_auction or not target_auction.get("active"):
+        if not snapshot or not snapshot.get("active"):
             print(" [INFO] Auction ended or does not exist.")
             return False
 
         # Compute time left using ONLY blockchain timestamp
-        now_ts = blockchain_client.get_current_blockchain_timestamp()
-        time_left = target_auction["close_date"] - now_ts
-        time_str = f"{int(time_left / 60)} min" if time_left > 0 else "ENDED"
-
-        # Wallet balance
-        balance = blockchain_client.get_internal_balance(wallet_address)
+        now_ts = snapshot.get("now_ts")
+        if now_ts is None:
+            time_str = "(unknown)"
+        else:
+            time_left = snapshot["close_date"] - now_ts
+            time_str = f"{int(time_left / 60)} min" if time_left > 0 else "ENDED"
 
-        # Fetch leader pseudonym from tracker
-        leader_pseudonym = fetch_remote_auction_leader(str(auction_id))
-        if not leader_pseudonym:
-            leader_pseudonym = "(unknown)"
+        leader_pseudonym = snapshot.get("leader") or "(unknown)"
 
         print("\n" + "=" * 60)
         print(f"         LIVE AUCTION ROOM #{auction_id}          ")
         print("=" * 60)
-        print(f" ITEM:        {target_auction.get('description', 'N/A')}")
-        print(f" CURRENT BID: {target_auction.get('highest_bid', 0)} ETH")
+        print(f" ITEM:        {snapshot.get('description', 'N/A')}")
+        print(f" CURRENT BID: {snapshot.get('highest_bid', 0)} ETH")
         print(f" HIGH BID:    {leader_pseudonym}")
         print(f" TIME LEFT:   {time_str}")
-        print(f" BALANCE:     {balance} ETH")
+        print(f" BALANCE:     {snapshot.get('balance', 0)} ETH")
+        if snapshot.get("pending_txs"):
+            print(f" PENDING:     {snapshot['pending_txs']} transaction(s) confirming")
         print("-" * 60)
-        print(" Auto-refresh enabled | Type bid amount or 'EXIT' to leave")
+        print(" Live updates enabled | Type bid amount or 'EXIT' to leave")
         print("-" * 60)
 
         return True
@@ -1,15 +1,23 @@
 import time
 import sys
 import select
-from .auction_utils import NEEDS_REFRESH
+from .auction_utils import REFRESH_EVENT
 
 
-def input_with_timeout(prompt, timeout=5.0):
+def input_with_timeout(prompt, timeout=5.0, wake_event=REFRESH_EVENT):
+    """
+    Reads a line from stdin.
+    Returns None if `timeout` seconds pass (timeout=None waits forever) or
+    if `wake_event` is set while waiting, so the caller can redraw.
+    """
     print(prompt, end='', flush=True)
+    start_time = time.time()
+
+    def expired():
+        return timeout is not None and time.time() - start_time > timeout
 
     if sys.platform == "win32":
         import msvcrt
-        start_time = time.time()
         user_input = ""
 
         while True:
@@ -25,19 +33,25 @@ def input_with_timeout(prompt, timeout=5.0):
                 else:
                     user_input += char
 
-            global NEEDS_REFRESH
-            if NEEDS_REFRESH:
+            if wake_event is not None and wake_event.is_set():
                 print()
                 return None
 
-            if time.time() - start_time > timeout:
+            if expired():
                 print()
                 return None
 
             time.sleep(0.1)
 
     else:
-        ready, _, _ = select.select([sys.stdin], [], [], timeout)
-        if ready:
-            return sys.stdin.readline().strip()
-        return None
+        while True:
+            ready, _, _ = select.select([sys.stdin], [], [], 0.2)
+            if ready:
+                return sys.stdin.readline().strip()
+
+            if wake_event is not None and wake_event.is_set():
+                print()
+                return None
+
+            if expired():
+                return None
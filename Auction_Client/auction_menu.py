@@ -1,27 +1,17 @@
 
-import base64
-import json
-from datetime import datetime, timezone
+from datetime import datetime
+from functools import partial
 from pathlib import Path
 
 from Blockchain import blockchain_client
+from Blockchain.auction_indexer import AuctionIndexer, DEFAULT_INDEX_PATH
+from Login_Client.identity.keyring import wipe_session
 from Login_Client.identity.wallet_manager import load_wallet
 from cryptography.hazmat.primitives import serialization
-from cryptography.x509 import load_pem_x509_certificate
 
 from .auction_room import enter_auction_room
-from .auction_utils import (
-    encrypt_data,
-    decrypt_data,
-    save_pseudonym_cache,
-    load_pseudonym_cache,
-    PSEUDONYM_CACHE,
-)
-from .pseudonyms import (
-    generate_pseudonym,
-    generate_pseudonym_keypair,
-    build_pseudonym_token,
-)
+from .pseudonym_pool import get_pool, stop_pools, token_needs_refresh
+from .pseudonym_vault import open_vault, close_vaults, store_entry
 
 
 def global_notification_handler(event_data=None):
@@ -51,6 +41,19 @@ def global_notification_handler(event_data=None):
 def auction_menu(user_folder: Path, username: str, p2p_client):
     """Main auction menu loop."""
 
+    # Local event index: listings and room refreshes only process new blocks
+    if blockchain_client.auction_index is None:
+        try:
+            blockchain_client.attach_index(AuctionIndexer(DEFAULT_INDEX_PATH))
+        except Exception as e:
+            print(f" [INDEX WARNING] Local auction index unavailable: {e}")
+
+    # Start pre-generating pseudonyms and loading the identity key
+    try:
+        get_pool(user_folder)
+    except Exception as e:
+        print(f" [POOL WARNING] Pseudonym pool unavailable: {e}")
+
     # Callback for broadcast (NEW_BID, NEW_AUCTION, ...)
     if p2p_client is not None:
         try:
@@ -148,6 +151,10 @@ def auction_menu(user_folder: Path, username: str, p2p_client):
         elif choice == "2":
             create_auction(user_folder, username, p2p_client)
         elif choice == "3":
+            # Logout: forget derived keys, the unlocked wallet and the identity key
+            stop_pools()
+            close_vaults()
+            wipe_session()
             return
         else:
             print("Invalid option.")
@@ -191,86 +198,49 @@ def select_and_enter_room(user_folder: Path, username: str, p2p_client):
             return
 
     
-        # Load pseudonym cache and ask for password
-         
-        load_pseudonym_cache(user_folder)  
+        # Unlock the pseudonym vault with the wallet password
 
         print("\n[SECURITY] Enter your wallet password to unlock/create the pseudonym.")
         password = input("Password: ").strip()
 
+        try:
+            vault = open_vault(user_folder, password)
+        except Exception as e:
+            print(f" [CRYPTO ERROR] {e}")
+            return
+
         cache_key = f"{username}_{auction_id}"
         pseudo_data_ram = {}  
+        pool = get_pool(user_folder)
 
         
-        # CASE A: Pseudonym already exists in cache
+        # CASE A: Pseudonym already exists in the vault
     
-        if cache_key in PSEUDONYM_CACHE:
+        cached_entry = vault.get(cache_key)
+        if cached_entry is not None:
             print(" -> Encrypted pseudonym found. Unlocking...")
-            cached_entry = PSEUDONYM_CACHE[cache_key]
 
             try:
-                # Decrypt pseudonym private key
-                encrypted_bytes = eval(cached_entry["pseudo_priv_encrypted"])
-                salt_bytes = base64.b64decode(cached_entry["salt"])
-
-                decrypted_pem = decrypt_data(password, encrypted_bytes, salt_bytes)
-
                 pseudo_priv_obj = serialization.load_pem_private_key(
-                    decrypted_pem, password=None
+                    cached_entry["pseudo_priv_pem"].encode(), password=None
+                )
+                pseudo_pub_pem = pseudo_priv_obj.public_key().public_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo,
                 )
 
-                # Load delegation token from JSON
-                token_dict = json.loads(cached_entry["token"])
-
-                # Check if delegation token is expired and refresh if needed
-                needs_refresh = False
-                not_after_str = token_dict.get("not_after")
-
-                if not_after_str:
-                    try:
-                        not_after = datetime.fromisoformat(
-                            not_after_str.replace("Z", "+00:00")
-                        )
-                        if datetime.now(timezone.utc) > not_after:
-                            needs_refresh = True
-                    except Exception:
-                        needs_refresh = True
-
-                if needs_refresh:
+                # Normally refreshed in the background; only an entry from an
+                # earlier session can still be close to expiry here
+                if token_needs_refresh(cached_entry["token"]):
                     print(" -> Delegation token expired. Regenerating...")
 
-                    # Load the real identity (client private key + certificate)
-                    user_priv_pem = (user_folder / "client_private_key.pem").read_bytes()
-                    user_priv_key = serialization.load_pem_private_key(
-                        user_priv_pem, password=None
+                    # Same pseudonym id and public key, signed with the pool's loaded identity key
+                    cached_entry["token"] = pool.sign_token(
+                        auction_id, cached_entry["pseudo_id"], pseudo_pub_pem
                     )
+                    vault.put(cache_key, cached_entry)
 
-                    user_cert_pem = (user_folder / "client_cert.pem").read_bytes()
-                    user_cert = load_pem_x509_certificate(user_cert_pem)
-                    user_cert_serial = str(user_cert.serial_number)
-
-                    # Reuse the same pseudonym id and public key
-                    pseudo_id = cached_entry["pseudo_id"]
-                    pseudo_pub_pem = pseudo_priv_obj.public_key().public_bytes(
-                        encoding=serialization.Encoding.PEM,
-                        format=serialization.PublicFormat.SubjectPublicKeyInfo,
-                    )
-
-                    # Build a new delegation token
-                    new_token = build_pseudonym_token(
-                        user_priv_key,
-                        user_cert_serial,
-                        auction_id,
-                        pseudo_id,
-                        pseudo_pub_pem,
-                    )
-
-                    # Update cache in memory and on disk
-                    cached_entry["token"] = json.dumps(new_token)
-                    PSEUDONYM_CACHE[cache_key] = cached_entry
-                    save_pseudonym_cache(user_folder)
-
-                    token_dict = new_token  # start using the refreshed token
+                token_dict = cached_entry["token"]
 
                 # Data ready to be used in the auction room
                 pseudo_data_ram = {
@@ -290,56 +260,35 @@ def select_and_enter_room(user_folder: Path, username: str, p2p_client):
         else:
             print(" -> Generating new anonymous identity for this auction...")
 
-            # Load real identity to sign the delegation
+            # Wallet password check before anything is written to a new vault
             try:
                 _ = load_wallet(user_folder, password)
             except Exception:
                 print(" [ERROR] Invalid wallet password.")
                 return
 
-            user_priv_pem = (user_folder / "client_private_key.pem").read_bytes()
-            user_priv_key = serialization.load_pem_private_key(
-                user_priv_pem, password=None
-            )
-
-            user_cert_pem = (user_folder / "client_cert.pem").read_bytes()
-            user_cert = load_pem_x509_certificate(user_cert_pem)
-            user_cert_serial = str(user_cert.serial_number)
-
-            # Generate pseudonym key pair
-            pseudo_id = generate_pseudonym()
-            pseudo_priv, _, pseudo_pub_pem = generate_pseudonym_keypair()
+            # Pre-generated pseudonym + delegation token signed with the loaded identity key
+            fresh = pool.take(auction_id)
+            pseudo_pub_pem = fresh["pseudo_pub_pem"]
 
-            # Build delegation token 
-            delegation_token = build_pseudonym_token(
-                user_priv_key, user_cert_serial, auction_id, pseudo_id, pseudo_pub_pem
-            )
-
-            # Encrypt and store the pseudonym private key
-            pseudo_priv_bytes = pseudo_priv.private_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PrivateFormat.PKCS8,
-                encryption_algorithm=serialization.NoEncryption(),
-            )
-
-            encrypted_key, salt = encrypt_data(password, pseudo_priv_bytes)
-
-            pseudo_data_to_save = {
-                "pseudo_id": pseudo_id,
-                "pseudo_priv_encrypted": str(encrypted_key),
-                "salt": base64.b64encode(salt).decode("utf-8"),
-                "token": json.dumps(delegation_token),
+            # Store the pseudonym private key (encrypted by the vault)
+            cached_entry = {
+                "pseudo_id": fresh["pseudo_id"],
+                "pseudo_priv_pem": fresh["pseudo_priv_pem"].decode(),
+                "token": fresh["token"],
             }
-
-            PSEUDONYM_CACHE[cache_key] = pseudo_data_to_save
-            save_pseudonym_cache(user_folder)
+            vault.put(cache_key, cached_entry)
 
             pseudo_data_ram = {
-                "pseudo_id": pseudo_id,
-                "pseudo_priv": pseudo_priv,
-                "token": delegation_token,
+                "pseudo_id": fresh["pseudo_id"],
+                "pseudo_priv": fresh["pseudo_priv"],
+                "token": fresh["token"],
             }
-            print(f" -> New pseudonym {pseudo_id} created, encrypted, and saved.")
+            print(f" -> New pseudonym {fresh['pseudo_id']} created, encrypted, and saved.")
+
+        # Keep the token valid while the session lasts (re-signed in place before not_after);
+        # refreshed tokens are saved through whichever vault instance is open at that time
+        pool.track(cache_key, auction_id, cached_entry, pseudo_pub_pem, partial(store_entry, user_folder))
 
        
         # Mapping pseudonym - peer id at the tracker
@@ -3,6 +3,7 @@ import json
 import base64
 import time
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
 from Blockchain import blockchain_client
@@ -10,9 +11,10 @@ from Login_Client.identity.wallet_manager import load_wallet
 
 from .auction_input import input_with_timeout
 from .auction_display import display_auction_header
+from .auction_watcher import AuctionRoomWatcher
 from .auction_utils import (
     signal_refresh,
-    NEEDS_REFRESH,
+    REFRESH_EVENT,
     fetch_remote_auction_leader,
 )
 
@@ -48,62 +50,95 @@ def enter_auction_room(
 
     wallet_address = account.address
 
-    # Callback P2P to refresh when NEW_BID arrives
+    # Room state is pushed by the watcher (auction logs, new heads + tracker NEW_BID events)
+    watcher = AuctionRoomWatcher(auction_id, wallet_address)
+    watcher.refresh(fetch_leader=True)
+    watcher.start()
+
+    previous_callback = None
     try:
         if p2p_client is not None:
-            p2p_client.set_refresh_callback(lambda *_: signal_refresh())
+            previous_callback = p2p_client.refresh_callback
+            p2p_client.set_refresh_callback(watcher.on_tracker_event)
+            p2p_client.join_auction(auction_id)
     except AttributeError:
         print("[WARNING] P2P client does not support refresh callbacks.")
 
-    global NEEDS_REFRESH
+    try:
+        _auction_room_loop(
+            user_folder,
+            auction_id,
+            p2p_client,
+            account,
+            watcher,
+            pseudonym_id,
+            pseudonym_priv,
+            delegation_token,
+        )
+    finally:
+        watcher.stop()
+        if p2p_client is not None:
+            try:
+                p2p_client.leave_auction(auction_id)
+            except AttributeError:
+                pass
+            if previous_callback is not None:
+                p2p_client.set_refresh_callback(previous_callback)
+
+
+def _auction_room_loop(
+    user_folder: Path,
+    auction_id: int,
+    p2p_client,
+    account,
+    watcher: AuctionRoomWatcher,
+    pseudonym_id,
+    pseudonym_priv,
+    delegation_token,
+):
+    wallet_address = account.address
     first_loop = True
 
     while True:
-      
-        # Reads the on-chain state to see if the auction is still on
-        
-        details = blockchain_client.get_auction_details(auction_id)
-        if not details:
+
+        # Reads the latest state pushed by the watcher to see if the auction is still on
+
+        snapshot = watcher.snapshot()
+        if not snapshot:
             print(" [INFO] Auction not found on-chain.")
             announce_auction_winner(auction_id, wallet_address, user_folder, p2p_client)
             break
 
-        try:
-            now_ts = blockchain_client.get_current_blockchain_timestamp()
-        except RuntimeError:
-            now_ts = int(time.time())
-
-        close_date = details.get("close_date", 0)
-        active = details.get("active", False)
-        time_left = close_date - now_ts
-
-    
-        # Constructs the header (CURRENT BID, HIGH BID, TIME LEFT, BALANCE)
-        
-        if NEEDS_REFRESH or first_loop:
-            if not display_auction_header(auction_id, wallet_address, pseudonym_id):
-               
+        now_ts = snapshot["now_ts"] if snapshot["now_ts"] is not None else int(time.time())
+        active = snapshot.get("active", False)
+        time_left = snapshot.get("close_date", 0) - now_ts
+
+
+        # Redraws the header (CURRENT BID, HIGH BID, TIME LEFT, BALANCE) only when something changed
+
+        if REFRESH_EVENT.is_set() or first_loop:
+            REFRESH_EVENT.clear()
+            first_loop = False
+            if not display_auction_header(auction_id, snapshot):
+
                 announce_auction_winner(auction_id, wallet_address, user_folder, p2p_client)
                 break
-            NEEDS_REFRESH = False
-            first_loop = False
 
-       
+
         #  # If its over, the winner is announced and leaves the room
-      
+
         if time_left <= 0 or not active:
             announce_auction_winner(auction_id, wallet_address, user_folder, p2p_client)
             break
 
-        # Input with timeout (5 seconds) to allow auto-refresh
+        # Waits for input; returns None as soon as the watcher signals a change
         bid_amount = input_with_timeout(
             " Enter bid amount ('R' refresh / 'EXIT' leave): ",
-            timeout=5.0,
+            timeout=None,
         )
 
-        # Timeout: none input → forces refresh on the next cicle
+        # Woken up by a change → redraw on the next cycle
         if bid_amount is None:
-            NEEDS_REFRESH = True
             continue
 
         bid_amount = bid_amount.strip().upper()
@@ -114,7 +149,8 @@ def enter_auction_room(
             print(" Leaving auction room...")
             break
         elif bid_amount == "R":
-            NEEDS_REFRESH = True
+            watcher.refresh(fetch_leader=True)
+            signal_refresh()
             continue
         elif not bid_amount.isdigit():
             print(" Invalid action. Enter a numeric value, 'R', or 'EXIT'.")
@@ -134,52 +170,33 @@ def enter_auction_room(
                 msg_obj_for_tsa, sort_keys=True
             ).encode("utf-8")
 
-            # Requests Timestamp
-            tsa_token = request_timestamp(msg_bytes_for_tsa)
+            # Requests Timestamp (batched: many bidders stamp in the same closing second)
+            tsa_token = request_timestamp(msg_bytes_for_tsa, batched=True)
             tsa_iso = tsa_token["timestamp"]          
             tsa_dt = datetime.fromisoformat(tsa_iso.replace("Z", "+00:00"))
             tsa_timestamp = int(tsa_dt.timestamp())   # changes to uint (unity used for time in the smart contracts)
 
-            # Bid on-chain withtimestamp TSA so it breaks ties
-            tx_hash = blockchain_client.place_bid_on_chain(
+            # Bid on-chain with timestamp TSA so it breaks ties (confirmed in the background)
+            handle = blockchain_client.submit_bid(
                 account,
                 auction_id,
                 bid_amount,
                 tsa_timestamp,
+                on_confirmed=partial(
+                    _on_bid_confirmed,
+                    p2p_client,
+                    watcher,
+                    auction_id,
+                    bid_amount,
+                    pseudonym_id,
+                    pseudonym_priv,
+                    delegation_token,
+                    tsa_token,
+                ),
+                on_failed=partial(_on_bid_failed, watcher, bid_amount),
             )
-            print(f" Bid accepted. Tx: {tx_hash}")
-
-           
-            signal_refresh()
-
-            # Broadcasts NEW_BID via P2P 
-            msg_obj = {
-                "auction_id": auction_id,
-                "amount": bid_amount,
-                "tx_hash": str(tx_hash),
-                "pseudonym_id": pseudonym_id,
-            }
-            msg_bytes = json.dumps(msg_obj, sort_keys=True).encode("utf-8")
-
-            if pseudonym_priv is not None:
-                pseudo_sig_b64 = base64.b64encode(
-                    pseudonym_priv.sign(msg_bytes)
-                ).decode("utf-8")
-            else:
-                pseudo_sig_b64 = ""
-
-            payload = {
-                **msg_obj,
-                "pseudonym_signature": pseudo_sig_b64,
-                "delegation_token": delegation_token,
-                "tsa_token": tsa_token,
-            }
-
-            if p2p_client is not None:
-                try:
-                    p2p_client.broadcast_event("NEW_BID", payload)
-                except Exception as e:
-                    print(f" [P2P WARNING] Failed to broadcast NEW_BID: {e}")
+            watcher.track_transaction(handle)
+            print(f" Bid submitted. Tx: {handle.tx_hash} (confirming...)")
 
             time.sleep(0.5)
 
@@ -191,6 +208,55 @@ def enter_auction_room(
             time.sleep(3)
 
 
+def _on_bid_confirmed(
+    p2p_client,
+    watcher: AuctionRoomWatcher,
+    auction_id: int,
+    bid_amount,
+    pseudonym_id,
+    pseudonym_priv,
+    delegation_token,
+    tsa_token,
+    handle,
+):
+    """Runs on the confirmation thread once the bid is mined: broadcasts NEW_BID via P2P."""
+    print(f"\n [BID] Bid of {bid_amount} confirmed. Tx: {handle.tx_hash}")
+    watcher.poke()
+
+    msg_obj = {
+        "auction_id": auction_id,
+        "amount": bid_amount,
+        "tx_hash": str(handle.tx_hash),
+        "pseudonym_id": pseudonym_id,
+    }
+    msg_bytes = json.dumps(msg_obj, sort_keys=True).encode("utf-8")
+
+    if pseudonym_priv is not None:
+        pseudo_sig_b64 = base64.b64encode(
+            pseudonym_priv.sign(msg_bytes)
+        ).decode("utf-8")
+    else:
+        pseudo_sig_b64 = ""
+
+    payload = {
+        **msg_obj,
+        "pseudonym_signature": pseudo_sig_b64,
+        "delegation_token": delegation_token,
+        "tsa_token": tsa_token,
+    }
+
+    if p2p_client is not None:
+        try:
+            p2p_client.broadcast_event("NEW_BID", payload)
+        except Exception as e:
+            print(f" [P2P WARNING] Failed to broadcast NEW_BID: {e}")
+
+
+def _on_bid_failed(watcher: AuctionRoomWatcher, bid_amount, handle):
+    print(f"\n [BID] Bid of {bid_amount} failed: {handle.error}")
+    watcher.poke()
+
+
 def announce_auction_winner(
     auction_id: int,
     wallet_address: str,
@@ -1,30 +1,20 @@
-import json
-from pathlib import Path
-import os
-import base64
-import requests
+import threading
 from typing import Optional
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
 
+from Login_Client import transport
+from Login_Client.identity.keyring import KEYRING
 
-# Global refresh flag used by the auction room
 
-NEEDS_REFRESH = False
+# Global refresh event used by the auction room (set = redraw needed)
+
+REFRESH_EVENT = threading.Event()
 
 
 def signal_refresh() -> None:
     """Mark that the auction room should refresh its view."""
-    global NEEDS_REFRESH
-    NEEDS_REFRESH = True
-
-
+    REFRESH_EVENT.set()
 
-# Tracker HTTP base URL (Peer_Server)
-
-TRACKER_HTTP_URL = "http://127.0.0.1:5555"
 
 
 def fetch_remote_auction_leader(auction_id: str) -> Optional[str]:
@@ -35,8 +25,9 @@ def fetch_remote_auction_leader(auction_id: str) -> Optional[str]:
         pseudonym_id (str) if known, or None otherwise.
     """
     try:
-        resp = requests.get(
-            f"{TRACKER_HTTP_URL}/auction_leader/{auction_id}",
+        resp = transport.get(
+            "tracker",
+            f"/auction_leader/{auction_id}",
             timeout=2,
         )
         if resp.status_code == 200:
@@ -48,72 +39,16 @@ def fetch_remote_auction_leader(auction_id: str) -> Optional[str]:
 
 
 
-# 1. PSEUDONYM CACHE (PRIVATE & ENCRYPTED PER USER)
-
-
-PSEUDONYM_CACHE: dict[str, dict] = {}
-CACHE_FILE_NAME = "pseudonym_cache.json"
-
-
-def get_cache_path(user_folder: Path) -> Path:
-    return user_folder / CACHE_FILE_NAME
+# 1. PASSWORD-BASED DECRYPTION (only for migrating legacy pseudonym_cache.json entries, see pseudonym_vault)
 
 
 def derive_key(password: str, salt: bytes) -> bytes:
-    """Derive a symmetric key from a password using PBKDF2."""
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-        backend=default_backend(),
-    )
-    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
-
-
-def encrypt_data(password: str, data: bytes) -> tuple[bytes, bytes]:
-    #Encrypt data using a key derived from the given password.
-    salt = os.urandom(16)
-    key = derive_key(password, salt)
-    f = Fernet(key)
-    return f.encrypt(data), salt
+    """Derive a symmetric key from a password using PBKDF2 (memoized by the session keyring)."""
+    return KEYRING.derive_key(password, salt)
 
 
 def decrypt_data(password: str, encrypted_data: bytes, salt: bytes) -> bytes:
-    #Decrypt data using a key derived from the given password.
+    #Decrypt a legacy pseudonym cache entry with a key derived from the given password.
     key = derive_key(password, salt)
     f = Fernet(key)
     return f.decrypt(encrypted_data)
-
-
-def load_pseudonym_cache(user_folder: Path) -> None:
-    """
-    Load the encrypted pseudonym cache for the current user.
-
-    IMPORTANT: we do NOT rebind PSEUDONYM_CACHE, we only clear() + update()
-    so that modules that imported it keep seeing the updated contents.
-    """
-    global PSEUDONYM_CACHE
-    cache_file = get_cache_path(user_folder)
-
-    PSEUDONYM_CACHE.clear()
-
-    if cache_file.exists():
-        try:
-            with open(cache_file, "r") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    PSEUDONYM_CACHE.update(data)
-        except Exception:
-            PSEUDONYM_CACHE.clear()
-
-
-def save_pseudonym_cache(user_folder: Path) -> None:
-    #Persist the pseudonym cache for the current user.
-    cache_file = get_cache_path(user_folder)
-    try:
-        with open(cache_file, "w") as f:
-            json.dump(PSEUDONYM_CACHE, f, indent=4)
-    except Exception as e:
-        print(f" [CRITICAL] Failed to save pseudonym cache: {e}")
-
@@ -0,0 +1,262 @@
+import asyncio
+import threading
+
+from Blockchain import async_blockchain_client, blockchain_client
+from Blockchain.auction_indexer import EVENT_SIGNATURES
+from .auction_utils import signal_refresh, fetch_remote_auction_leader
+
+# Contract events that change the on-chain state of a room
+ROOM_EVENTS = ("NewBid", "AuctionEnded")
+# JSON-RPC error code of a node that does not implement a method
+METHOD_NOT_FOUND = -32601
+
+
+def _is_method_not_found(error: Exception) -> bool:
+    """Whether an RPC failure means the method is unsupported (not e.g. a connection error)."""
+    response = getattr(error, "rpc_response", None)
+    details = response.get("error") if isinstance(response, dict) else None
+    if details is None and error.args:
+        details = error.args[0]
+    if isinstance(details, dict) and details.get("code") == METHOD_NOT_FOUND:
+        return True
+    message = str(error).lower()
+    return str(METHOD_NOT_FOUND) in message or "method not found" in message
+
+
+class AuctionRoomWatcher:
+    """
+    Keeps the state shown in one auction room up to date without polling everything.
+
+    - A background thread installs two node-side filters: this auction's
+      NewBid/AuctionEnded logs (eth_newFilter on the auctionId topic) and new
+      heads (eth_newBlockFilter), and collects their changes every
+      `poll_interval` seconds. The auction, block time and balance are only
+      re-read (concurrently, via async_blockchain_client) when one of the
+      auction's logs arrives; a new head alone only updates the block time.
+    - Nodes without filter support fall back to watching eth_blockNumber.
+    - Tracker NEW_BID events for this auction update the leader directly from the
+      event payload and wake the thread immediately.
+    - signal_refresh() is only called when something visible actually changed.
+    """
+
+    def __init__(self, auction_id: int, wallet_address: str, poll_interval: float = 1.0):
+        self.auction_id = int(auction_id)
+        self.wallet_address = wallet_address
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._poke = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_block = None
+        # (web3, log filter, head filter) while installed
+        self._filters = None
+        # web3 whose node answered eth_newFilter with "method not found"
+        self._filterless_web3 = None
+        self._snapshot = None
+        self._leader = None
+        self._pending_txs = {}
+
+    # Snapshot
+    def snapshot(self):
+        """Returns the latest room state (dict) or None if the auction does not exist."""
+        with self._lock:
+            return dict(self._snapshot) if self._snapshot else None
+
+    def refresh(self, fetch_leader: bool = False) -> bool:
+        """
+        Reads the room state from the chain.
+        Returns True if the visible state changed.
+        """
+        fetch_leader = fetch_leader or self._leader is None
+        details, now_ts, balance, leader = async_blockchain_client.run_sync(
+            self._read_state(fetch_leader)
+        )
+        if fetch_leader:
+            self._leader = leader
+
+        if not details:
+            new_snapshot = None
+        else:
+            new_snapshot = {
+                "description": details.get("description", "N/A"),
+                "highest_bid": details.get("highest_bid", 0),
+                "active": details.get("active", False),
+                "seller": details.get("seller"),
+                "close_date": details.get("close_date", 0),
+                "now_ts": now_ts,
+                "balance": balance,
+                "leader": self._leader,
+                "pending_txs": len(self._pending_txs),
+            }
+
+        with self._lock:
+            changed = new_snapshot != self._snapshot
+            self._snapshot = new_snapshot
+        return changed
+
+    async def _read_state(self, fetch_leader: bool):
+        """Auction, block time, balance (and tracker leader) read concurrently."""
+        reads = [
+            async_blockchain_client.get_auction_details(self.auction_id),
+            async_blockchain_client.get_current_blockchain_timestamp(),
+            async_blockchain_client.get_internal_balance(self.wallet_address),
+        ]
+        if fetch_leader:
+            reads.append(asyncio.to_thread(fetch_remote_auction_leader, str(self.auction_id)))
+
+        results = await asyncio.gather(*reads, return_exceptions=True)
+        details, now_ts, balance = results[:3]
+        leader = results[3] if fetch_leader else None
+
+        if isinstance(details, Exception):
+            print(f"\n [SYNC ERROR] {details}")
+            details = None
+        if isinstance(now_ts, Exception):
+            now_ts = None
+        if isinstance(balance, Exception):
+            balance = 0
+        if isinstance(leader, Exception):
+            leader = None
+        return details, now_ts, balance, leader
+
+    # Event sources
+    def on_tracker_event(self, event_data=None):
+        """Refresh callback for the tracker's new_event stream (only this auction)."""
+        if not event_data:
+            return
+
+        data = event_data.get("data") or {}
+        if event_data.get("type") != "NEW_BID":
+            return
+        if str(data.get("auction_id")) != str(self.auction_id):
+            return
+
+        # The tracker only relays NEW_BID after validating the pseudonym
+        if data.get("pseudonym_id"):
+            self._leader = data.get("pseudonym_id")
+        self.poke()
+
+    def track_transaction(self, handle) -> None:
+        """Shows a submitted transaction (tx_manager.TxHandle) as pending until it is mined."""
+        with self._lock:
+            self._pending_txs[handle.tx_hash] = handle
+        handle.add_done_callback(self._on_transaction_done)
+        self.poke()
+
+    def _on_transaction_done(self, handle) -> None:
+        with self._lock:
+            self._pending_txs.pop(handle.tx_hash, None)
+        self.poke()
+
+    def poke(self) -> None:
+        """Forces a chain re-read on the next watcher cycle."""
+        self._poke.set()
+
+    # Thread
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._poke.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._uninstall_filters()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            poked = self._poke.wait(self.poll_interval)
+            self._poke.clear()
+            if self._stop.is_set():
+                return
+
+            try:
+                if self._check_chain(poked):
+                    signal_refresh()
+            except Exception as e:
+                # Filters are lost when the node restarts: re-installed next cycle
+                self._uninstall_filters()
+                print(f"\n [SYNC ERROR] {e}")
+
+    def _check_chain(self, poked: bool) -> bool:
+        """One watcher cycle. Returns True if the visible state changed."""
+        w3 = blockchain_client.get_web3()
+        if self._filters and self._filters[0] is not w3:
+            # connect() switched nodes: the filters belong to the old one
+            self._uninstall_filters()
+        # Raises while the node is unreachable, so the next cycle tries again
+        if self._filters is None and w3 is not self._filterless_web3 and self._install_filters(w3):
+            # Anything mined before the filters existed was not seen
+            return self.refresh()
+
+        if self._filters is None:
+            block = w3.eth.block_number
+            if not poked and block == self._last_block:
+                return False
+            self._last_block = block
+            return self.refresh()
+
+        _, log_filter, head_filter = self._filters
+        logs = log_filter.get_new_entries()
+        heads = head_filter.get_new_entries()
+        if poked or logs:
+            return self.refresh()
+        if heads:
+            return self._update_block_time(w3, heads[-1])
+        return False
+
+    # Chain filters
+    def _install_filters(self, w3) -> bool:
+        """
+        Installs the log and head filters. Returns False (block number fallback for
+        this node) if the node does not implement filters; other errors are raised.
+        """
+        event_topics = [
+            "0x" + w3.keccak(text=EVENT_SIGNATURES[name]).hex().replace("0x", "")
+            for name in ROOM_EVENTS
+        ]
+        # auctionId is the first indexed argument of both events
+        auction_topic = "0x" + format(self.auction_id, "064x")
+        log_filter = None
+        try:
+            log_filter = w3.eth.filter({
+                "address": blockchain_client.CONTRACT_ADDRESS,
+                "topics": [event_topics, auction_topic],
+            })
+            head_filter = w3.eth.filter("latest")
+        except Exception as e:
+            if log_filter is not None:
+                self._uninstall_filter(w3, log_filter)
+            if not _is_method_not_found(e):
+                raise
+            print(f"\n [SYNC] Node has no filter support ({e}), watching the block number instead.")
+            self._filterless_web3 = w3
+            return False
+        self._filters = (w3, log_filter, head_filter)
+        return True
+
+    def _uninstall_filters(self) -> None:
+        if not self._filters:
+            return
+        w3, log_filter, head_filter = self._filters
+        self._filters = None
+        self._uninstall_filter(w3, log_filter)
+        self._uninstall_filter(w3, head_filter)
+
+    @staticmethod
+    def _uninstall_filter(w3, chain_filter) -> None:
+        try:
+            w3.eth.uninstall_filter(chain_filter.filter_id)
+        except Exception:
+            pass
+
+    def _update_block_time(self, w3, block_hash) -> bool:
+        """Moves only now_ts forward (a new head without logs of this auction)."""
+        now_ts = w3.eth.get_block(block_hash)["timestamp"]
+        with self._lock:
+            if not self._snapshot or self._snapshot["now_ts"] == now_ts:
+                return False
+            self._snapshot = dict(self._snapshot, now_ts=now_ts)
+        return True
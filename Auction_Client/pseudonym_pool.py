@@ -0,0 +1,209 @@
+"""
+Background pseudonym pool for the logged-in user.
+
+Joining an auction used to generate a keypair, load the RSA identity key from
+disk and sign a delegation token on the critical path. The pool:
+
+- keeps POOL_SIZE Ed25519 pseudonyms generated ahead of time,
+- loads the identity key and certificate serial once and keeps them in memory,
+- re-signs the delegation tokens of auctions joined this session
+  REFRESH_MARGIN before their not_after, so re-entering (or staying in) a room
+  never waits for an expired token.
+
+Joining then only takes a ready pseudonym and signs one token for the auction.
+"""
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.x509 import load_pem_x509_certificate
+
+from .pseudonyms import (
+    generate_pseudonym,
+    generate_pseudonym_keypair,
+    build_pseudonym_token,
+)
+
+POOL_SIZE = 4
+# Tokens are re-signed when they have less than this left
+REFRESH_MARGIN = timedelta(minutes=5)
+# How often the background thread checks tracked tokens
+REFRESH_CHECK_INTERVAL = 30
+
+
+def token_expiry(token: dict) -> datetime:
+    """not_after as an aware UTC datetime (same parsing as the tracker)."""
+    value = token["not_after"].strip()
+    if value.endswith("Z"):
+        value = value[:-1]
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def token_needs_refresh(token: dict, margin: timedelta = REFRESH_MARGIN) -> bool:
+    try:
+        return datetime.now(timezone.utc) + margin >= token_expiry(token)
+    except Exception:
+        return True
+
+
+class PseudonymPool:
+    def __init__(self, user_folder: Path, size: int = POOL_SIZE):
+        self.user_folder = Path(user_folder)
+        self.size = size
+
+        self._lock = threading.Lock()
+        # (pseudo_id, private key, private PEM, public PEM)
+        self._ready = deque()
+        self._identity = None
+        # vault name -> (auction_id, entry, pseudo_pub_pem, on_refresh)
+        self._tracked = {}
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.stats = {"generated": 0, "taken": 0, "inline": 0, "refreshed": 0}
+
+    # Lifecycle
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the thread and drops the identity key and unused pseudonyms."""
+        self._stopped.set()
+        self._wakeup.set()
+        with self._lock:
+            self._ready.clear()
+            self._tracked.clear()
+            self._identity = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.identity()
+                self._fill()
+                self._refresh_due()
+            except Exception as e:
+                print(f" [POOL] Background work failed: {e}")
+            self._wakeup.wait(REFRESH_CHECK_INTERVAL)
+            self._wakeup.clear()
+
+    # Identity
+    def identity(self):
+        """(identity private key, certificate serial), loaded from disk once."""
+        with self._lock:
+            if self._identity is not None:
+                return self._identity
+
+        user_priv_pem = (self.user_folder / "client_private_key.pem").read_bytes()
+        user_priv_key = serialization.load_pem_private_key(user_priv_pem, password=None)
+        user_cert = load_pem_x509_certificate((self.user_folder / "client_cert.pem").read_bytes())
+        identity = (user_priv_key, str(user_cert.serial_number))
+
+        with self._lock:
+            if self._identity is None and not self._stopped.is_set():
+                self._identity = identity
+        return identity
+
+    def sign_token(self, auction_id, pseudo_id: str, pseudo_pub_pem: bytes) -> dict:
+        user_priv_key, user_cert_serial = self.identity()
+        return build_pseudonym_token(
+            user_priv_key, user_cert_serial, auction_id, pseudo_id, pseudo_pub_pem
+        )
+
+    # Pseudonyms
+    @staticmethod
+    def _generate():
+        pseudo_priv, pseudo_priv_pem, pseudo_pub_pem = generate_pseudonym_keypair()
+        return generate_pseudonym(), pseudo_priv, pseudo_priv_pem, pseudo_pub_pem
+
+    def _fill(self) -> None:
+        while not self._stopped.is_set():
+            with self._lock:
+                if len(self._ready) >= self.size:
+                    return
+            item = self._generate()
+            with self._lock:
+                self._ready.append(item)
+                self.stats["generated"] += 1
+
+    def take(self, auction_id) -> dict:
+        """
+        Binds a ready pseudonym to `auction_id`: returns pseudo_id, pseudo_priv,
+        pseudo_priv_pem, pseudo_pub_pem and a freshly signed delegation token.
+        """
+        with self._lock:
+            item = self._ready.popleft() if self._ready else None
+            self.stats["taken"] += 1
+            if item is None:
+                self.stats["inline"] += 1
+        if item is None:
+            item = self._generate()
+        self._wakeup.set()
+
+        pseudo_id, pseudo_priv, pseudo_priv_pem, pseudo_pub_pem = item
+        return {
+            "pseudo_id": pseudo_id,
+            "pseudo_priv": pseudo_priv,
+            "pseudo_priv_pem": pseudo_priv_pem,
+            "pseudo_pub_pem": pseudo_pub_pem,
+            "token": self.sign_token(auction_id, pseudo_id, pseudo_pub_pem),
+        }
+
+    # Token refresh
+    def track(self, name: str, auction_id, entry: dict, pseudo_pub_pem: bytes, on_refresh) -> None:
+        """
+        Keeps entry["token"] valid while the session lasts: it is re-signed in
+        place (so holders of the dict, e.g. the auction room, see the new token)
+        and on_refresh(name, entry) persists it.
+        """
+        with self._lock:
+            self._tracked[name] = (auction_id, entry, pseudo_pub_pem, on_refresh)
+
+    def _refresh_due(self) -> None:
+        with self._lock:
+            tracked = list(self._tracked.items())
+
+        for name, (auction_id, entry, pseudo_pub_pem, on_refresh) in tracked:
+            if not token_needs_refresh(entry["token"]):
+                continue
+            new_token = self.sign_token(auction_id, entry["pseudo_id"], pseudo_pub_pem)
+            # Same keys, so update() swaps every field without an empty intermediate state
+            entry["token"].update(new_token)
+            with self._lock:
+                self.stats["refreshed"] += 1
+            try:
+                on_refresh(name, entry)
+            except Exception as e:
+                print(f" [POOL] Could not save refreshed token for {name}: {e}")
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(user_folder: Path) -> PseudonymPool:
+    """The running pool for this user folder (started on first call)."""
+    key = str(user_folder)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = PseudonymPool(user_folder)
+        pool.start()
+        return pool
+
+
+def stop_pools() -> None:
+    """Stops every pool (logout)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.stop()
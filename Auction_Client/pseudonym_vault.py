@@ -0,0 +1,328 @@
+"""
+Per-user pseudonym vault (replaces pseudonym_cache.json).
+
+One file, `pseudonym_vault.bin` in the user folder:
+
+    header:  MAGIC | salt (16) | check nonce (12) | AESGCM(check key, b"vault")
+    records: length (4, big endian) | entry id (16) | op (1) | nonce (12) | ciphertext
+
+- The master key is derived once from the wallet password and the vault salt
+  (PBKDF2 through the session keyring); an AEAD check value in the header
+  rejects a wrong password right away.
+- Each record is an AES-GCM encryption of one entry's JSON under a sub-key,
+  bound (as associated data) to its entry id and op.
+- Entry ids are HMAC(index key, name)[:16], so the file does not reveal which
+  auctions the user joined. Opening the vault scans record headers (no
+  decryption) into an in-memory {entry id: offset} index.
+- put()/delete() append one record; old versions stay in the file until
+  compact() rewrites the live records (done automatically once dead records
+  outnumber live ones and exceed COMPACT_MIN_DEAD).
+- open_vault() keeps one instance per file for the session (close_vaults()
+  on logout), so appends always start from the real end of the file.
+"""
+import ast
+import base64
+import hashlib
+import hmac
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from Login_Client.identity.keyring import KEYRING
+
+VAULT_FILE_NAME = "pseudonym_vault.bin"
+LEGACY_CACHE_FILE_NAME = "pseudonym_cache.json"
+
+MAGIC = b"PSVAULT1"
+SALT_SIZE = 16
+NONCE_SIZE = 12
+ID_SIZE = 16
+_CHECK_PLAINTEXT = b"vault"
+_HEADER_SIZE = len(MAGIC) + SALT_SIZE + NONCE_SIZE + len(_CHECK_PLAINTEXT) + 16
+_LENGTH = struct.Struct(">I")
+
+OP_PUT = 0
+OP_DELETE = 1
+
+# Compaction kicks in once there are more dead records than this (and than live ones)
+COMPACT_MIN_DEAD = 64
+
+
+def get_vault_path(user_folder: Path) -> Path:
+    return user_folder / VAULT_FILE_NAME
+
+
+class PseudonymVault:
+    def __init__(self, path: Path, master_key: bytes, salt: bytes):
+        self.path = Path(path)
+        self._salt = salt
+        self._aead = AESGCM(hmac.new(master_key, b"pseudonym-vault/aead", hashlib.sha256).digest())
+        self._index_key = hmac.new(master_key, b"pseudonym-vault/index", hashlib.sha256).digest()
+        self._check_key = AESGCM(hmac.new(master_key, b"pseudonym-vault/check", hashlib.sha256).digest())
+        self._verifier = hmac.new(master_key, b"pseudonym-vault/verify", hashlib.sha256).digest()
+        self._lock = threading.Lock()
+        # entry id -> (offset, length) of its latest PUT record
+        self._index = {}
+        self._dead = 0
+        self._end = 0
+
+    # Open / create
+    @classmethod
+    def open(cls, path: Path, password: str) -> "PseudonymVault":
+        """
+        Unlocks an existing vault (ValueError on a wrong password or bad file)
+        or prepares a new one; a new vault is written on the first put().
+        """
+        path = Path(path)
+        if not path.exists():
+            salt = os.urandom(SALT_SIZE)
+            return cls(path, _master_key(password, salt), salt)
+
+        with open(path, "rb") as f:
+            header = f.read(_HEADER_SIZE)
+            if len(header) != _HEADER_SIZE or not header.startswith(MAGIC):
+                raise ValueError(f"{path} is not a pseudonym vault")
+
+            salt = header[len(MAGIC):len(MAGIC) + SALT_SIZE]
+            vault = cls(path, _master_key(password, salt), salt)
+            nonce = header[len(MAGIC) + SALT_SIZE:len(MAGIC) + SALT_SIZE + NONCE_SIZE]
+            try:
+                vault._check_key.decrypt(nonce, header[len(MAGIC) + SALT_SIZE + NONCE_SIZE:], MAGIC)
+            except InvalidTag:
+                raise ValueError("Wrong password for the pseudonym vault") from None
+
+            vault._scan(f)
+        return vault
+
+    def unlocks_with(self, password: str) -> bool:
+        """Whether `password` derives this vault's master key."""
+        candidate = hmac.new(_master_key(password, self._salt), b"pseudonym-vault/verify", hashlib.sha256).digest()
+        return hmac.compare_digest(candidate, self._verifier)
+
+    def _header(self) -> bytes:
+        nonce = os.urandom(NONCE_SIZE)
+        return MAGIC + self._salt + nonce + self._check_key.encrypt(nonce, _CHECK_PLAINTEXT, MAGIC)
+
+    def _scan(self, f) -> None:
+        """Builds the index from record headers; a torn trailing record is ignored."""
+        file_size = f.seek(0, os.SEEK_END)
+        prefix_size = _LENGTH.size + ID_SIZE + 1
+        offset = _HEADER_SIZE
+        while offset + prefix_size <= file_size:
+            f.seek(offset)
+            prefix = f.read(prefix_size)
+            (length,) = _LENGTH.unpack_from(prefix)
+            record_end = offset + _LENGTH.size + length
+            if record_end > file_size or length < ID_SIZE + 1 + NONCE_SIZE + 16:
+                break
+
+            entry_id = prefix[_LENGTH.size:_LENGTH.size + ID_SIZE]
+            op = prefix[_LENGTH.size + ID_SIZE]
+            if entry_id in self._index:
+                self._dead += 1
+            if op == OP_PUT:
+                self._index[entry_id] = (offset, record_end - offset)
+            else:
+                self._index.pop(entry_id, None)
+                self._dead += 1
+            offset = record_end
+        self._end = offset
+
+    # Records
+    def _entry_id(self, name: str) -> bytes:
+        return hmac.new(self._index_key, name.encode(), hashlib.sha256).digest()[:ID_SIZE]
+
+    def _record(self, entry_id: bytes, op: int, plaintext: bytes) -> bytes:
+        nonce = os.urandom(NONCE_SIZE)
+        aad = entry_id + bytes([op])
+        body = aad + nonce + self._aead.encrypt(nonce, plaintext, aad)
+        return _LENGTH.pack(len(body)) + body
+
+    def _read_entry(self, f, offset: int, size: int) -> dict:
+        f.seek(offset)
+        record = f.read(size)
+        body = record[_LENGTH.size:]
+        aad = body[:ID_SIZE + 1]
+        nonce = body[ID_SIZE + 1:ID_SIZE + 1 + NONCE_SIZE]
+        plaintext = self._aead.decrypt(nonce, body[ID_SIZE + 1 + NONCE_SIZE:], aad)
+        return json.loads(plaintext)
+
+    def _append(self, record: bytes) -> None:
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.write(self._header())
+            self._end = _HEADER_SIZE
+
+        with open(self.path, "r+b") as f:
+            # The file changed behind our back (torn write, another process):
+            # re-index it so nothing past our end is overwritten by mistake
+            if f.seek(0, os.SEEK_END) != self._end:
+                self._index = {}
+                self._dead = 0
+                self._scan(f)
+            # Overwrite any torn record left by an interrupted write
+            f.seek(self._end)
+            f.write(record)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Public API
+    def get(self, name: str):
+        """The entry stored under `name` (a dict), or None."""
+        with self._lock:
+            location = self._index.get(self._entry_id(name))
+            if location is None:
+                return None
+            with open(self.path, "rb") as f:
+                return self._read_entry(f, *location)
+
+    def put(self, name: str, entry: dict) -> None:
+        entry_id = self._entry_id(name)
+        record = self._record(entry_id, OP_PUT, json.dumps(entry).encode())
+        with self._lock:
+            self._append(record)
+            if entry_id in self._index:
+                self._dead += 1
+            self._index[entry_id] = (self._end, len(record))
+            self._end += len(record)
+            self._maybe_compact()
+
+    def delete(self, name: str) -> None:
+        entry_id = self._entry_id(name)
+        with self._lock:
+            if entry_id not in self._index:
+                return
+            record = self._record(entry_id, OP_DELETE, b"")
+            self._append(record)
+            del self._index[entry_id]
+            self._dead += 2
+            self._end += len(record)
+            self._maybe_compact()
+
+    def __contains__(self, name: str) -> bool:
+        return self._entry_id(name) in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # Compaction
+    def _maybe_compact(self) -> None:
+        if self._dead > COMPACT_MIN_DEAD and self._dead > len(self._index):
+            self._compact()
+
+    def compact(self) -> None:
+        """Rewrites the file with only the latest record of each live entry."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        new_index = {}
+        with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+            dst.write(self._header())
+            offset = _HEADER_SIZE
+            for entry_id, (old_offset, size) in self._index.items():
+                src.seek(old_offset)
+                dst.write(src.read(size))
+                new_index[entry_id] = (offset, size)
+                offset += size
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._index = new_index
+        self._dead = 0
+        self._end = offset
+
+
+def _master_key(password: str, salt: bytes) -> bytes:
+    # Same PBKDF2 as the wallet; the keyring runs it once per session
+    return base64.urlsafe_b64decode(KEYRING.derive_key(password, salt))
+
+
+def _migrate_legacy_cache(user_folder: Path, vault: PseudonymVault, password: str) -> None:
+    """Moves entries from pseudonym_cache.json into the vault (deleted once all are moved)."""
+    legacy_path = user_folder / LEGACY_CACHE_FILE_NAME
+    if not legacy_path.exists():
+        return
+
+    from .auction_utils import decrypt_data
+
+    try:
+        with open(legacy_path) as f:
+            legacy = json.load(f)
+    except Exception as e:
+        print(f" [VAULT] Cannot read {legacy_path.name}: {e}")
+        return
+
+    migrated = 0
+    for name, entry in legacy.items():
+        if name in vault:
+            migrated += 1
+            continue
+        try:
+            # Ciphertext was stored as str(bytes): parse the literal, never eval it
+            encrypted = ast.literal_eval(entry["pseudo_priv_encrypted"])
+            salt = base64.b64decode(entry["salt"])
+            priv_pem = decrypt_data(password, encrypted, salt)
+            vault.put(name, {
+                "pseudo_id": entry["pseudo_id"],
+                "pseudo_priv_pem": priv_pem.decode(),
+                "token": json.loads(entry["token"]),
+            })
+            migrated += 1
+        except Exception as e:
+            print(f" [VAULT] Could not migrate pseudonym entry {name}: {e}")
+
+    if migrated == len(legacy):
+        legacy_path.unlink()
+        print(f" [VAULT] Migrated {migrated} pseudonym(s) from {legacy_path.name}.")
+
+
+# Open vaults by file path: exactly one instance per file for the session
+_VAULTS = {}
+_VAULTS_LOCK = threading.Lock()
+
+
+def open_vault(user_folder: Path, password: str) -> PseudonymVault:
+    """
+    The user's vault, unlocked with the wallet password (ValueError if wrong).
+    The first call opens it; later calls check the password and return the same instance.
+    """
+    path = get_vault_path(user_folder)
+    key = str(path)
+    with _VAULTS_LOCK:
+        vault = _VAULTS.get(key)
+        if vault is not None:
+            if vault.unlocks_with(password):
+                return vault
+            if path.exists():
+                raise ValueError("Wrong password for the pseudonym vault")
+            # Never written: whoever opened it with another password created nothing yet
+
+        vault = PseudonymVault.open(path, password)
+        _migrate_legacy_cache(user_folder, vault, password)
+        _VAULTS[key] = vault
+        return vault
+
+
+def store_entry(user_folder: Path, name: str, entry: dict) -> None:
+    """put() on the user's open vault (for background writers that do not hold one)."""
+    with _VAULTS_LOCK:
+        vault = _VAULTS.get(str(get_vault_path(user_folder)))
+    if vault is None:
+        raise RuntimeError("Pseudonym vault is locked")
+    vault.put(name, entry)
+
+
+def close_vaults() -> None:
+    """Forgets every open vault and its keys (logout)."""
+    with _VAULTS_LOCK:
+        _VAULTS.clear()
@@ -1,5 +1,5 @@
 import uuid, json, base64, datetime
-from cryptography.hazmat.primitives.asymmetric import ed25519,padding
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
 from cryptography.hazmat.primitives import serialization, hashes
 
 def generate_pseudonym():
@@ -19,6 +19,23 @@ def generate_pseudonym_keypair():
     )
     return priv, priv_pem, pub_pem
 
+def delegation_sig_alg(user_private_key) -> str:
+    """Signature algorithm matching the user's long-term key type."""
+    if isinstance(user_private_key, ed25519.Ed25519PrivateKey):
+        return "ed25519"
+    if isinstance(user_private_key, ec.EllipticCurvePrivateKey):
+        return "ecdsa-sha256"
+    if isinstance(user_private_key, rsa.RSAPrivateKey):
+        return "rsa-pkcs1-sha256"
+    raise ValueError(f"Unsupported user key type: {type(user_private_key).__name__}")
+
+def sign_delegation(user_private_key, sig_alg: str, msg: bytes) -> bytes:
+    if sig_alg == "ed25519":
+        return user_private_key.sign(msg)
+    if sig_alg == "ecdsa-sha256":
+        return user_private_key.sign(msg, ec.ECDSA(hashes.SHA256()))
+    return user_private_key.sign(msg, padding.PKCS1v15(), hashes.SHA256())
+
 def build_pseudonym_token(user_private_key, user_cert_serial, auction_id, pseudonym_id, pseudonym_pubkey_pem):
     now = datetime.datetime.now(datetime.timezone.utc)
     token = {
@@ -27,10 +44,12 @@ def build_pseudonym_token(user_private_key, user_cert_serial, auction_id, pseudo
         "pseudonym_pubkey": base64.b64encode(pseudonym_pubkey_pem).decode(),
         "user_cert_serial": str(user_cert_serial),
         "not_before": now.isoformat() + "Z",
-        "not_after": (now + datetime.timedelta(minutes=60)).isoformat() + "Z"
+        "not_after": (now + datetime.timedelta(minutes=60)).isoformat() + "Z",
+        # signed field, so the algorithm cannot be swapped by a relay
+        "sig_alg": delegation_sig_alg(user_private_key),
     }
-    # sign with user’s long-term RSA private key
+    # sign with user’s long-term private key (RSA today; Ed25519/P-256 if the CA issues them)
     msg = json.dumps(token, sort_keys=True).encode()
-    sig = user_private_key.sign(msg, padding.PKCS1v15(), hashes.SHA256())
+    sig = sign_delegation(user_private_key, token["sig_alg"], msg)
     token["signature"] = base64.b64encode(sig).decode()
     return token
\ No newline at end of file
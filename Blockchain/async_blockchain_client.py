@@ -0,0 +1,177 @@
+"""
+AsyncWeb3 counterpart of blockchain_client.
+
+Same functions, as coroutines, so independent reads can run concurrently:
+
+    details, now_ts, balance = await asyncio.gather(
+        get_auction_details(auction_id),
+        get_current_blockchain_timestamp(),
+        get_internal_balance(address),
+    )
+
+Threaded code can call them through run_sync(), which runs the coroutine on a
+shared background event loop. Writes go through blockchain_client's
+TransactionManager so there is still one owner of each account's nonce.
+"""
+import asyncio
+import threading
+
+from Blockchain import blockchain_client
+
+# Max concurrent eth_call requests in get_all_auctions
+MAX_CONCURRENT_CALLS = 32
+
+async_web3 = None
+async_contract = None
+# RPC URL the cached client was built for (rebuilt after blockchain_client.connect)
+_client_rpc_url = None
+_client_lock = threading.Lock()
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _client():
+    """The AsyncWeb3 client and contract for blockchain_client's current node (created on first use)."""
+    global async_web3, async_contract, _client_rpc_url
+    client = blockchain_client.get_client()
+    if async_web3 is None or _client_rpc_url != client.rpc_url:
+        with _client_lock:
+            rpc_url = client.rpc_url
+            if async_web3 is None or _client_rpc_url != rpc_url:
+                from web3 import AsyncWeb3, AsyncHTTPProvider
+                w3 = AsyncWeb3(AsyncHTTPProvider(rpc_url))
+                contract = None
+                if client.abi:
+                    contract = w3.eth.contract(
+                        address=blockchain_client.CONTRACT_ADDRESS,
+                        abi=client.abi,
+                    )
+                async_contract = contract
+                async_web3 = w3
+                _client_rpc_url = rpc_url
+    return async_web3
+
+
+def _contract():
+    _client()
+    return async_contract
+
+
+def run_sync(coro, timeout=None):
+    """Runs a coroutine on the shared background loop and waits for its result (any thread)."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result(timeout)
+
+
+async def get_internal_balance(address):
+    """Returns token balance."""
+    contract = _contract()
+    if not contract:
+        return 0
+    try:
+        return await contract.functions.getBalance(address).call()
+    except Exception:
+        return 0
+
+
+async def get_current_blockchain_timestamp():
+    """Timestamp of the latest mined block."""
+    w3 = _client()
+    if not await w3.is_connected():
+        raise RuntimeError("Web3 not connected")
+
+    latest_block = await w3.eth.get_block("latest")
+    return latest_block["timestamp"]
+
+
+async def get_block_number():
+    return await _client().eth.block_number
+
+
+async def get_auction_details(auction_id):
+    """Full info for a single auction (from the local index when one is attached)."""
+    contract = _contract()
+    if not contract:
+        return None
+
+    if blockchain_client.auction_index is not None:
+        index = await asyncio.to_thread(blockchain_client.synced_index)
+        if index is not None:
+            return index.get_auction_details(auction_id)
+
+    try:
+        data = await contract.functions.auctions(int(auction_id)).call()
+        return blockchain_client.parse_auction(auction_id, data)
+    except Exception as e:
+        print(f"Error fetching auction details for {auction_id}: {e}")
+        return None
+
+
+async def get_all_auctions():
+    """All auction structs, fetched concurrently (bounded by MAX_CONCURRENT_CALLS)."""
+    contract = _contract()
+    if not contract:
+        return []
+
+    if blockchain_client.auction_index is not None:
+        index = await asyncio.to_thread(blockchain_client.synced_index)
+        if index is not None:
+            return index.get_all_auctions()
+
+    try:
+        count = await contract.functions.auctionCount().call()
+        limit = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+
+        async def fetch(i):
+            async with limit:
+                return await contract.functions.auctions(i).call()
+
+        ids = list(range(1, count + 1))
+        structs = await asyncio.gather(*(fetch(i) for i in ids))
+        return [blockchain_client.parse_auction(i, data) for i, data in zip(ids, structs)]
+    except Exception as e:
+        print(f"Error fetching auctions: {e}")
+        return []
+
+
+async def wait_for_transaction(handle):
+    """Awaits a tx_manager.TxHandle without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def finished(h):
+        loop.call_soon_threadsafe(lambda: done.done() or done.set_result(h))
+
+    handle.add_done_callback(finished)
+    await done
+    if handle.error is not None:
+        raise handle.error
+    return handle.receipt
+
+
+async def place_bid_on_chain(account, auction_id, amount, tsa_timestamp):
+    """Places a bid (with TSA timestamp); returns the tx hash once mined."""
+    handle = await asyncio.to_thread(
+        blockchain_client.submit_bid, account, auction_id, amount, tsa_timestamp
+    )
+    await wait_for_transaction(handle)
+    return handle.tx_hash
+
+
+async def create_auction(account, description, duration_minutes, min_bid):
+    """Creates an auction; returns the tx hash once mined."""
+    handle = await asyncio.to_thread(
+        blockchain_client.submit_create_auction, account, description, duration_minutes, min_bid
+    )
+    await wait_for_transaction(handle)
+    return handle.tx_hash
+
+
+async def fund_new_user(target_address, amount_eth=10):
+    """Sends ETH from the bank account to bootstrap new users."""
+    return await asyncio.to_thread(blockchain_client.fund_new_user, target_address, amount_eth)
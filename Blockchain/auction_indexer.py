@@ -0,0 +1,203 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from Blockchain import blockchain_client
+
+# Default location of the persisted index (shared by every local user)
+DEFAULT_INDEX_PATH = Path(__file__).parent / "storage" / "auction_index.sqlite3"
+
+# Max block range requested per eth_getLogs call
+LOG_BLOCK_CHUNK = 2000
+
+EVENT_SIGNATURES = {
+    "AuctionCreated": "AuctionCreated(uint256,string,uint256,uint256)",
+    "NewBid": "NewBid(uint256,uint256,uint256)",
+    "AuctionEnded": "AuctionEnded(uint256,address,uint256)",
+}
+
+
+class AuctionIndexer:
+    """
+    Local index of auctions built from the contract's event logs.
+
+    - Follows AuctionCreated / NewBid / AuctionEnded logs from a block cursor.
+    - Each sync only reads the blocks mined since the last one, then re-reads the
+      structs of the auctions touched in that range in a single batch.
+    - Keeps everything in memory; if db_path is given the index and the cursor are
+      also stored in SQLite so the next start is instant.
+    """
+
+    def __init__(self, db_path=None):
+        self.cursor = -1
+        self.auctions = {}
+        self.bids = {}
+        self._topics = {}
+        self._lock = threading.RLock()
+        self._db = None
+
+        if db_path is not None:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._create_tables()
+            self._load()
+
+    # Persistence
+    def _create_tables(self):
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS auctions (id INTEGER PRIMARY KEY, data TEXT)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS bids ("
+                " auction_id INTEGER, amount INTEGER, bid_timestamp INTEGER,"
+                " block_number INTEGER, tx_hash TEXT, log_index INTEGER,"
+                " PRIMARY KEY (tx_hash, log_index))"
+            )
+
+    def _load(self):
+        meta = dict(self._db.execute("SELECT key, value FROM meta"))
+
+        # A different contract means a different chain state: start over
+        if meta.get("contract") != blockchain_client.CONTRACT_ADDRESS:
+            self._reset_db()
+            return
+
+        self.cursor = int(meta.get("cursor", -1))
+        for auction_id, data in self._db.execute("SELECT id, data FROM auctions"):
+            self.auctions[auction_id] = json.loads(data)
+        for row in self._db.execute(
+            "SELECT auction_id, amount, bid_timestamp, block_number, tx_hash "
+            "FROM bids ORDER BY block_number, log_index"
+        ):
+            self.bids.setdefault(row[0], []).append({
+                "amount": row[1],
+                "bid_timestamp": row[2],
+                "block_number": row[3],
+                "tx_hash": row[4],
+            })
+
+    def _reset_db(self):
+        with self._db:
+            self._db.execute("DELETE FROM meta")
+            self._db.execute("DELETE FROM auctions")
+            self._db.execute("DELETE FROM bids")
+
+    def _persist(self, touched_ids, new_bids):
+        if self._db is None:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO auctions (id, data) VALUES (?, ?)",
+                [(i, json.dumps(self.auctions[i])) for i in touched_ids],
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO bids VALUES (?, ?, ?, ?, ?, ?)",
+                new_bids,
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("cursor", str(self.cursor)), ("contract", blockchain_client.CONTRACT_ADDRESS)],
+            )
+
+    # Log following
+    def _event_topics(self):
+        if not self._topics:
+            w3 = blockchain_client.get_web3()
+            for name, signature in EVENT_SIGNATURES.items():
+                self._topics[w3.keccak(text=signature).hex().replace("0x", "")] = name
+        return self._topics
+
+    def reset(self):
+        """Drops the whole index (used when the chain was restarted)."""
+        with self._lock:
+            self.cursor = -1
+            self.auctions.clear()
+            self.bids.clear()
+            if self._db is not None:
+                self._reset_db()
+
+    def sync(self) -> int:
+        """
+        Applies every log mined since the cursor.
+        Returns the number of auctions whose state changed.
+        """
+        contract = blockchain_client.get_contract()
+        if not contract:
+            raise RuntimeError("Contract offline")
+
+        with self._lock:
+            w3 = blockchain_client.get_web3()
+            latest = w3.eth.block_number
+
+            # Chain went backwards (e.g. Ganache restart): rebuild from scratch
+            if latest < self.cursor:
+                print(" [INDEX] Chain head is behind the index cursor, rebuilding.")
+                self.reset()
+
+            if latest == self.cursor:
+                return 0
+
+            topics = self._event_topics()
+            touched = set()
+            new_bids = []
+
+            for start in range(self.cursor + 1, latest + 1, LOG_BLOCK_CHUNK):
+                end = min(start + LOG_BLOCK_CHUNK - 1, latest)
+                logs = w3.eth.get_logs({
+                    "fromBlock": start,
+                    "toBlock": end,
+                    "address": blockchain_client.CONTRACT_ADDRESS,
+                })
+
+                for log in logs:
+                    topic0 = log["topics"][0].hex().replace("0x", "")
+                    name = topics.get(topic0)
+                    if not name:
+                        continue
+
+                    args = contract.events[name]().process_log(log)["args"]
+                    auction_id = int(args["auctionId"])
+                    touched.add(auction_id)
+
+                    if name == "NewBid":
+                        tx_hash = log["transactionHash"].hex()
+                        self.bids.setdefault(auction_id, []).append({
+                            "amount": args["amount"],
+                            "bid_timestamp": args["bidTimestamp"],
+                            "block_number": log["blockNumber"],
+                            "tx_hash": tx_hash,
+                        })
+                        new_bids.append((
+                            auction_id,
+                            args["amount"],
+                            args["bidTimestamp"],
+                            log["blockNumber"],
+                            tx_hash,
+                            log["logIndex"],
+                        ))
+
+            # One batched read for every auction touched in this block range
+            ids = sorted(touched)
+            if ids:
+                structs = blockchain_client.batch_call("auctions", [[i] for i in ids])
+                for auction_id, data in zip(ids, structs):
+                    self.auctions[auction_id] = blockchain_client.parse_auction(auction_id, data)
+
+            self.cursor = latest
+            self._persist(ids, new_bids)
+            return len(ids)
+
+    # Reads served from the index
+    def get_all_auctions(self):
+        with self._lock:
+            return [dict(self.auctions[i]) for i in sorted(self.auctions)]
+
+    def get_auction_details(self, auction_id):
+        with self._lock:
+            auction = self.auctions.get(int(auction_id))
+            return dict(auction) if auction else None
+
+    def get_bid_history(self, auction_id):
+        with self._lock:
+            return list(self.bids.get(int(auction_id), []))
@@ -1,46 +1,211 @@
 import json
 import os
-from web3 import Web3
+import threading
+import requests
 from pathlib import Path
 import time
 
+from Blockchain.tx_manager import TransactionManager
+
+# web3 (and the contract/bank account) are created on first use, not at import
+# time: importing web3 alone is slow, and a down node used to block the CLI
+# before the login menu appeared. See BlockchainClient.
+
 # Blockchain connection
 RPC_URL = "http://127.0.0.1:7545"
-web3 = Web3(Web3.HTTPProvider(RPC_URL))
 
 BASE_DIR = Path(__file__).parent.parent
 ABI_PATH = BASE_DIR / "Blockchain" / "build" / "contracts" / "Auction.json"
+# Just the "abi" key of the build artifact (which also carries bytecode, AST and sources)
+ABI_CACHE_PATH = BASE_DIR / "Blockchain" / "storage" / "Auction.abi.json"
 CONTRACT_ADDRESS = "0x32827C616b884801B77833dedC4f747e11Ea74FD"
 
-contract = None
-BANK_ACCOUNT = web3.eth.accounts[0] if web3.is_connected() else None
+# Max eth_call entries sent in a single JSON-RPC batch request
+RPC_BATCH_SIZE = 500
+RPC_TIMEOUT = 10
+# Min time between connection attempts while the node is unreachable
+CONNECT_RETRY_SECONDS = 5
 
+_rpc_session = requests.Session()
 
-def load_contract():
-    """Load contract using ABI and deployed address."""
-    global contract
-    if not web3.is_connected():
-        return None
+# Optional local event index (auction_indexer.AuctionIndexer) used for reads
+auction_index = None
+# Local nonce tracking + background receipt confirmation (see get_tx_manager)
+_tx_manager = None
+# Cached gas estimates and per-block fees (see get_fee_oracle)
+_fee_oracle = None
+
+
+def load_abi():
+    """Contract ABI, read from the compact cache unless the build artifact is newer."""
     try:
-        if not os.path.exists(ABI_PATH):
-            print(f"ABI not found at: {ABI_PATH}")
+        if ABI_CACHE_PATH.stat().st_mtime >= ABI_PATH.stat().st_mtime:
+            with open(ABI_CACHE_PATH) as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if not os.path.exists(ABI_PATH):
+        print(f"ABI not found at: {ABI_PATH}")
+        return []
+
+    with open(ABI_PATH) as f:
+        abi = json.load(f)["abi"]
+
+    try:
+        ABI_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = ABI_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(abi, f, separators=(",", ":"))
+        os.replace(tmp_path, ABI_CACHE_PATH)
+    except OSError as e:
+        print(f"Could not write ABI cache ({e}).")
+    return abi
+
+
+class BlockchainClient:
+    """
+    Web3 connection, Auction contract and bank account, each created on first use.
+
+    - `web3` imports web3 and builds the HTTP provider (no request is sent).
+    - `contract` checks the node is reachable and binds the cached ABI; while the
+      node is down it returns None and retries at most every CONNECT_RETRY_SECONDS.
+    - `bank_account` is read from eth_accounts once.
+    """
+
+    def __init__(self, rpc_url: str = RPC_URL):
+        self.rpc_url = rpc_url
+        self._lock = threading.RLock()
+        self._web3 = None
+        self._abi = None
+        self._contract = None
+        self._bank_account = None
+        self._last_attempt = None
+
+    @property
+    def web3(self):
+        if self._web3 is None:
+            with self._lock:
+                if self._web3 is None:
+                    from web3 import Web3
+                    self._web3 = Web3(Web3.HTTPProvider(
+                        self.rpc_url, request_kwargs={"timeout": RPC_TIMEOUT}
+                    ))
+        return self._web3
+
+    @property
+    def abi(self) -> list:
+        if self._abi is None:
+            with self._lock:
+                if self._abi is None:
+                    self._abi = load_abi()
+        return self._abi
+
+    @property
+    def contract(self):
+        if self._contract is None:
+            with self._lock:
+                now = time.monotonic()
+                if self._contract is None and (
+                    self._last_attempt is None or now - self._last_attempt >= CONNECT_RETRY_SECONDS
+                ):
+                    self._last_attempt = now
+                    self._contract = self._load_contract()
+        return self._contract
+
+    def _load_contract(self):
+        if not self.web3.is_connected():
+            return None
+        try:
+            if not self.abi:
+                return None
+            return self.web3.eth.contract(address=CONTRACT_ADDRESS, abi=self.abi)
+        except Exception as e:
+            print(f"Contract load failed: {e}")
             return None
 
-        with open(ABI_PATH) as f:
-            data = json.load(f)
-            abi = data["abi"]
+    @property
+    def bank_account(self):
+        if self._bank_account is None:
+            with self._lock:
+                if self._bank_account is None and self.web3.is_connected():
+                    self._bank_account = self.web3.eth.accounts[0]
+        return self._bank_account
 
-        contract = web3.eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+    def reset(self, rpc_url: str = None) -> None:
+        """Drops the connection (optionally switching node); the next use reconnects."""
+        with self._lock:
+            if rpc_url:
+                self.rpc_url = rpc_url
+            self._web3 = None
+            self._contract = None
+            self._bank_account = None
+            self._last_attempt = None
 
-    except Exception as e:
-        print(f"Contract load failed: {e}")
 
+_client = BlockchainClient()
 
-load_contract()
+
+def get_client():
+    return _client
+
+
+def get_web3():
+    return _client.web3
+
+
+def get_contract():
+    return _client.contract
+
+
+def load_contract():
+    """Connects if needed and returns the contract (None while the node is unreachable)."""
+    return _client.contract
+
+
+def connect(rpc_url):
+    """Points this module at another node; transactions and fees start from scratch."""
+    global RPC_URL, _tx_manager, _fee_oracle
+    RPC_URL = rpc_url
+    _client.reset(rpc_url)
+    _tx_manager = None
+    _fee_oracle = None
+
+
+def __getattr__(name):
+    # Old module-level globals, now resolved lazily through the client
+    if name == "web3":
+        return _client.web3
+    if name == "contract":
+        return _client.contract
+    if name == "contract_abi":
+        return _client.abi
+    if name == "BANK_ACCOUNT":
+        return _client.bank_account
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def attach_index(index):
+    """Serve get_all_auctions/get_auction_details from a local event index."""
+    global auction_index
+    auction_index = index
+
+
+def synced_index():
+    """Returns the attached index after catching it up with new blocks, or None."""
+    if auction_index is None:
+        return None
+    try:
+        auction_index.sync()
+        return auction_index
+    except Exception as e:
+        print(f"Index sync failed ({e}), reading contract storage.")
+        return None
 
 
 def get_internal_balance(address):
     """Returns token balance."""
+    contract = get_contract()
     if not contract:
         return 0
     try:
@@ -49,96 +214,192 @@ def get_internal_balance(address):
         return 0
 
 
-def _send_signed_transaction(tx, private_key):
-    """
-    Signs a transaction and sends it.
-    Handles multiple Web3/Brownie return formats safely.
-    """
-    try:
-        signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-
-        # Extract rawTransaction from different possible structures
-        if hasattr(signed_tx, 'rawTransaction'):
-            raw_tx = signed_tx.rawTransaction
-        elif hasattr(signed_tx, 'raw_transaction'):
-            raw_tx = signed_tx.raw_transaction
-        else:
-            try:
-                raw_tx = signed_tx['rawTransaction']
-            except:
-                raw_tx = signed_tx[0]
-
-        tx_hash = web3.eth.send_raw_transaction(raw_tx)
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-        return receipt.transactionHash.hex()
+def get_tx_manager():
+    """Shared TransactionManager (local nonces, async confirmation) for this client."""
+    global _tx_manager
+    if _tx_manager is None:
+        _tx_manager = TransactionManager(get_web3())
+    return _tx_manager
 
-    except Exception as e:
-        print(f"Transaction failed: {e}")
-        raise e
 
+def get_fee_oracle():
+    """Shared FeeOracle (gas estimates per function, EIP-1559/legacy fees) for this client."""
+    global _fee_oracle
+    if _fee_oracle is None:
+        from Blockchain.fee_oracle import FeeOracle
+        _fee_oracle = FeeOracle(get_web3())
+    return _fee_oracle
 
-def create_auction(account, description, duration_minutes, min_bid):
-    #Creates a new auction on-chain.
+
+def _submit(account, fn_name, fn_call, label, on_confirmed=None, on_failed=None,
+            fresh_estimate=False):
+    """
+    Sends fn_call with oracle gas/fees (gas cached under `fn_name`, estimated on
+    every call if fresh_estimate); out-of-gas failures raise the cached limit.
+    """
+    oracle = get_fee_oracle()
+    tx_params = oracle.tx_params(fn_name, fn_call, account.address, fresh=fresh_estimate)
+
+    def failed(handle):
+        receipt = handle.receipt
+        if receipt is not None and receipt.get("gasUsed") == tx_params['gas']:
+            oracle.report_out_of_gas(fn_name, tx_params['gas'])
+        if on_failed:
+            on_failed(handle)
+
+    return get_tx_manager().submit(
+        account, fn_call, tx_params, label=label,
+        on_confirmed=on_confirmed, on_failed=failed,
+    )
+
+
+def submit_create_auction(account, description, duration_minutes, min_bid,
+                          on_confirmed=None, on_failed=None):
+    """Sends createAuction without waiting for it to be mined. Returns a TxHandle."""
+    contract = get_contract()
     if not contract:
         raise Exception("Contract offline")
 
     duration_seconds = int(duration_minutes) * 60
 
-    tx = contract.functions.createAuction(
+    fn_call = contract.functions.createAuction(
         description,
         duration_seconds,
         int(min_bid)
-    ).build_transaction({
-        'from': account.address,
-        'nonce': web3.eth.get_transaction_count(account.address),
-        'gas': 3000000,
-        'gasPrice': web3.to_wei('20', 'gwei')
-    })
+    )
+    # Gas grows with the stored description, so estimates are cached per 32-byte word count
+    gas_key = f"createAuction/{len(description.encode('utf-8')) // 32}"
+    return _submit(account, gas_key, fn_call, "createAuction", on_confirmed, on_failed)
 
-    return _send_signed_transaction(tx, account.key)
 
+def create_auction(account, description, duration_minutes, min_bid):
+    #Creates a new auction on-chain (waits until it is mined).
+    handle = submit_create_auction(account, description, duration_minutes, min_bid)
+    handle.wait()
+    return handle.tx_hash
 
-def place_bid_on_chain(account, auction_id, amount, tsa_timestamp):
-    #Places a bid on an auction (with TSA timestamp).
+
+def submit_bid(account, auction_id, amount, tsa_timestamp, on_confirmed=None, on_failed=None):
+    """
+    Sends placeBid (with TSA timestamp) and returns a TxHandle immediately;
+    on_confirmed/on_failed(handle) run on the confirmation thread.
+    """
+    contract = get_contract()
     if not contract:
         raise Exception("Contract offline")
 
-    tx = contract.functions.placeBid(
+    fn_call = contract.functions.placeBid(
         int(auction_id),
         int(amount),
         int(tsa_timestamp),
-    ).build_transaction({
-        'from': account.address,
-        'nonce': web3.eth.get_transaction_count(account.address),
-        'gas': 3000000,
-        'gasPrice': web3.to_wei('20', 'gwei'),
-        'value': 0
-    })
+    )
+    # A first bid writes three zero storage slots and costs far more than an
+    # outbid, so placeBid is estimated against the current state every time
+    return _submit(account, "placeBid", fn_call, f"placeBid #{auction_id}",
+                   on_confirmed, on_failed, fresh_estimate=True)
+
+
+def place_bid_on_chain(account, auction_id, amount, tsa_timestamp):
+    #Places a bid on an auction (with TSA timestamp) and waits until it is mined.
+    handle = submit_bid(account, auction_id, amount, tsa_timestamp)
+    handle.wait()
+    return handle.tx_hash
+
+
 
-    return _send_signed_transaction(tx, account.key)
 
+def parse_auction(auction_id, data):
+    """Maps the raw `auctions(id)` struct tuple to the dict used by the client."""
+    return {
+        "id": int(auction_id),
+        "seller": data[0],
+        "description": data[1],
+        "min_bid": data[2],
+        "close_date": data[3],
+        "highest_bid": data[4],
+        "highest_bidder": data[5],
+        "active": data[6],
+        "created_at": data[7],
+        "highest_bid_timestamp": data[8],
+    }
 
 
+def _encode_call(fn_name, args):
+    """Encodes calldata for a contract function (handles Web3 v6 and v7 naming)."""
+    contract = get_contract()
+    if hasattr(contract, "encode_abi"):
+        return contract.encode_abi(fn_name, args=args)
+    return contract.encodeABI(fn_name=fn_name, args=args)
+
+
+def _output_types(fn_name):
+    for entry in _client.abi:
+        if entry.get("type") == "function" and entry.get("name") == fn_name:
+            return [out["type"] for out in entry["outputs"]]
+    raise ValueError(f"Function {fn_name} not found in ABI")
+
+
+def batch_call(fn_name, args_list):
+    """
+    Runs the same read-only contract function for every entry in args_list
+    using JSON-RPC batch requests (one HTTP round-trip per RPC_BATCH_SIZE calls).
+    Returns the decoded results in the same order as args_list.
+    """
+    output_types = _output_types(fn_name)
+    codec = get_web3().codec
+    results = []
+
+    for start in range(0, len(args_list), RPC_BATCH_SIZE):
+        chunk = args_list[start:start + RPC_BATCH_SIZE]
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "eth_call",
+                "params": [{"to": CONTRACT_ADDRESS, "data": _encode_call(fn_name, args)}, "latest"],
+            }
+            for i, args in enumerate(chunk)
+        ]
+
+        resp = _rpc_session.post(RPC_URL, json=batch, timeout=RPC_TIMEOUT)
+        resp.raise_for_status()
+        replies = resp.json()
+        if not isinstance(replies, list):
+            raise RuntimeError(f"Node does not support batch requests: {replies}")
+
+        by_id = {r.get("id"): r for r in replies}
+        for i in range(len(chunk)):
+            reply = by_id.get(i) or {}
+            if "error" in reply or "result" not in reply:
+                raise RuntimeError(f"Batched {fn_name} call failed: {reply.get('error')}")
+            raw = bytes.fromhex(reply["result"][2:])
+            results.append(codec.decode(output_types, raw))
+
+    return results
+
 
 def get_all_auctions():
-    #Returns all auction structs.
+    #Returns all auction structs (batched: one auctionCount call + one batch per RPC_BATCH_SIZE auctions).
+    contract = get_contract()
     if not contract:
         return []
+
+    index = synced_index()
+    if index is not None:
+        return index.get_all_auctions()
+
     try:
         count = contract.functions.auctionCount().call()
-        auctions = []
+        ids = list(range(1, count + 1))
 
-        for i in range(1, count + 1):
-            data = contract.functions.auctions(i).call()
-            auctions.append({
-                "id": i,
-                "description": data[1],
-                "min_bid": data[2],
-                "close_date": data[3],
-                "highest_bid": data[4],
-                "active": data[6],
-            })
-        return auctions
+        try:
+            structs = batch_call("auctions", [[i] for i in ids])
+        except Exception as e:
+            # Fallback for providers that reject JSON-RPC batches
+            print(f"Batch fetch failed ({e}), falling back to sequential calls.")
+            structs = [contract.functions.auctions(i).call() for i in ids]
+
+        return [parse_auction(i, data) for i, data in zip(ids, structs)]
 
     except Exception as e:
         print(f"Error fetching auctions: {e}")
@@ -147,11 +408,12 @@ def get_all_auctions():
 
 def fund_new_user(target_address, amount_eth=10):
     #Sends ETH from the bank account to bootstrap new users.
+    web3 = get_web3()
     if not web3.is_connected():
         return False
     try:
         tx = web3.eth.send_transaction({
-            'from': BANK_ACCOUNT,
+            'from': _client.bank_account,
             'to': target_address,
             'value': web3.to_wei(amount_eth, 'ether')
         })
@@ -166,6 +428,7 @@ def get_current_blockchain_timestamp():
     Returns the current blockchain time as given by the timestamp
     of the latest mined block.
     """
+    web3 = get_web3()
     if not web3.is_connected():
         raise RuntimeError("Web3 not connected")
 
@@ -176,23 +439,17 @@ def get_current_blockchain_timestamp():
 
 def get_auction_details(auction_id):
     #Returns full info for a single auction, including active flag and highestBid.
+    contract = get_contract()
     if not contract:
         return None
+
+    index = synced_index()
+    if index is not None:
+        return index.get_auction_details(auction_id)
+
     try:
         data = contract.functions.auctions(int(auction_id)).call()
-
-        return {
-            "id": int(auction_id),
-            "seller": data[0],
-            "description": data[1],
-            "min_bid": data[2],
-            "close_date": data[3],
-            "highest_bid": data[4],
-            "highest_bidder": data[5],
-            "active": data[6],
-            "created_at": data[7],
-            "highest_bid_timestamp": data[8],
-        }
+        return parse_auction(auction_id, data)
     except Exception as e:
         print(f"Error fetching auction details for {auction_id}: {e}")
         return None
@@ -0,0 +1,129 @@
+import threading
+import time
+
+from web3.exceptions import ContractLogicError
+
+# Gas limit = cached estimate * margin (estimates vary with contract state)
+GAS_MARGIN = 1.3
+# Re-run eth_estimateGas for a function after this long
+GAS_ESTIMATE_TTL = 300
+# Used when the node cannot estimate (e.g. the call would revert right now)
+FALLBACK_GAS_LIMIT = 3000000
+# Min time between chain-head checks for a new base fee
+FEE_CHECK_INTERVAL = 1.0
+# Tip used when the node does not implement eth_maxPriorityFeePerGas
+DEFAULT_PRIORITY_FEE_GWEI = 1
+
+
+class FeeOracle:
+    """
+    Gas limits and fee fields for contract transactions.
+
+    - eth_estimateGas runs once per cache key; the largest estimate seen for the
+      key (times GAS_MARGIN) is reused until it expires or a transaction runs out
+      of gas. Calls whose cost depends on contract state (placeBid) pass
+      fresh=True: they are estimated every time (so reverts are reported before
+      sending) and the cached limit is only a fallback if the node cannot estimate.
+    - Fees follow EIP-1559 (maxFeePerGas / maxPriorityFeePerGas) when blocks
+      carry a baseFeePerGas, legacy gasPrice otherwise. They are recomputed at
+      most once per block, and the head is checked at most every FEE_CHECK_INTERVAL.
+    """
+
+    def __init__(self, web3, gas_margin: float = GAS_MARGIN,
+                 estimate_ttl: float = GAS_ESTIMATE_TTL,
+                 fee_check_interval: float = FEE_CHECK_INTERVAL):
+        self.web3 = web3
+        self.gas_margin = gas_margin
+        self.estimate_ttl = estimate_ttl
+        self.fee_check_interval = fee_check_interval
+
+        self._lock = threading.Lock()
+        self._gas = {}
+        self._fees = None
+        self._fee_block = None
+        self._fee_checked_at = 0.0
+        self.stats = {"gas_hits": 0, "gas_estimates": 0, "fee_refreshes": 0}
+
+    # Gas
+    def gas_limit(self, fn_name: str, fn_call, sender, value: int = 0, fresh: bool = False) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._gas.get(fn_name)
+            if not fresh and cached is not None and now - cached[1] < self.estimate_ttl:
+                self.stats["gas_hits"] += 1
+                return cached[0]
+
+        try:
+            estimate = fn_call.estimate_gas({'from': sender, 'value': value})
+        except ContractLogicError:
+            # The call reverts (e.g. bid too low): report it now instead of mining a failure
+            raise
+        except Exception as e:
+            if cached is not None:
+                return cached[0]
+            # Let the node report the failure when the transaction is mined
+            print(f"Gas estimation for {fn_name} failed ({e}), using {FALLBACK_GAS_LIMIT}.")
+            return FALLBACK_GAS_LIMIT
+
+        limit = int(estimate * self.gas_margin)
+        with self._lock:
+            self.stats["gas_estimates"] += 1
+            # Compared with the entry as it is now: another thread may have raised it meanwhile
+            current = self._gas.get(fn_name)
+            if current is not None:
+                limit = max(limit, current[0])
+            self._gas[fn_name] = (limit, now)
+        return limit
+
+    def report_out_of_gas(self, fn_name: str, gas_limit: int) -> None:
+        """A transaction used its whole limit: double it until the next estimate."""
+        with self._lock:
+            current = self._gas.get(fn_name)
+            limit = min(gas_limit * 2, FALLBACK_GAS_LIMIT)
+            if current is not None:
+                limit = max(limit, current[0])
+            self._gas[fn_name] = (limit, time.monotonic())
+
+    # Fees
+    def _compute_fees(self, block) -> dict:
+        base_fee = block.get("baseFeePerGas")
+        if base_fee is None:
+            return {'gasPrice': self.web3.eth.gas_price}
+
+        try:
+            priority_fee = self.web3.eth.max_priority_fee
+        except Exception:
+            priority_fee = self.web3.to_wei(DEFAULT_PRIORITY_FEE_GWEI, 'gwei')
+
+        # Room for the base fee to double before the transaction stops being includable
+        return {
+            'maxPriorityFeePerGas': priority_fee,
+            'maxFeePerGas': 2 * base_fee + priority_fee,
+        }
+
+    def fee_params(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            if self._fees is not None and now - self._fee_checked_at < self.fee_check_interval:
+                return dict(self._fees)
+
+        block = self.web3.eth.get_block('latest')
+        with self._lock:
+            self._fee_checked_at = now
+            if self._fees is not None and block["number"] == self._fee_block:
+                return dict(self._fees)
+
+        fees = self._compute_fees(block)
+        with self._lock:
+            self._fees = fees
+            self._fee_block = block["number"]
+            self.stats["fee_refreshes"] += 1
+        return dict(fees)
+
+    def tx_params(self, fn_name: str, fn_call, sender, value: int = 0, fresh: bool = False) -> dict:
+        """Gas + fee fields for build_transaction."""
+        return {
+            **self.fee_params(),
+            'gas': self.gas_limit(fn_name, fn_call, sender, value, fresh),
+            'value': value,
+        }
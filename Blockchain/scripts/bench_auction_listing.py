@@ -0,0 +1,136 @@
+"""
+Benchmark: sequential vs batched auction listing.
+
+Starts a small JSON-RPC stand-in for Ganache/anvil that serves `auctionCount()`
+and `auctions(uint256)` for N fake auctions (with a simulated network round-trip
+per HTTP request), then times the old one-call-per-auction loop against
+blockchain_client.get_all_auctions().
+
+Usage (from the repository root):
+    python Blockchain/scripts/bench_auction_listing.py --sizes 10 1000 10000 --rtt-ms 1
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from eth_abi import encode
+from web3 import Web3
+
+from Blockchain import blockchain_client
+
+AUCTION_TYPES = [
+    "address", "string", "uint256", "uint256", "uint256",
+    "address", "bool", "uint256", "uint256", "uint256",
+]
+SEL_COUNT = Web3.keccak(text="auctionCount()")[:4].hex().replace("0x", "")
+SEL_AUCTIONS = Web3.keccak(text="auctions(uint256)")[:4].hex().replace("0x", "")
+ZERO = "0x" + "00" * 20
+
+
+class StandInNode:
+    """Minimal JSON-RPC node answering just what the listing needs."""
+
+    def __init__(self, auction_count, rtt_ms):
+        self.auction_count = auction_count
+        self.rtt = rtt_ms / 1000.0
+        self.http_requests = 0
+
+    def _answer(self, req):
+        method = req.get("method")
+        if method == "web3_clientVersion":
+            result = "StandIn/1.0"
+        elif method == "eth_chainId":
+            result = "0x539"
+        elif method == "eth_accounts":
+            result = []
+        elif method == "eth_call":
+            data = req["params"][0]["data"].replace("0x", "")
+            if data.startswith(SEL_COUNT):
+                result = "0x" + encode(["uint256"], [self.auction_count]).hex()
+            elif data.startswith(SEL_AUCTIONS):
+                i = int(data[8:], 16)
+                values = [ZERO, f"Item {i}", 1, 2_000_000_000, i, ZERO, True, 1, 0, 0]
+                result = "0x" + encode(AUCTION_TYPES, values).hex()
+            else:
+                return {"jsonrpc": "2.0", "id": req.get("id"), "error": {"code": -32601, "message": "unknown call"}}
+        else:
+            return {"jsonrpc": "2.0", "id": req.get("id"), "error": {"code": -32601, "message": method}}
+        return {"jsonrpc": "2.0", "id": req.get("id"), "result": result}
+
+    def serve(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                node.http_requests += 1
+                time.sleep(node.rtt)
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if isinstance(body, list):
+                    reply = [node._answer(r) for r in body]
+                else:
+                    reply = node._answer(body)
+                out = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def sequential_listing():
+    c = blockchain_client.get_contract()
+    count = c.functions.auctionCount().call()
+    return [c.functions.auctions(i).call() for i in range(1, count + 1)]
+
+
+def point_client_at(url):
+    blockchain_client.connect(url)
+    blockchain_client.load_contract()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'auctions':>9} | {'sequential':>12} {'reqs':>6} | {'batched':>10} {'reqs':>5}")
+    print("-" * 54)
+
+    for n in args.sizes:
+        node = StandInNode(n, args.rtt_ms)
+        server = node.serve()
+        point_client_at(f"http://127.0.0.1:{server.server_port}")
+
+        node.http_requests = 0
+        t0 = time.perf_counter()
+        seq = sequential_listing()
+        t_seq = time.perf_counter() - t0
+        seq_reqs = node.http_requests
+
+        node.http_requests = 0
+        t0 = time.perf_counter()
+        batched = blockchain_client.get_all_auctions()
+        t_batch = time.perf_counter() - t0
+        batch_reqs = node.http_requests
+
+        assert len(seq) == len(batched) == n
+        print(f"{n:>9} | {t_seq:>10.3f} s {seq_reqs:>6} | {t_batch:>8.3f} s {batch_reqs:>5}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
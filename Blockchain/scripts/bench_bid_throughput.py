@@ -0,0 +1,104 @@
+"""
+Benchmark: bids/sec against a local dev chain (Ganache at blockchain_client.RPC_URL
+with the Auction contract deployed at CONTRACT_ADDRESS).
+
+Creates throwaway funded accounts and one auction, then places N bids three ways:
+  1. old path: get_transaction_count + fixed 3,000,000 gas / 20 gwei, wait per bid
+  2. FeeOracle gas/fees, still waiting for each receipt
+  3. FeeOracle + TransactionManager: submit every bid, then wait for all receipts
+
+Usage (from the repository root):
+    python Blockchain/scripts/bench_bid_throughput.py --bids 200 --bidders 4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from Blockchain import blockchain_client
+from Blockchain.tx_manager import raw_transaction_bytes
+
+web3 = blockchain_client.get_web3()
+
+
+def new_funded_account():
+    account = web3.eth.account.create()
+    if not blockchain_client.fund_new_user(account.address, 10):
+        raise RuntimeError("Funding from the bank account failed")
+    return account
+
+
+def legacy_place_bid(account, auction_id, amount, tsa_timestamp):
+    """The pre-oracle implementation: node nonce + fixed gas, blocking on the receipt."""
+    tx = blockchain_client.get_contract().functions.placeBid(
+        int(auction_id), int(amount), int(tsa_timestamp),
+    ).build_transaction({
+        'from': account.address,
+        'nonce': web3.eth.get_transaction_count(account.address),
+        'gas': 3000000,
+        'gasPrice': web3.to_wei('20', 'gwei'),
+        'value': 0
+    })
+    signed_tx = web3.eth.account.sign_transaction(tx, account.key)
+    tx_hash = web3.eth.send_raw_transaction(raw_transaction_bytes(signed_tx))
+    return web3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def run(label, bidders, auction_id, first_amount, n, place):
+    t0 = time.perf_counter()
+    place(bidders, auction_id, first_amount, n)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<40} {n / elapsed:>8.1f} bids/s  ({elapsed:.2f} s)")
+    return first_amount + n
+
+
+def sequential_legacy(bidders, auction_id, first_amount, n):
+    for i in range(n):
+        legacy_place_bid(bidders[i % len(bidders)], auction_id, first_amount + i, int(time.time()))
+
+
+def sequential_oracle(bidders, auction_id, first_amount, n):
+    for i in range(n):
+        blockchain_client.place_bid_on_chain(bidders[i % len(bidders)], auction_id, first_amount + i, int(time.time()))
+
+
+def pipelined_oracle(bidders, auction_id, first_amount, n):
+    handles = [
+        blockchain_client.submit_bid(bidders[i % len(bidders)], auction_id, first_amount + i, int(time.time()))
+        for i in range(n)
+    ]
+    for handle in handles:
+        handle.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bids", type=int, default=200)
+    parser.add_argument("--bidders", type=int, default=4)
+    args = parser.parse_args()
+
+    if not blockchain_client.load_contract():
+        sys.exit(f"No node/contract at {blockchain_client.RPC_URL}; start Ganache and deploy first.")
+
+    # Each bidder starts with INITIAL_BALANCE (1000) tokens and is refunded when outbid
+    if args.bids * 3 >= 1000:
+        sys.exit("Keep --bids below 333 so every bid fits in the initial token balance.")
+
+    seller = new_funded_account()
+    bidders = [new_funded_account() for _ in range(args.bidders)]
+    blockchain_client.create_auction(seller, "bench item", 60, 1)
+    auction_id = blockchain_client.get_contract().functions.auctionCount().call()
+    print(f"Auction #{auction_id}, {args.bidders} bidders, {args.bids} bids per run\n")
+
+    amount = 1
+    amount = run("fixed gas/price, wait per bid", bidders, auction_id, amount, args.bids, sequential_legacy)
+    amount = run("fee oracle, wait per bid", bidders, auction_id, amount, args.bids, sequential_oracle)
+    run("fee oracle + tx manager, pipelined", bidders, auction_id, amount, args.bids, pipelined_oracle)
+
+    print(f"\nOracle stats: {blockchain_client.get_fee_oracle().stats}")
+
+
+if __name__ == "__main__":
+    main()
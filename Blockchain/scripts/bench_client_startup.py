@@ -0,0 +1,96 @@
+"""
+Benchmark: CLI startup cost, measured with `python -X importtime`.
+
+Imports main.py (login + auction menus, and blockchain_client through them)
+in a fresh interpreter, then reports the slowest imports and checks:
+  - the import of `main` stays under --target-ms (cumulative)
+  - blockchain_client stays under --client-target-ms
+  - web3 / eth_account are not imported until the chain is first used
+
+Exits with status 1 when a target is missed, so it can be used as a check.
+
+Usage (from the repository root):
+    python Blockchain/scripts/bench_client_startup.py --runs 5 --top 15
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+STARTUP_TARGET_MS = 400
+CLIENT_TARGET_MS = 60
+# Only needed once the user touches the chain or a wallet
+DEFERRED_MODULES = ["web3", "eth_account", "eth_abi"]
+
+PROBE = (
+    "import sys, main; "
+    f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+)
+
+
+def import_times():
+    """One cold interpreter: ({module: cumulative_us}, [deferred modules that got imported])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"`import main` failed:\n{proc.stderr[-2000:]}")
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return times, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target-ms", type=float, default=STARTUP_TARGET_MS)
+    parser.add_argument("--client-target-ms", type=float, default=CLIENT_TARGET_MS)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+
+    def median_ms(name):
+        samples = [times[name] for times, _ in runs if name in times]
+        return statistics.median(samples) / 1000 if samples else None
+
+    print(f"Slowest imports (median cumulative of {args.runs} runs):")
+    names = sorted(runs[-1][0], key=lambda n: runs[-1][0][n], reverse=True)
+    for name in names[:args.top]:
+        print(f"  {median_ms(name):>9.1f} ms  {name}")
+
+    failures = []
+    main_ms = median_ms("main")
+    client_ms = median_ms("Blockchain.blockchain_client")
+    print(f"\nimport main                    {main_ms:>9.1f} ms  (target {args.target_ms:.0f} ms)")
+    if main_ms > args.target_ms:
+        failures.append("main over target")
+    if client_ms is not None:
+        print(f"import blockchain_client       {client_ms:>9.1f} ms  (target {args.client_target_ms:.0f} ms)")
+        if client_ms > args.client_target_ms:
+            failures.append("blockchain_client over target")
+
+    loaded = sorted({m for _, mods in runs for m in mods})
+    print(f"deferred modules imported      {', '.join(loaded) or 'none'}")
+    if loaded:
+        failures.append(f"{', '.join(loaded)} imported at startup")
+
+    if failures:
+        sys.exit("FAILED: " + "; ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
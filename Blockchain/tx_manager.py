@@ -0,0 +1,191 @@
+import threading
+import time
+
+# How often pending transactions are checked for a receipt
+RECEIPT_POLL_INTERVAL = 0.5
+# A transaction without a receipt after this long is reported as failed
+CONFIRM_TIMEOUT = 120
+
+
+def raw_transaction_bytes(signed_tx):
+    """Extracts the raw bytes from a signed transaction (Web3 v5/v6/v7 and Brownie formats)."""
+    if hasattr(signed_tx, 'rawTransaction'):
+        return signed_tx.rawTransaction
+    if hasattr(signed_tx, 'raw_transaction'):
+        return signed_tx.raw_transaction
+    try:
+        return signed_tx['rawTransaction']
+    except Exception:
+        return signed_tx[0]
+
+
+class TxHandle:
+    """A submitted transaction; completes when its receipt arrives (or it fails)."""
+
+    def __init__(self, tx_hash, nonce, sender, label=None):
+        self.tx_hash = tx_hash
+        self.nonce = nonce
+        self.sender = sender
+        self.label = label
+        self.submitted_at = time.monotonic()
+
+        self.status = "pending"
+        self.receipt = None
+        self.error = None
+        self._done = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def add_done_callback(self, fn) -> None:
+        """fn(handle) runs on the confirmation thread (or right away if already done)."""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def wait(self, timeout=None):
+        """Blocks until confirmed; returns the receipt or raises the failure."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Transaction {self.tx_hash} still pending")
+        if self.error is not None:
+            raise self.error
+        return self.receipt
+
+    def _finish(self, status, receipt=None, error=None) -> None:
+        with self._lock:
+            self.status = status
+            self.receipt = receipt
+            self.error = error
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"Transaction callback failed: {e}")
+
+
+class TransactionManager:
+    """
+    Submits transactions without waiting for them to be mined.
+
+    - Nonces are tracked locally per account (seeded once from the node's
+      pending count), so back-to-back transactions never reuse a nonce.
+    - submit() signs and sends, then returns a TxHandle immediately.
+    - A single background thread polls receipts for every pending handle and
+      fires its callbacks when it is mined (or reverted / timed out).
+    """
+
+    def __init__(self, web3, poll_interval: float = RECEIPT_POLL_INTERVAL,
+                 confirm_timeout: float = CONFIRM_TIMEOUT):
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.confirm_timeout = confirm_timeout
+
+        self._nonces = {}
+        self._account_locks = {}
+        self._locks_guard = threading.Lock()
+
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    # Nonces
+    def _account_lock(self, address):
+        with self._locks_guard:
+            return self._account_locks.setdefault(address, threading.Lock())
+
+    def reset_nonce(self, address) -> None:
+        """Forgets the local nonce; the next submit re-reads it from the node."""
+        with self._account_lock(address):
+            self._nonces.pop(address, None)
+
+    # Submission
+    def submit(self, account, fn_call, tx_params, label=None,
+               on_confirmed=None, on_failed=None) -> TxHandle:
+        """
+        Builds fn_call (a bound contract function) with tx_params plus the next
+        local nonce, signs it with `account` and sends it. Does not wait for mining.
+        """
+        address = account.address
+        with self._account_lock(address):
+            nonce = self._nonces.get(address)
+            if nonce is None:
+                nonce = self.web3.eth.get_transaction_count(address, 'pending')
+
+            try:
+                tx = fn_call.build_transaction({**tx_params, 'from': address, 'nonce': nonce})
+                signed_tx = self.web3.eth.account.sign_transaction(tx, account.key)
+                tx_hash = self.web3.eth.send_raw_transaction(raw_transaction_bytes(signed_tx))
+            except Exception:
+                # The node may disagree with our nonce (e.g. a tx sent elsewhere): resync next time
+                self._nonces.pop(address, None)
+                raise
+
+            self._nonces[address] = nonce + 1
+
+        handle = TxHandle(self.web3.to_hex(tx_hash), nonce, address, label)
+
+        def dispatch(h):
+            callback = on_confirmed if h.status == "confirmed" else on_failed
+            if callback:
+                callback(h)
+
+        handle.add_done_callback(dispatch)
+
+        with self._pending_lock:
+            self._pending.append((handle, tx_hash))
+            self._ensure_thread()
+        self._wakeup.set()
+        return handle
+
+    # Confirmation
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._confirm_loop, daemon=True)
+            self._thread.start()
+
+    def _confirm_loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+            with self._pending_lock:
+                pending = list(self._pending)
+            if not pending:
+                continue
+
+            finished = []
+            for handle, tx_hash in pending:
+                try:
+                    receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+                except Exception:
+                    # Not mined yet (TransactionNotFound) or a transient RPC error
+                    receipt = None
+
+                if receipt is not None:
+                    if receipt.get("status", 1) == 1:
+                        handle._finish("confirmed", receipt)
+                    else:
+                        handle._finish("failed", receipt, RuntimeError(f"Transaction {handle.tx_hash} reverted"))
+                    finished.append(handle)
+                elif time.monotonic() - handle.submitted_at > self.confirm_timeout:
+                    # Possibly dropped by the node: later nonces would queue behind it
+                    self.reset_nonce(handle.sender)
+                    handle._finish("failed", error=TimeoutError(f"Transaction {handle.tx_hash} not mined in time"))
+                    finished.append(handle)
+
+            if finished:
+                with self._pending_lock:
+                    self._pending = [p for p in self._pending if p[0] not in finished]
+
+    def pending_count(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
@@ -2,55 +2,39 @@ import json
 import os
 import time
 import base64
-import datetime
 
-import jwt
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from cryptography.hazmat.primitives import serialization, hashes
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.x509 import load_pem_x509_certificate
 from cryptography.hazmat.backends import default_backend
 
 from certs.models import UserCertificate, CACertificate
 from core.config import CA_KEY_PATH
+from core.jwt_signer import JWTSigner
 
 
 # In-memory map username -> {nonce, timestamp} for challenge-response login
 PENDING_CHALLENGES = {}
 
+# CA key is parsed once per process (reloaded if the key file changes)
+JWT_SIGNER = JWTSigner(CA_KEY_PATH)
+
 
 def generate_jwt(username: str) -> str | None:
     """
-    Generate a JWT signed with the CA private key.
+    Generate a JWT signed with the CA private key (cached by JWT_SIGNER).
 
     Returns:
         Encoded JWT (str) or None if signing fails.
     """
     try:
-        if not os.path.exists(CA_KEY_PATH):
-            print(f"[CRITICAL] CA private key file not found at: {CA_KEY_PATH}")
+        if not os.path.exists(JWT_SIGNER.key_path):
+            print(f"[CRITICAL] CA private key file not found at: {JWT_SIGNER.key_path}")
             return None
 
-        with open(CA_KEY_PATH, "rb") as f:
-            private_key_data = f.read()
-
-        private_key = serialization.load_pem_private_key(
-            private_key_data,
-            password=None,
-            backend=default_backend(),
-        )
-
-        now = datetime.datetime.utcnow()
-        payload = {
-            "sub": username,
-            "exp": now + datetime.timedelta(minutes=60),
-            "iat": now,
-            "type": "p2p_access",
-        }
-
-        token = jwt.encode(payload, private_key, algorithm="RS256")
-        return token
+        return JWT_SIGNER.sign(username)
     except Exception as e:
         print(f"[JWT ERROR] Failed to generate token: {e}")
         return None
@@ -0,0 +1,121 @@
+"""
+Benchmark: login throughput (challenge + login_secure) with and without the cached JWT signer.
+
+Runs the real Django views against an in-memory SQLite stand-in for Postgres,
+with a throwaway CA key, so it does not touch the real database or CA storage.
+
+Usage (from CA_Server/):
+    python bench_login.py --users 200
+"""
+import argparse
+import base64
+import datetime
+import json
+import os
+import tempfile
+import time
+
+import django
+from django.conf import settings
+
+settings.configure(
+    DEBUG=False,
+    SECRET_KEY="bench",
+    INSTALLED_APPS=["django.contrib.contenttypes", "certs", "api"],
+    DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+    DEFAULT_AUTO_FIELD="django.db.models.BigAutoField",
+    USE_TZ=True,
+)
+django.setup()
+
+from django.core.management import call_command
+from django.test import RequestFactory
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.x509.oid import NameOID
+
+from certs.models import UserCertificate
+from core.jwt_signer import JWTSigner
+from api import views
+
+
+def make_user(username: str):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, username)])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    UserCertificate.objects.create(
+        username=username,
+        certificate_pem=cert.public_bytes(serialization.Encoding.PEM).decode(),
+        serial_number=str(cert.serial_number),
+    )
+    return key
+
+
+def write_ca_key(path: str):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+
+
+def login(factory, username, key):
+    r = views.request_challenge(factory.post(
+        "/api/challenge", json.dumps({"username": username}), content_type="application/json"
+    ))
+    nonce = base64.b64decode(json.loads(r.content)["nonce"])
+    sig = key.sign(nonce, padding.PKCS1v15(), hashes.SHA256())
+    r = views.login_secure(factory.post(
+        "/api/login_secure",
+        json.dumps({"username": username, "signature": base64.b64encode(sig).decode()}),
+        content_type="application/json",
+    ))
+    assert r.status_code == 200, r.content
+
+
+def run(label, users, factory, per_login_signer):
+    t0 = time.perf_counter()
+    for username, key in users:
+        if per_login_signer:
+            # Old behaviour: key file read and parsed on every login
+            views.JWT_SIGNER = JWTSigner(views.JWT_SIGNER.key_path)
+        login(factory, username, key)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<28} {len(users) / elapsed:>10.1f} logins/s  ({elapsed:.3f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+    key_path = os.path.join(tempfile.mkdtemp(), "bench_ca_key.pem")
+    write_ca_key(key_path)
+    views.JWT_SIGNER = JWTSigner(key_path)
+
+    print(f"Creating {args.users} users...")
+    users = [(f"user{i}", make_user(f"user{i}")) for i in range(args.users)]
+    factory = RequestFactory()
+
+    run("before (key parsed per login)", users, factory, per_login_signer=True)
+    views.JWT_SIGNER = JWTSigner(key_path)
+    run("after (cached JWTSigner)", users, factory, per_login_signer=False)
+
+
+if __name__ == "__main__":
+    main()
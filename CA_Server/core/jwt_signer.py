@@ -0,0 +1,51 @@
+import datetime
+import os
+import threading
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.backends import default_backend
+
+
+class JWTSigner:
+    """
+    Signs access tokens with the CA private key.
+
+    The key is parsed once per process and only re-read when the key file's
+    mtime changes (e.g. the CA key was regenerated), instead of on every login.
+    """
+
+    def __init__(self, key_path: str, lifetime_minutes: int = 60):
+        self.key_path = key_path
+        self.lifetime_minutes = lifetime_minutes
+        self._lock = threading.Lock()
+        self._private_key = None
+        self._mtime = None
+
+    def _current_key(self):
+        mtime = os.stat(self.key_path).st_mtime
+        if self._private_key is not None and mtime == self._mtime:
+            return self._private_key
+
+        with self._lock:
+            if self._private_key is None or mtime != self._mtime:
+                with open(self.key_path, "rb") as f:
+                    self._private_key = serialization.load_pem_private_key(
+                        f.read(),
+                        password=None,
+                        backend=default_backend(),
+                    )
+                self._mtime = mtime
+                print(f"[JWT] CA private key loaded from {self.key_path}")
+            return self._private_key
+
+    def sign(self, username: str) -> str:
+        """Returns an RS256 p2p_access token for `username`."""
+        now = datetime.datetime.utcnow()
+        payload = {
+            "sub": username,
+            "exp": now + datetime.timedelta(minutes=self.lifetime_minutes),
+            "iat": now,
+            "type": "p2p_access",
+        }
+        return jwt.encode(payload, self._current_key(), algorithm="RS256")
@@ -1,9 +1,8 @@
-import requests
 import base64
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 
-AUTH_URL = "http://127.0.0.1:8000/api"
+from Login_Client import transport
 
 
 def login_secure(username, private_key_path):
@@ -15,7 +14,7 @@ def login_secure(username, private_key_path):
     # --- PHASE 1: REQUEST CHALLENGE ---
     try:
         print(" [AUTH] Step 1: Requesting challenge...")
-        r = requests.post(f"{AUTH_URL}/challenge", json={"username": username})
+        r = transport.post("auth", "/challenge", json={"username": username})
         r.raise_for_status()
 
         nonce = base64.b64decode(r.json()['nonce'])
@@ -49,7 +48,7 @@ def login_secure(username, private_key_path):
     try:
         print(" [AUTH] Step 3: Sending proof to server...")
 
-        r = requests.post(f"{AUTH_URL}/login_secure", json={
+        r = transport.post("auth", "/login_secure", json={
             "username": username,
             "signature": sig_b64
         })
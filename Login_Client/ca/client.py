@@ -1,16 +1,13 @@
-import requests
-
-CA_SIGN_URL = "http://127.0.0.1:5001/sign_csr"
-CA_CERT_URL = "http://127.0.0.1:5001/ca_cert"
+from Login_Client import transport
 
 def request_certificate(csr_pem: str) -> str:
-    resp = requests.post(CA_SIGN_URL, json={"csr": csr_pem})
+    resp = transport.post("ca", "/sign_csr", json={"csr": csr_pem})
     if resp.status_code != 200:
         raise Exception("CA Error: " + resp.text)
     return resp.text
 
 def fetch_ca_certificate() -> str:
-    resp = requests.get(CA_CERT_URL)
+    resp = transport.get("ca", "/ca_cert")
     if resp.status_code != 200:
         raise Exception("Could not fetch CA certificate")
     return resp.text
@@ -0,0 +1,103 @@
+"""
+Session keyring.
+
+Keeps PBKDF2-derived keys (and values unlocked with them, e.g. the wallet
+account) in memory for the login session, so a password typed again for the
+same file does not cost another 100 000-iteration derivation.
+
+- Entries are looked up by HMAC(session secret, salt + password); the password
+  itself is never stored.
+- An entry unused for `idle_timeout` seconds is dropped.
+- wipe() forgets everything (called on logout). Derived keys are held in
+  bytearrays and zeroed; copies already handed out cannot be, so this is best effort.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+PBKDF2_ITERATIONS = 100_000
+# Seconds an unused entry stays unlocked
+SESSION_IDLE_TIMEOUT = 15 * 60
+
+
+def pbkdf2_fernet_key(password: str, salt: bytes) -> bytes:
+    """The wallet/pseudonym key: PBKDF2-HMAC-SHA256, 32 bytes, urlsafe base64 (Fernet format)."""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=PBKDF2_ITERATIONS,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+
+
+class SessionKeyring:
+    def __init__(self, idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._secret = os.urandom(32)
+        # (kind, lookup id) -> [value, last_used]
+        self._entries = {}
+        self.stats = {"derivations": 0, "hits": 0}
+
+    def _lookup_id(self, password: str, salt: bytes) -> bytes:
+        return hmac.new(self._secret, salt + b"\0" + password.encode(), hashlib.sha256).digest()
+
+    def _prune(self, now: float) -> None:
+        expired = [k for k, (_, used) in self._entries.items() if now - used > self.idle_timeout]
+        for k in expired:
+            self._forget(k)
+
+    def _forget(self, entry_key) -> None:
+        value, _ = self._entries.pop(entry_key)
+        if isinstance(value, bytearray):
+            value[:] = bytes(len(value))
+
+    def cached(self, kind: str, password: str, salt: bytes, factory):
+        """
+        Value for (kind, password, salt): factory() on the first call, the stored
+        value afterwards. Nothing is stored if factory raises.
+        """
+        entry_key = (kind, self._lookup_id(password, salt))
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                entry[1] = now
+                self.stats["hits"] += 1
+                return entry[0]
+
+        value = factory()
+        with self._lock:
+            self._entries[entry_key] = [value, time.monotonic()]
+        return value
+
+    def derive_key(self, password: str, salt: bytes) -> bytes:
+        """pbkdf2_fernet_key(password, salt), derived at most once per session entry."""
+        def derive():
+            with self._lock:
+                self.stats["derivations"] += 1
+            return bytearray(pbkdf2_fernet_key(password, salt))
+
+        return bytes(self.cached("pbkdf2", password, salt, derive))
+
+    def wipe(self) -> None:
+        """Forgets every key and unlocked value (logout)."""
+        with self._lock:
+            for entry_key in list(self._entries):
+                self._forget(entry_key)
+            self._secret = os.urandom(32)
+
+
+KEYRING = SessionKeyring()
+
+
+def wipe_session() -> None:
+    KEYRING.wipe()
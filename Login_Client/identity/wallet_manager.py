@@ -1,23 +1,17 @@
 import base64
 import os
-from eth_account import Account
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from Login_Client.identity.keyring import KEYRING
 
 
 def _derive_key(password: str, salt: bytes) -> bytes:
     """
 Derives a secure 32-byte key from the password.
-Uses PBKDF2HMAC with 100,000 iterations to resist brute-force attacks.
+Uses PBKDF2HMAC with 100,000 iterations to resist brute-force attacks;
+the session keyring runs it once per (password, salt).
 """
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100_000,
-    )
-    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+    return KEYRING.derive_key(password, salt)
 
 
 def create_encrypted_wallet(password: str):
@@ -26,6 +20,8 @@ Generates a new Ethereum account an encrypts the private key.
 Returns: Address (str) and Encrypted Data (str).
 """
 
+    from eth_account import Account  # heavy import, only needed once a wallet is used
+
     new_account = Account.create()
     private_key_hex = new_account.key.hex()
 
@@ -59,14 +55,19 @@ Loads and decrypts the wallet file to retrieve the Ethereum account.
         salt_b64, token = data.split(".")
         salt = base64.urlsafe_b64decode(salt_b64)
 
-        # Derive Key
-        key = _derive_key(password, salt)
-        f = Fernet(key)
+        def unlock():
+            # Derive Key
+            key = _derive_key(password, salt)
+            f = Fernet(key)
+
+            # Decrypt Private Key
+            private_key_hex = f.decrypt(token.encode()).decode()
 
-        # Decrypt Private Key
-        private_key_hex = f.decrypt(token.encode()).decode()
+            from eth_account import Account
+            return Account.from_key(private_key_hex)
 
-        return Account.from_key(private_key_hex)
+        # The unlocked account stays in the session keyring (same idle timeout as keys)
+        return KEYRING.cached(f"wallet:{file_path}", password, salt + token.encode(), unlock)
 
     except Exception:
 
@@ -1,9 +1,12 @@
 import socketio
 import threading
-import requests
+
+from Login_Client import transport
 
 GLOBAL_SESSION_TOKEN = None
-TRACKER_WS_URL = "http://127.0.0.1:5555"
+TRACKER_WS_URL = transport.SERVICE_URLS["tracker"]
+# Max time to wait for the tracker's ack of a WebSocket broadcast/direct message
+WS_ACK_TIMEOUT = 6
 
 
 def set_global_token(token: str) -> None:
@@ -22,6 +25,9 @@ class P2PTrackerClient:
         self.refresh_callback = None
         self.direct_handler = None
 
+        # Auction rooms joined on the tracker (re-joined after re-authentication)
+        self.joined_auctions = set()
+
         @self.sio.on("connect")
         def on_connect():
             pass
@@ -34,6 +40,8 @@ class P2PTrackerClient:
         def on_status(data):
             if data.get("message") == "Authenticated":
                 self.is_authenticated = True
+                for auction_id in list(self.joined_auctions):
+                    self.sio.emit("join_auction", {"auction_id": str(auction_id)})
 
         @self.sio.on("new_event")
         def on_new_event(data):
@@ -77,18 +85,68 @@ class P2PTrackerClient:
         return True
 
 
+    # Auction rooms (NEW_BID events are only delivered to the auction's room)
+    def join_auction(self, auction_id: int) -> None:
+        """Subscribe to the tracker room of an auction."""
+        self.joined_auctions.add(str(auction_id))
+        try:
+            self.sio.emit("join_auction", {"auction_id": str(auction_id)})
+        except Exception:
+            pass
+
+    def leave_auction(self, auction_id: int) -> None:
+        """Unsubscribe from the tracker room of an auction."""
+        self.joined_auctions.discard(str(auction_id))
+        try:
+            self.sio.emit("leave_auction", {"auction_id": str(auction_id)})
+        except Exception:
+            pass
+
+
+    # WebSocket request/ack (the socket is already authenticated, no JWT per message)
+    def _ws_call(self, event: str, data: dict):
+        """
+        Emit an event and wait for the tracker's ack.
+        Returns the ack dict, or None if the socket cannot be used (caller falls back to HTTP).
+        """
+        if not self.is_authenticated or not self.sio.connected:
+            return None
+
+        try:
+            ack = self.sio.call(event, data, timeout=WS_ACK_TIMEOUT)
+        except socketio.exceptions.TimeoutError:
+            # The message may still be delivered: do not resend it over HTTP
+            return {"status_code": 504, "error": "Tracker ack timeout"}
+        except Exception:
+            return None
+
+        if not isinstance(ack, dict) or ack.get("status_code") == 403:
+            return None
+        return ack
+
+
     # Public broadcast
     def broadcast_event(self, message_type: str, payload: dict) -> None:
         """
         Send a broadcast event to the tracker.
-        Tracker validates the token and rebroadcasts to all peers.
+        Uses the authenticated WebSocket; HTTP (token in body) is only the fallback.
         """
+        ack = self._ws_call("broadcast", {
+            "payload": {
+                "type": message_type,
+                "data": payload,
+            },
+        })
+        if ack is not None:
+            return
+
         if not GLOBAL_SESSION_TOKEN:
             return
 
         try:
-            requests.post(
-                f"{TRACKER_WS_URL}/broadcast",
+            transport.post(
+                "tracker",
+                "/broadcast",
                 json={
                     "token": GLOBAL_SESSION_TOKEN,
                     "payload": {
@@ -106,8 +164,9 @@ class P2PTrackerClient:
     def associate_pseudonym(self, auction_id: int, pseudonym_id: str) -> None:
         """Tell the tracker that pseudonym_id belongs to this peer for a given auction."""
         try:
-            requests.post(
-                f"{TRACKER_WS_URL}/associate_pseudonym",
+            transport.post(
+                "tracker",
+                "/associate_pseudonym",
                 json={
                     "auction_id": str(auction_id),
                     "pseudonym": pseudonym_id,
@@ -123,8 +182,9 @@ class P2PTrackerClient:
     def resolve_winner(self, auction_id: int, pseudonym_id: str):
         """Ask the tracker which peer_id owns the given pseudonym for an auction."""
         try:
-            resp = requests.post(
-                f"{TRACKER_WS_URL}/resolve",
+            resp = transport.post(
+                "tracker",
+                "/resolve",
                 json={
                     "auction_id": str(auction_id),
                     "pseudonym": pseudonym_id,
@@ -141,12 +201,17 @@ class P2PTrackerClient:
     # Direct peer-to-peer messaging
     def send_direct(self, peer_id: str, payload: dict) -> bool:
 
+        ack = self._ws_call("direct", {"peer_id": peer_id, "payload": payload})
+        if ack is not None:
+            return ack.get("status_code") == 200
+
         if not GLOBAL_SESSION_TOKEN:
             return False
 
         try:
-            resp = requests.post(
-                f"{TRACKER_WS_URL}/direct",
+            resp = transport.post(
+                "tracker",
+                "/direct",
                 json={
                     "token": GLOBAL_SESSION_TOKEN,
                     "peer_id": peer_id,
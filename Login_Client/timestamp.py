@@ -1,19 +1,76 @@
 import base64
 import hashlib
-import requests
+import threading
 from datetime import datetime, timezone
 from cryptography import x509
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding, rsa
 
-TSA_URL = "http://localhost:7100/timestamp"
-TSA_CERT_URL = "http://localhost:7100/tsa_cert"
+from Login_Client import transport
+
+# Signature algorithms we accept from the TSA, most preferred first
+PREFERRED_TSA_ALGORITHMS = ["ed25519", "rsa-pss-sha256"]
+
+# Parsed TSA public keys by certificate fingerprint (sha256 of the DER cert, hex)
+_TSA_KEYS = {}
+_TSA_KEYS_LOCK = threading.Lock()
 
 def sha256_bytes(data: bytes) -> bytes:
     h = hashlib.sha256()
     h.update(data)
     return h.digest()
 
+def merkle_root_from_proof(token: dict, digest_bytes: bytes) -> bytes:
+    """Recomputes the batch Merkle root from a token's leaf data and inclusion proof."""
+    node = hashlib.sha256(
+        b"\x00" + digest_bytes + token["nonce"].encode() + token["serial"].encode()
+    ).digest()
+
+    for step in token["merkle_path"]:
+        sibling = base64.b64decode(step["hash_b64"])
+        if step["side"] == "left":
+            node = hashlib.sha256(b"\x01" + sibling + node).digest()
+        elif step["side"] == "right":
+            node = hashlib.sha256(b"\x01" + node + sibling).digest()
+        else:
+            raise ValueError(f"Invalid Merkle path side: {step['side']}")
+    return node
+
+def _load_tsa_cert(cert_pem: str) -> tuple:
+    """Parses a TSA certificate PEM. Returns (fingerprint, public_key)."""
+    cert = x509.load_pem_x509_certificate(cert_pem.encode())
+    fp = hashlib.sha256(cert.public_bytes(serialization.Encoding.DER)).hexdigest()
+    return fp, cert.public_key()
+
+def get_tsa_public_key(fp: str = None, cert_pem: str = None):
+    """
+    Returns the TSA public key for a certificate fingerprint.
+    The certificate is fetched from /tsa_cert (or taken from `cert_pem`, for tokens
+    issued before fingerprints) and parsed only once per process.
+    """
+    if fp is None and cert_pem is None:
+        raise ValueError("Token carries no TSA certificate reference")
+    if fp is None:
+        # Legacy token with an embedded PEM: cache it under a digest of the text
+        fp = "pem:" + hashlib.sha256(cert_pem.encode()).hexdigest()
+
+    key = _TSA_KEYS.get(fp)
+    if key is not None:
+        return key
+
+    if cert_pem is None:
+        resp = transport.get("tsa", "/tsa_cert", params={"fp": fp})
+        resp.raise_for_status()
+        cert_pem = resp.text
+
+    cert_fp, key = _load_tsa_cert(cert_pem)
+    if not fp.startswith("pem:") and cert_fp != fp:
+        raise ValueError("TSA certificate does not match the requested fingerprint")
+
+    with _TSA_KEYS_LOCK:
+        _TSA_KEYS[fp] = key
+    return key
+
 def verify_tsa_token(token: dict, original_data: bytes):
     """Verifies the TSA signature just to confirm TSA is working."""
     digest_b64 = token["digest_b64"]
@@ -23,58 +80,95 @@ def verify_tsa_token(token: dict, original_data: bytes):
         print("Digest mismatch! TSA token does not match original data.")
         return False
 
-    tsa_cert_pem = token["tsa_cert_pem"]
-    tsa_cert = x509.load_pem_x509_certificate(tsa_cert_pem.encode())
-    pubkey = tsa_cert.public_key()
+    try:
+        pubkey = get_tsa_public_key(token.get("tsa_cert_fp"), token.get("tsa_cert_pem"))
+    except Exception as e:
+        print("Could not obtain the TSA certificate:", e)
+        return False
 
     timestamp_iso = token["timestamp"]
-    nonce = token["nonce"]
-    serial = token["serial"]
 
-    full_token_bytes = (
-        digest_bytes
-        + timestamp_iso.encode()
-        + nonce.encode()
-        + serial.encode()
-    )
+    if token.get("mode") == "merkle":
+        # Batched token: the signature covers the Merkle root, the proof links our digest to it
+        try:
+            root = merkle_root_from_proof(token, digest_bytes)
+        except Exception as e:
+            print("TSA Merkle proof is malformed:", e)
+            return False
+
+        if root != base64.b64decode(token["merkle_root_b64"]):
+            print("TSA Merkle proof does not lead to the signed root.")
+            return False
+
+        full_token_bytes = (
+            b"merkle"
+            + root
+            + timestamp_iso.encode()
+            + token["batch_id"].encode()
+        )
+    else:
+        nonce = token["nonce"]
+        serial = token["serial"]
+
+        full_token_bytes = (
+            digest_bytes
+            + timestamp_iso.encode()
+            + nonce.encode()
+            + serial.encode()
+        )
 
     signature = base64.b64decode(token["signature_b64"])
+    # Tokens from before algorithm negotiation are always RSA-PSS
+    sig_alg = token.get("sig_alg", "rsa-pss-sha256")
 
     try:
-        pubkey.verify(
-            signature,
-            full_token_bytes,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH,
-            ),
-            hashes.SHA256(),
-        )
+        if sig_alg == "ed25519" and isinstance(pubkey, ed25519.Ed25519PublicKey):
+            pubkey.verify(signature, full_token_bytes)
+        elif sig_alg == "rsa-pss-sha256" and isinstance(pubkey, rsa.RSAPublicKey):
+            pubkey.verify(
+                signature,
+                full_token_bytes,
+                padding.PSS(
+                    mgf=padding.MGF1(hashes.SHA256()),
+                    salt_length=padding.PSS.MAX_LENGTH,
+                ),
+                hashes.SHA256(),
+            )
+        else:
+            print(f"TSA token algorithm {sig_alg} does not match the TSA certificate key.")
+            return False
         print("TSA signature verified successfully!")
         return True
     except Exception as e:
         print("TSA signature verification failed:", e)
         return False
 
-def request_timestamp(data: bytes) -> dict:
+def request_timestamp(data: bytes, batched: bool = False) -> dict:
+    """
+    Requests a TSA token for `data`.
+    With batched=True the TSA aggregates concurrent requests into one
+    Merkle-tree signature (cheaper under load, a few ms extra latency).
+    """
     digest = sha256_bytes(data)
     digest_b64 = base64.b64encode(digest).decode()
 
     payload = {
         "digest_b64": digest_b64,
         "digest_algo": "sha256",
+        "sig_algs": PREFERRED_TSA_ALGORITHMS,
     }
 
-    resp = requests.post(TSA_URL, json=payload)
+    path = "/timestamp_batch" if batched else "/timestamp"
+    resp = transport.post("tsa", path, json=payload)
     resp.raise_for_status()
     return resp.json()
 
 
-def request_timestamp_unix(data: bytes) -> tuple[int, dict]:
+def request_timestamp_unix(data: bytes, batched: bool = False) -> tuple[int, dict]:
     """
     Requests a timestamp token from the TSA server for the given data.
     """
-    token = request_timestamp(data)
+    token = request_timestamp(data, batched=batched)
 
     ts_str = token["timestamp"]
     dt = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
@@ -0,0 +1,70 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Base URL of every service the client talks to
+SERVICE_URLS = {
+    "tracker": "http://127.0.0.1:5555",
+    "tsa": "http://127.0.0.1:7100",
+    "ca": "http://127.0.0.1:5001",
+    "auth": "http://127.0.0.1:8000/api",
+}
+
+# Default (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (2, 5)
+
+# Connection errors are always retried (the request never reached the server);
+# 502/503/504 answers are only retried for idempotent methods (GET), never for POST.
+RETRY_POLICY = Retry(
+    total=3,
+    connect=3,
+    read=0,
+    status=2,
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    raise_on_status=False,
+)
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(service: str) -> requests.Session:
+    """Returns the pooled keep-alive session for a service (created on first use)."""
+    session = _SESSIONS.get(service)
+    if session is not None:
+        return session
+
+    with _SESSIONS_LOCK:
+        if service not in _SESSIONS:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=RETRY_POLICY)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSIONS[service] = session
+        return _SESSIONS[service]
+
+
+def service_url(service: str, path: str) -> str:
+    return SERVICE_URLS[service] + path
+
+
+def get(service: str, path: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session(service).get(service_url(service, path), **kwargs)
+
+
+def post(service: str, path: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session(service).post(service_url(service, path), **kwargs)
+
+
+def close_all() -> None:
+    """Closes every pooled connection (e.g. on logout/exit)."""
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
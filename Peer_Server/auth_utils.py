@@ -1,31 +1,148 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
 import jwt
 import requests
+from eventlet import tpool
+from cryptography.hazmat.primitives import serialization
 from cryptography.x509 import load_pem_x509_certificate
 from cryptography.hazmat.backends import default_backend
 
 CA_API_URL = "http://127.0.0.1:8000/api/get_ca_cert/"
 CA_PUBLIC_KEY_CACHE = None
+CA_REQUEST_TIMEOUT = 3
+
+# Background refresh of the CA key (picks up key rotation without a restart)
+CA_KEY_REFRESH_SECONDS = 300
+# Min interval between forced refreshes triggered by a bad signature
+CA_KEY_FORCED_REFRESH_SECONDS = 30
+
+# Verified JWT cache: sha256(token) -> (subject, exp)
+JWT_CACHE_MAX_ENTRIES = 4096
+JWT_CACHE = OrderedDict()
+JWT_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0, "key_rotations": 0}
+
+_AUTH_LOCK = threading.Lock()
+_last_forced_refresh = 0.0
 
-def fetch_ca_public_key():
+
+def _key_fingerprint(public_key) -> bytes:
+    return public_key.public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+
+
+def fetch_ca_public_key(force: bool = False):
     global CA_PUBLIC_KEY_CACHE
-    if CA_PUBLIC_KEY_CACHE:
+    if CA_PUBLIC_KEY_CACHE and not force:
         return CA_PUBLIC_KEY_CACHE
     try:
-        response = requests.post(CA_API_URL, json={})
+        response = requests.post(CA_API_URL, json={}, timeout=CA_REQUEST_TIMEOUT)
         if response.status_code == 200:
             cert_pem = response.json().get("certificate_pem")
             cert = load_pem_x509_certificate(cert_pem.encode(), default_backend())
-            CA_PUBLIC_KEY_CACHE = cert.public_key()
-            return CA_PUBLIC_KEY_CACHE
-    except:
-        return None
+            new_key = cert.public_key()
+
+            with _AUTH_LOCK:
+                old_key = CA_PUBLIC_KEY_CACHE
+                if old_key is not None and _key_fingerprint(old_key) != _key_fingerprint(new_key):
+                    # Tokens verified with the old key must be checked again
+                    JWT_CACHE.clear()
+                    JWT_CACHE_STATS["key_rotations"] += 1
+                    print("[AUTH] CA key rotated, JWT cache cleared.")
+                CA_PUBLIC_KEY_CACHE = new_key
+        return CA_PUBLIC_KEY_CACHE
+    except Exception as e:
+        print(f"[AUTH] Failed to fetch CA public key: {e}")
+        return CA_PUBLIC_KEY_CACHE
+
+
+# The tracker does not monkey-patch, so requests would block the eventlet hub:
+# fetches triggered by a request run in eventlet's native thread pool instead.
+def _fetch_ca_public_key_off_hub(force: bool = False):
+    return tpool.execute(fetch_ca_public_key, force)
+
+
+# Periodically re-fetch the CA key in a daemon thread.
+def start_ca_key_refresher(interval: float = CA_KEY_REFRESH_SECONDS) -> None:
+    def refresh_loop():
+        while True:
+            time.sleep(interval)
+            fetch_ca_public_key(force=True)
+
+    threading.Thread(target=refresh_loop, daemon=True).start()
+
+
+def _cached_subject(digest: str):
+    with _AUTH_LOCK:
+        entry = JWT_CACHE.get(digest)
+        if entry is None:
+            JWT_CACHE_STATS["misses"] += 1
+            return None
+
+        subject, exp = entry
+        if time.time() >= exp:
+            JWT_CACHE.pop(digest, None)
+            JWT_CACHE_STATS["misses"] += 1
+            return None
+
+        JWT_CACHE.move_to_end(digest)
+        JWT_CACHE_STATS["hits"] += 1
+        return subject
+
+
+def _cache_subject(digest: str, subject: str, exp: float) -> None:
+    with _AUTH_LOCK:
+        JWT_CACHE[digest] = (subject, exp)
+        JWT_CACHE.move_to_end(digest)
+        while len(JWT_CACHE) > JWT_CACHE_MAX_ENTRIES:
+            JWT_CACHE.popitem(last=False)
+            JWT_CACHE_STATS["evictions"] += 1
+
+
+def _decode(token, public_key):
+    return jwt.decode(token, public_key, algorithms=["RS256"], options={"require": ["exp", "sub"]})
+
 
 def validate_token(token):
-    public_key = fetch_ca_public_key()
+    global _last_forced_refresh
+    if not token or not isinstance(token, str):
+        return None
+
+    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    subject = _cached_subject(digest)
+    if subject is not None:
+        return subject
+
+    public_key = CA_PUBLIC_KEY_CACHE or _fetch_ca_public_key_off_hub()
     if not public_key:
         return None
     try:
-        payload = jwt.decode(token, public_key, algorithms=["RS256"])
+        try:
+            payload = _decode(token, public_key)
+        except jwt.InvalidSignatureError:
+            # Maybe the CA key was rotated: refresh once (rate-limited) and retry
+            now = time.time()
+            if now - _last_forced_refresh < CA_KEY_FORCED_REFRESH_SECONDS:
+                return None
+            _last_forced_refresh = now
+            public_key = _fetch_ca_public_key_off_hub(force=True)
+            payload = _decode(token, public_key)
+
+        _cache_subject(digest, payload["sub"], float(payload["exp"]))
         return payload["sub"]
     except:
         return None
+
+
+# Counters for the verified JWT cache.
+def get_jwt_cache_stats() -> dict:
+    with _AUTH_LOCK:
+        return {
+            **JWT_CACHE_STATS,
+            "size": len(JWT_CACHE),
+            "max_entries": JWT_CACHE_MAX_ENTRIES,
+        }
@@ -0,0 +1,69 @@
+"""
+Benchmark: GET /peers cost with many registered peers.
+
+Compares the previous implementation (scan PEERS and rebuild + serialize the
+list on every call) with the incremental active index and cached JSON
+snapshot in state.py, both with an unchanged peer set and with a heartbeat
+between calls (which only invalidates the snapshot when the set changes).
+
+Usage (from Peer_Server/):
+    python bench_peer_index.py --peers 5000 --calls 2000
+"""
+import argparse
+import json
+import time
+
+import state
+
+
+def scan_active_peers():
+    """The pre-index get_active_peers + jsonify body."""
+    now = time.time()
+    return json.dumps([
+        {"peer_id": pid, "host": info["host"], "port": info["port"]}
+        for pid, info in state.PEERS.items()
+        if now - info["last_seen"] < state.TIMEOUT_SECONDS
+    ])
+
+
+def run(label, calls, fn, between=None):
+    t0 = time.perf_counter()
+    for i in range(calls):
+        if between:
+            between(i)
+        fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<45} {elapsed / calls * 1e6:>10.1f} us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--peers", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    for i in range(args.peers):
+        state.register_peer(f"peer-{i}", "127.0.0.1", 6000 + i)
+
+    def heartbeat(i):
+        state.update_peer_heartbeat(f"peer-{i % args.peers}")
+
+    print(f"{args.peers} peers, {args.calls} calls\n")
+    run("scan PEERS + serialize (old)", args.calls, scan_active_peers)
+    run("active index + cached JSON", args.calls, state.get_active_peers_json)
+    run("scan PEERS + serialize, heartbeat between", args.calls, scan_active_peers, heartbeat)
+    run("active index, heartbeat between", args.calls, state.get_active_peers_json, heartbeat)
+
+    # Peers registered with a zero timeout expire at the next sweep; none of
+    # them has a socket (PEER_SIDS), so they are evicted from PEERS as well
+    state.TIMEOUT_SECONDS = 0
+    for i in range(args.peers):
+        state.register_peer(f"stale-{i}", "127.0.0.1", 6000 + i)
+    t0 = time.perf_counter()
+    expired = state.sweep_expired_peers()
+    print(f"\nexpiry sweep: {expired} peers in {(time.perf_counter() - t0) * 1e3:.1f} ms")
+    print(f"stats: {state.get_peer_stats()}")
+
+
+if __name__ == "__main__":
+    main()
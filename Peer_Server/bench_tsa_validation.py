@@ -0,0 +1,86 @@
+"""
+Benchmark: cost of tracker-side TSA token validation per NEW_BID.
+
+Issues real tokens in-process with TSA_Server/tsa_server.py (single and
+Merkle-batched, per algorithm), then measures validate_bid_timestamp
+throughput for fresh bids and for replays (which must all be rejected).
+
+Usage (from Peer_Server/):
+    python bench_tsa_validation.py --bids 2000 --batch-size 64
+"""
+import argparse
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "TSA_Server"))
+
+import tsa_server
+import tsa_validation
+
+
+def make_bids(n: int, offset: int) -> list:
+    bids = []
+    for i in range(n):
+        msg_data = {"auction_id": 1, "amount": offset + i + 1, "pseudonym_id": f"p{i % 50}"}
+        msg_bytes = json.dumps(msg_data, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(msg_bytes).digest()
+        bids.append((msg_data, digest, base64.b64encode(digest).decode()))
+    return bids
+
+
+def stamp(bids: list, alg: str, batch_size: int) -> None:
+    if batch_size <= 1:
+        for msg_data, digest, digest_b64 in bids:
+            msg_data["tsa_token"] = tsa_server.issue_token(digest, digest_b64, alg)
+        return
+
+    for i in range(0, len(bids), batch_size):
+        chunk = bids[i:i + batch_size]
+        tokens = tsa_server.issue_batch_tokens([(d, b) for _, d, b in chunk], alg)
+        for (msg_data, _, _), token in zip(chunk, tokens):
+            msg_data["tsa_token"] = token
+
+
+def run(label: str, bids: list, expect: bool) -> None:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [tsa_validation.validate_bid_timestamp(msg_data) for msg_data, _, _ in bids]
+    elapsed = time.perf_counter() - t0
+
+    assert all(r is expect for r in results), f"{label}: unexpected validation result"
+    per_bid_us = elapsed / len(bids) * 1e6
+    print(f"{label:<36} {len(bids) / elapsed:>10.1f} bids/s  ({per_bid_us:.1f} µs/bid)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bids", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    # Seed the tracker's TSA key cache so no HTTP request is made
+    for cert_pem in tsa_server.TSA_CERTS.values():
+        tsa_validation.register_tsa_certificate(cert_pem)
+
+    offset = 0
+    for alg in tsa_server.ALGORITHMS:
+        for batch_size in (1, args.batch_size):
+            bids = make_bids(args.bids, offset)
+            offset += args.bids
+            stamp(bids, alg, batch_size)
+
+            mode = "single" if batch_size == 1 else f"merkle x{batch_size}"
+            run(f"[{alg}] {mode}, fresh", bids, expect=True)
+            run(f"[{alg}] {mode}, replayed", bids, expect=False)
+
+    print(json.dumps(tsa_validation.get_tsa_validation_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import itertools
+import time
+
+from eventlet import tpool
+from eventlet.event import Event
+from eventlet.queue import Empty, Queue
+
+# Max broadcasts accepted but not yet committed (beyond this → HTTP 429)
+MAX_IN_FLIGHT = 256
+# Greenthreads feeding the native validation thread pool
+VALIDATION_WORKERS = 8
+# Max time a caller waits for its pipeline result before answering "queued" (202)
+BROADCAST_WAIT_SECONDS = 5
+
+
+class StageStats:
+    """Latency counters for one pipeline stage."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class BroadcastJob:
+    """One /broadcast message travelling through the pipeline."""
+
+    def __init__(self, job_id: int, sender_id: str, msg_type: str, msg_data: dict):
+        self.job_id = job_id
+        self.sender_id = sender_id
+        self.msg_type = msg_type
+        self.msg_data = msg_data
+        self.enqueued_at = time.monotonic()
+
+        self.valid = False
+        self.error = None
+        self.validated = Event()
+        self.done = Event()
+
+    def wait(self, timeout=None):
+        """Waits (green, non-blocking for other peers) for the (status_code, body) result."""
+        return self.done.wait(timeout)
+
+
+class BroadcastPipeline:
+    """
+    Staged processing of /broadcast messages on the tracker.
+
+    1. accept: admission control (bounded in-flight count) and enqueue.
+    2. validate: crypto/CA checks run in eventlet's native thread pool (tpool),
+       several jobs at a time, so one slow CA lookup does not stall the hub.
+    3. commit: applies leader state and fans out. Jobs are committed in arrival
+       order per auction (one commit greenthread per auction with pending jobs),
+       so a slow validation never lets an older bid overwrite a newer leader,
+       and only holds back later bids of that same auction.
+    """
+
+    def __init__(self, socketio, validate_fn, commit_fn,
+                 workers: int = VALIDATION_WORKERS, max_in_flight: int = MAX_IN_FLIGHT):
+        self.socketio = socketio
+        self.validate_fn = validate_fn
+        self.commit_fn = commit_fn
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+
+        self._ids = itertools.count(1)
+        self._to_validate = Queue()
+        # ordering key -> commit queue, while that key has jobs pending
+        self._commit_lanes = {}
+        self.in_flight = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.invalid = 0
+
+        self.stats = {
+            "queue_wait": StageStats(),
+            "validate": StageStats(),
+            "commit_wait": StageStats(),
+            "commit": StageStats(),
+            "total": StageStats(),
+        }
+
+    def start(self) -> None:
+        for _ in range(self.workers):
+            self.socketio.start_background_task(self._validation_worker)
+
+    @staticmethod
+    def _ordering_key(job: BroadcastJob):
+        """Bids are ordered per auction; every other message shares one lane."""
+        if job.msg_type == "NEW_BID":
+            return str(job.msg_data.get("auction_id"))
+        return None
+
+    # Stage 1: accept
+    def submit(self, sender_id: str, msg_type: str, msg_data: dict):
+        """Returns the queued job, or None if the tracker is saturated."""
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            return None
+
+        job = BroadcastJob(next(self._ids), sender_id, msg_type, msg_data)
+        self.in_flight += 1
+        self.accepted += 1
+
+        # No yield between the lookup and the puts, so per-lane commit order == arrival order
+        key = self._ordering_key(job)
+        lane = self._commit_lanes.get(key)
+        if lane is None:
+            lane = self._commit_lanes[key] = Queue()
+            self.socketio.start_background_task(self._commit_worker, key, lane)
+        self._to_validate.put(job)
+        lane.put(job)
+        return job
+
+    def submit_and_wait(self, sender_id: str, msg_type: str, msg_data: dict,
+                        timeout: float = BROADCAST_WAIT_SECONDS):
+        """
+        Submits a message and waits for its result.
+        Returns (status_code, body): 429 if saturated, 202 if still queued after `timeout`.
+        """
+        job = self.submit(sender_id, msg_type, msg_data)
+        if job is None:
+            return 429, {"error": "Tracker busy, retry later"}
+
+        result = job.wait(timeout)
+        if result is None:
+            return 202, {"status": "queued", "job_id": job.job_id}
+        return result
+
+    # Stage 2: validate
+    def _validation_worker(self) -> None:
+        while True:
+            job = self._to_validate.get()
+            started = time.monotonic()
+            self.stats["queue_wait"].record(started - job.enqueued_at)
+
+            try:
+                job.valid, job.error = tpool.execute(self.validate_fn, job)
+            except Exception as e:
+                job.valid, job.error = False, f"Validation failed: {e}"
+
+            self.stats["validate"].record(time.monotonic() - started)
+            job.validated.send(True)
+
+    # Stage 3: commit + fan-out
+    def _commit_worker(self, key, lane: Queue) -> None:
+        """Commits one lane's jobs in order; exits (dropping the lane) once it is empty."""
+        while True:
+            try:
+                job = lane.get_nowait()
+            except Empty:
+                # No yield since the failed get, so submit() cannot have added a job
+                del self._commit_lanes[key]
+                return
+            waited = time.monotonic()
+            job.validated.wait()
+            started = time.monotonic()
+            self.stats["commit_wait"].record(started - waited)
+
+            try:
+                if job.valid:
+                    result = (200, self.commit_fn(job))
+                else:
+                    self.invalid += 1
+                    result = (400, {"error": job.error})
+            except Exception as e:
+                result = (500, {"error": f"Commit failed: {e}"})
+
+            now = time.monotonic()
+            self.stats["commit"].record(now - started)
+            self.stats["total"].record(now - job.enqueued_at)
+            self.in_flight -= 1
+            job.done.send(result)
+
+    def metrics(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "commit_lanes": len(self._commit_lanes),
+            "stages": {name: s.snapshot() for name, s in self.stats.items()},
+        }
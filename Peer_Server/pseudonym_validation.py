@@ -1,11 +1,15 @@
 import base64
+import hashlib
 import json
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from threading import Lock
 
 import requests
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
 from cryptography.hazmat.primitives import serialization
 from cryptography.x509 import load_pem_x509_certificate
 
@@ -13,6 +17,127 @@ from cryptography.x509 import load_pem_x509_certificate
 AUTH_SERVER_BASE = "http://127.0.0.1:8000"
 GET_USER_CERT_ENDPOINT = "/api/get_user_cert/"
 
+# User certificate cache (username -> serial + parsed public key)
+CERT_CACHE_TTL_SECONDS = 300
+CERT_CACHE_MAX_ENTRIES = 1024
+
+
+class UserCertCache:
+    """
+    Bounded LRU cache of verified user public keys, with a TTL per entry.
+    An entry is only returned if its serial matches the one the caller expects,
+    so a re-issued certificate (new serial) always forces a fresh lookup.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, username: str, serial: str):
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            cached_serial, public_key, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds or cached_serial != str(serial):
+                self._entries.pop(username, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return public_key
+
+    def put(self, username: str, serial: str, public_key) -> None:
+        with self._lock:
+            self._entries[username] = (str(serial), public_key, time.monotonic())
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, username: str) -> None:
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+USER_CERT_CACHE = UserCertCache(CERT_CACHE_TTL_SECONDS, CERT_CACHE_MAX_ENTRIES)
+
+# Verified delegation token cache (digest -> parsed token + pseudonym key)
+TOKEN_CACHE_MAX_ENTRIES = 4096
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of delegation tokens whose user signature was already verified.
+    Entries are keyed by a digest of (sender, token) and dropped once the token's
+    not_after has passed, so later bids only need the Ed25519 pseudonym check
+    (plus the cached user-certificate serial check).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if datetime.now(timezone.utc) > entry[2]:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, token: dict, pseudo_pub_key, not_after: datetime) -> None:
+        with self._lock:
+            self._entries[key] = (token, pseudo_pub_key, not_after)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+VERIFIED_TOKEN_CACHE = VerifiedTokenCache(TOKEN_CACHE_MAX_ENTRIES)
+
 
 # Fetch the user's real certificate from the Django CA.
 def _fetch_user_certificate(username: str):
@@ -89,22 +214,70 @@ def _validate_delegation_token_structure(token: dict, msg_data: dict) -> bool:
     return True
 
 
-# Verify the token signature using the user's real certificate.
-def _verify_delegation_signature(token: dict, username: str) -> bool:
+# Return the user's public key for the expected serial (cached, or fetched from the CA).
+def _get_user_public_key(username: str, expected_serial: str):
+    public_key = USER_CERT_CACHE.get(username, expected_serial)
+    if public_key is not None:
+        return public_key
+
     cert_pem, serial_number = _fetch_user_certificate(username)
     if not cert_pem or not serial_number:
         print("[PSEUDONYM] Could not retrieve user certificate from auth server")
-        return False
-
-    if str(serial_number) != str(token.get("user_cert_serial")):
-        print("[PSEUDONYM] user_cert_serial mismatch between token and database")
-        return False
+        return None
 
     try:
         cert = load_pem_x509_certificate(cert_pem.encode("utf-8"), default_backend())
         public_key = cert.public_key()
     except Exception as e:
         print(f"[PSEUDONYM] Failed to load user certificate: {e}")
+        USER_CERT_CACHE.invalidate(username)
+        return None
+
+    # Cache under the serial the CA reports (replaces any older serial)
+    USER_CERT_CACHE.put(username, serial_number, public_key)
+
+    if str(serial_number) != str(expected_serial):
+        print("[PSEUDONYM] user_cert_serial mismatch between token and database")
+        return None
+
+    return public_key
+
+
+# Cache hit/miss counters for the user certificate cache.
+def get_cert_cache_stats() -> dict:
+    return USER_CERT_CACHE.stats()
+
+
+# Cache hit/miss counters for the verified delegation token cache.
+def get_token_cache_stats() -> dict:
+    return VERIFIED_TOKEN_CACHE.stats()
+
+
+# Cache key for a delegation token presented by a given sender.
+def _token_cache_key(raw_token, sender_id: str) -> str:
+    if isinstance(raw_token, str):
+        canonical = raw_token
+    else:
+        canonical = json.dumps(raw_token, sort_keys=True)
+    return hashlib.sha256(f"{sender_id}\0{canonical}".encode("utf-8")).hexdigest()
+
+
+# Verify `signature` over `message` with the scheme named by the token's sig_alg.
+def _verify_with_alg(public_key, sig_alg: str, signature: bytes, message: bytes) -> None:
+    if sig_alg == "ed25519" and isinstance(public_key, ed25519.Ed25519PublicKey):
+        public_key.verify(signature, message)
+    elif sig_alg == "ecdsa-sha256" and isinstance(public_key, ec.EllipticCurvePublicKey):
+        public_key.verify(signature, message, ec.ECDSA(hashes.SHA256()))
+    elif sig_alg == "rsa-pkcs1-sha256" and isinstance(public_key, rsa.RSAPublicKey):
+        public_key.verify(signature, message, padding.PKCS1v15(), hashes.SHA256())
+    else:
+        raise ValueError(f"sig_alg {sig_alg} does not match the certificate key type")
+
+
+# Verify the token signature using the user's real certificate.
+def _verify_delegation_signature(token: dict, username: str) -> bool:
+    public_key = _get_user_public_key(username, token.get("user_cert_serial"))
+    if public_key is None:
         return False
 
     sig_b64 = token.get("signature")
@@ -121,47 +294,53 @@ def _verify_delegation_signature(token: dict, username: str) -> bool:
     payload = {k: v for k, v in token.items() if k != "signature"}
     message = json.dumps(payload, sort_keys=True).encode("utf-8")
 
+    # Tokens from older clients have no sig_alg and are RSA PKCS#1 v1.5
+    sig_alg = token.get("sig_alg", "rsa-pkcs1-sha256")
+
     try:
-        public_key.verify(
-            signature,
-            message,
-            padding.PKCS1v15(),
-            hashes.SHA256(),
-        )
+        _verify_with_alg(public_key, sig_alg, signature, message)
         return True
     except Exception as e:
         print(f"[PSEUDONYM] Delegation token signature invalid: {e}")
         return False
 
 
-# Verify pseudonym private-key signature on the bid.
-def _verify_pseudonym_signature(token: dict, msg_data: dict) -> bool:
-    pseudo_sig_b64 = msg_data.get("pseudonym_signature")
-    if not pseudo_sig_b64:
-        print("[PSEUDONYM] Missing pseudonym_signature in message")
-        return False
-
-    try:
-        pseudo_sig = base64.b64decode(pseudo_sig_b64)
-    except Exception as e:
-        print(f"[PSEUDONYM] Failed to decode pseudonym_signature: {e}")
-        return False
-
+# Load the pseudonym public key carried by the delegation token.
+def _load_pseudonym_public_key(token: dict):
     pseudo_pub_b64 = token.get("pseudonym_pubkey")
     if not pseudo_pub_b64:
         print("[PSEUDONYM] Token missing pseudonym_pubkey")
-        return False
+        return None
 
     try:
         pseudo_pub_pem = base64.b64decode(pseudo_pub_b64)
-        pseudo_pub_key = serialization.load_pem_public_key(
+        return serialization.load_pem_public_key(
             pseudo_pub_pem,
             backend=default_backend(),
         )
     except Exception as e:
         print(f"[PSEUDONYM] Failed to load pseudonym public key: {e}")
+        return None
+
+
+# Verify pseudonym private-key signature on the bid.
+def _verify_pseudonym_signature(token: dict, msg_data: dict, pseudo_pub_key=None) -> bool:
+    pseudo_sig_b64 = msg_data.get("pseudonym_signature")
+    if not pseudo_sig_b64:
+        print("[PSEUDONYM] Missing pseudonym_signature in message")
+        return False
+
+    try:
+        pseudo_sig = base64.b64decode(pseudo_sig_b64)
+    except Exception as e:
+        print(f"[PSEUDONYM] Failed to decode pseudonym_signature: {e}")
         return False
 
+    if pseudo_pub_key is None:
+        pseudo_pub_key = _load_pseudonym_public_key(token)
+        if pseudo_pub_key is None:
+            return False
+
     msg_obj = {
         "auction_id": msg_data.get("auction_id"),
         "amount": msg_data.get("amount"),
@@ -198,6 +377,19 @@ def validate_delegation_and_pseudonym(msg_data: dict, sender_id: str) -> bool:
         print("[PSEUDONYM] NEW_BID without delegation_token")
         return False
 
+    # Token already verified for this sender: only the per-bid checks remain
+    cache_key = _token_cache_key(delegation_token, sender_id)
+    cached = VERIFIED_TOKEN_CACHE.get(cache_key)
+    if cached is not None:
+        token, pseudo_pub_key, _ = cached
+        if not _validate_delegation_token_structure(token, msg_data):
+            return False
+        # The signing certificate must still be the user's current one: served from
+        # USER_CERT_CACHE, re-fetched from the CA every CERT_CACHE_TTL_SECONDS
+        if _get_user_public_key(sender_id, token.get("user_cert_serial")) is None:
+            return False
+        return _verify_pseudonym_signature(token, msg_data, pseudo_pub_key)
+
     if isinstance(delegation_token, str):
         try:
             delegation_token = json.loads(delegation_token)
@@ -215,7 +407,17 @@ def validate_delegation_and_pseudonym(msg_data: dict, sender_id: str) -> bool:
     if not _verify_delegation_signature(delegation_token, sender_id):
         return False
 
-    if not _verify_pseudonym_signature(delegation_token, msg_data):
+    pseudo_pub_key = _load_pseudonym_public_key(delegation_token)
+    if pseudo_pub_key is None:
+        return False
+
+    if not _verify_pseudonym_signature(delegation_token, msg_data, pseudo_pub_key):
         return False
 
+    VERIFIED_TOKEN_CACHE.put(
+        cache_key,
+        delegation_token,
+        pseudo_pub_key,
+        _parse_token_time(delegation_token["not_after"]),
+    )
     return True
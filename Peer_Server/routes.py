@@ -1,20 +1,29 @@
 from flask import request, jsonify
-from auth_utils import validate_token
+from auth_utils import validate_token, get_jwt_cache_stats
 
 from state import (
     PEERS,
     PEER_SIDS,
     SID_PEERS,
     update_peer_heartbeat,
-    get_active_peers,
+    get_active_peers_json,
+    get_peer_stats,
     update_auction_leader,
-    load_auction_leaders,
-    save_map,
-    load_map,
-    AUCTION_LEADERS,
+    get_auction_leader,
+    associate_pseudonym,
+    resolve_pseudonym,
+    LOBBY_ROOM,
+    auction_room,
+    room_size,
 )
 
-from pseudonym_validation import validate_delegation_and_pseudonym
+from bid_pipeline import BroadcastPipeline
+from pseudonym_validation import (
+    validate_delegation_and_pseudonym,
+    get_cert_cache_stats,
+    get_token_cache_stats,
+)
+from tsa_validation import validate_bid_timestamp, get_tsa_validation_stats
 
 
 def register_http_routes(app, socketio):
@@ -29,48 +38,90 @@ def register_http_routes(app, socketio):
             return jsonify({"error": "Invalid token"}), 403
         return jsonify({"status": "ok", "message": "Use WebSocket for real-time."}), 200
 
-    # Public broadcast endpoint (NEW_BID, NEW_AUCTION, etc.).
-    @app.route("/broadcast", methods=["POST"])
-    def broadcast_message():
-        data = request.json or {}
-        token = data.get("token")
-        payload = data.get("payload") or {}
-
-        sender_id = validate_token(token)
-        if not sender_id:
-            return jsonify({"error": "Access denied"}), 403
+    # Pipeline stage 2 (native thread pool): crypto validation of a broadcast.
+    def validate_broadcast(job):
+        if job.msg_type == "NEW_BID":
+            if not validate_delegation_and_pseudonym(job.msg_data, job.sender_id):
+                return False, "Invalid pseudonym delegation token or signature"
+            if not validate_bid_timestamp(job.msg_data):
+                return False, "Invalid or replayed TSA token"
+        return True, None
 
-        msg_type = payload.get("type")
-        msg_data = payload.get("data") or {}
+    # Pipeline stage 3 (in arrival order per auction): leader state + Socket.IO fan-out.
+    def commit_broadcast(job):
+        msg_type = job.msg_type
+        msg_data = job.msg_data
 
-        # Validate pseudonym on NEW_BID and update auction leader.
         if msg_type == "NEW_BID":
-            if not validate_delegation_and_pseudonym(msg_data, sender_id):
-                return jsonify({"error": "Invalid pseudonym delegation token or signature"}), 400
-
             auction_id = msg_data.get("auction_id")
             pseudonym_id = msg_data.get("pseudonym_id")
 
             if auction_id is not None and pseudonym_id:
                 update_auction_leader(auction_id, pseudonym_id)
-                print(f"[TRACKER] Auction {auction_id}: leader = {pseudonym_id}")
 
-        # Broadcast to all peers via Socket.IO
         msg = {
             "type": msg_type,
             "data": msg_data,
         }
 
-        socketio.emit("new_event", msg)
-        return jsonify({
+        # NEW_BID only reaches the auction's room, NEW_AUCTION the lobby, anything else everyone
+        if msg_type == "NEW_BID":
+            room = auction_room(msg_data.get("auction_id"))
+        elif msg_type == "NEW_AUCTION":
+            room = LOBBY_ROOM
+        else:
+            room = None
+
+        if room:
+            socketio.emit("new_event", msg, room=room)
+            receivers = room_size(room)
+        else:
+            socketio.emit("new_event", msg)
+            receivers = len(PEER_SIDS)
+
+        return {
             "status": "broadcast_sent",
-            "receivers": len(PEER_SIDS)
-        }), 200
+            "receivers": receivers
+        }
+
+    pipeline = BroadcastPipeline(socketio, validate_broadcast, commit_broadcast)
+    pipeline.start()
+    app.config["BROADCAST_PIPELINE"] = pipeline
 
-    # Returns list of currently active peers.
+    # Public broadcast endpoint (NEW_BID, NEW_AUCTION, etc.).
+    @app.route("/broadcast", methods=["POST"])
+    def broadcast_message():
+        data = request.json or {}
+        token = data.get("token")
+        payload = data.get("payload") or {}
+
+        sender_id = validate_token(token)
+        if not sender_id:
+            return jsonify({"error": "Access denied"}), 403
+
+        msg_type = payload.get("type")
+        msg_data = payload.get("data") or {}
+
+        # Enqueue; the request greenthread waits for the result without blocking other peers
+        status_code, body = pipeline.submit_and_wait(sender_id, msg_type, msg_data)
+        return jsonify(body), status_code
+
+    # Returns list of currently active peers (JSON cached until the active set changes).
     @app.route("/peers", methods=["GET"])
     def get_peers():
-        return jsonify(get_active_peers()), 200
+        return app.response_class(get_active_peers_json(), mimetype="application/json"), 200
+
+    # Tracker cache/pipeline counters.
+    @app.route("/metrics", methods=["GET"])
+    def get_metrics():
+        return jsonify({
+            "jwt_cache": get_jwt_cache_stats(),
+            "cert_cache": get_cert_cache_stats(),
+            "token_cache": get_token_cache_stats(),
+            "tsa_tokens": get_tsa_validation_stats(),
+            "peers": get_peer_stats(),
+            "broadcast_pipeline": pipeline.metrics(),
+        }), 200
 
     # Peer heartbeat endpoint.
     @app.route("/heartbeat", methods=["POST"])
@@ -82,27 +133,16 @@ def register_http_routes(app, socketio):
             return jsonify({"status": "alive"}), 200
         return jsonify({"error": "Unknown peer"}), 404
 
-    # Load auction leaders from disk.
-    load_auction_leaders()
-
     # Return current leader pseudonym for an auction.
     @app.route("/auction_leader/<auction_id>", methods=["GET"])
-    def get_auction_leader(auction_id):
-        auction_id = str(auction_id)
-
-        load_auction_leaders()
-        leader_info = AUCTION_LEADERS.get(auction_id)
-
-        if not leader_info:
-            return jsonify({"leader_pseudonym": None}), 200
-
+    def auction_leader(auction_id):
         return jsonify({
-            "leader_pseudonym": leader_info.get("leader_pseudonym")
+            "leader_pseudonym": get_auction_leader(auction_id)
         }), 200
 
     # Associate pseudonym → peer_id for an auction.
     @app.route("/associate_pseudonym", methods=["POST"])
-    def associate_pseudonym():
+    def associate_pseudonym_route():
         data = request.json or {}
 
         auction_id = data.get("auction_id")
@@ -112,11 +152,7 @@ def register_http_routes(app, socketio):
         if not auction_id or not pseudonym or not peer_id:
             return jsonify({"error": "missing fields"}), 400
 
-        key = f"{auction_id}:{pseudonym}"
-
-        mapping = load_map() or {}
-        mapping[key] = peer_id
-        save_map(mapping)
+        associate_pseudonym(auction_id, pseudonym, peer_id)
 
         return jsonify({"status": "ok"}), 200
 
@@ -130,10 +166,7 @@ def register_http_routes(app, socketio):
         if not auction_id or not pseudonym:
             return jsonify({"error": "missing fields"}), 400
 
-        mapping = load_map() or {}
-        key = f"{auction_id}:{pseudonym}"
-
-        peer_id = mapping.get(key)
+        peer_id = resolve_pseudonym(auction_id, pseudonym)
         if not peer_id:
             return jsonify({"error": "not found"}), 404
 
@@ -1,8 +1,18 @@
-from flask import request
-from flask_socketio import emit, disconnect
+from flask import request, current_app
+from flask_socketio import emit, disconnect, join_room, leave_room
 from auth_utils import validate_token
-from state import PEERS, PEER_SIDS, SID_PEERS, STATE_LOCK
-import time
+from state import (
+    PEER_SIDS,
+    SID_PEERS,
+    STATE_LOCK,
+    LOBBY_ROOM,
+    auction_room,
+    add_room_member,
+    remove_room_member,
+    remove_sid_from_rooms,
+    register_peer,
+    unregister_peer,
+)
 
 def register_socket_events(socketio):
 
@@ -13,12 +23,13 @@ def register_socket_events(socketio):
     @socketio.on("disconnect")
     def handle_disconnect():
         sid = request.sid
+        remove_sid_from_rooms(sid)
         if sid in SID_PEERS:
             peer_id = SID_PEERS[sid]
             with STATE_LOCK:
-                PEERS.pop(peer_id, None)
                 PEER_SIDS.pop(peer_id, None)
                 SID_PEERS.pop(sid, None)
+            unregister_peer(peer_id)
             print(f"[SOCKET] Disconnected: {peer_id}")
 
     @socketio.on("authenticate")
@@ -38,12 +49,74 @@ def register_socket_events(socketio):
         with STATE_LOCK:
             PEER_SIDS[peer_id] = sid
             SID_PEERS[sid] = peer_id
-            PEERS[peer_id] = {
-                "host": client_ip,
-                "port": port,
-                "last_seen": time.time()
-            }
+        register_peer(peer_id, client_ip, port)
+
+        # Every authenticated peer listens to the lobby (NEW_AUCTION)
+        join_room(LOBBY_ROOM)
+        add_room_member(LOBBY_ROOM, sid)
 
         print(f"[SOCKET] Authenticated: {peer_id} @ {client_ip}")
         emit("status", {"message": "Authenticated", "user": peer_id})
 
+    # Join the room of one auction to receive its NEW_BID events.
+    @socketio.on("join_auction")
+    def handle_join_auction(data):
+        sid = request.sid
+        auction_id = (data or {}).get("auction_id")
+        if sid not in SID_PEERS or auction_id is None:
+            return {"status": "error", "error": "Not authenticated or missing auction_id"}
+
+        room = auction_room(auction_id)
+        join_room(room)
+        add_room_member(room, sid)
+        print(f"[SOCKET] {SID_PEERS[sid]} joined {room}")
+        return {"status": "ok", "room": room}
+
+    # Leave the room of one auction.
+    @socketio.on("leave_auction")
+    def handle_leave_auction(data):
+        sid = request.sid
+        auction_id = (data or {}).get("auction_id")
+        if auction_id is None:
+            return {"status": "error", "error": "Missing auction_id"}
+
+        room = auction_room(auction_id)
+        leave_room(room)
+        remove_room_member(room, sid)
+        return {"status": "ok", "room": room}
+
+    # Broadcast over the authenticated socket (same pipeline as POST /broadcast).
+    # The ack carries {"status_code": ..., **body}.
+    @socketio.on("broadcast")
+    def handle_broadcast(data):
+        sender_id = SID_PEERS.get(request.sid)
+        if not sender_id:
+            return {"status_code": 403, "error": "Access denied"}
+
+        payload = (data or {}).get("payload") or {}
+        pipeline = current_app.config["BROADCAST_PIPELINE"]
+        status_code, body = pipeline.submit_and_wait(
+            sender_id,
+            payload.get("type"),
+            payload.get("data") or {},
+        )
+        return {"status_code": status_code, **body}
+
+    # Direct message over the authenticated socket (same as POST /direct).
+    @socketio.on("direct")
+    def handle_direct(data):
+        sender_id = SID_PEERS.get(request.sid)
+        if not sender_id:
+            return {"status_code": 403, "error": "Access denied"}
+
+        data = data or {}
+        target_sid = PEER_SIDS.get(data.get("peer_id"))
+        if not target_sid:
+            return {"status_code": 404, "error": "Target not connected"}
+
+        msg = {
+            "sender": sender_id,
+            "payload": data.get("payload") or {},
+        }
+        emit("direct_message", msg, room=target_sid)
+        return {"status_code": 200, "status": "direct_sent"}
@@ -1,9 +1,13 @@
+import heapq
+import json
+import threading
 import time
 import os
-import json
 import requests
 from threading import Lock
 
+from storage import open_store
+
 # Peer tracking state (in-memory)
 PEERS = {}
 PEER_SIDS = {}
@@ -11,106 +15,214 @@ SID_PEERS = {}
 TIMEOUT_SECONDS = 30
 STATE_LOCK = Lock()
 
-# Auction leaders (auction_id -> leader_pseudonym) stored on disk
+# Active-peer index, kept up to date on register/heartbeat/expiry instead of
+# scanning PEERS on every /peers call
+ACTIVE_PEERS = {}
+# (deadline, peer_id) min-heap, one entry per scheduled peer; a popped entry
+# whose peer has been seen since is pushed back with its new deadline
+_EXPIRY_HEAP = []
+_SCHEDULED = set()
+# Cached /peers list and its JSON (None = rebuild on next call)
+_PEERS_SNAPSHOT = None
+_PEERS_SNAPSHOT_JSON = None
+SWEEP_INTERVAL_SECONDS = 1.0
+PEER_STATS = {"expired": 0, "evicted": 0, "snapshots": 0}
+
+# Socket.IO rooms: NEW_AUCTION goes to the lobby, NEW_BID only to the auction's room
+LOBBY_ROOM = "lobby"
+ROOM_MEMBERS = {}
+
+# Persistent maps: "sqlite" (WAL, keyed rows) or "memory" (write-behind JSON file)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-LEADER_FILE = os.path.join(BASE_DIR, "auction_leaders.json")
-AUCTION_LEADERS = {}
+STORE_BACKEND = "sqlite"
+
+# Auction leaders (auction_id -> {"leader_pseudonym": ...})
+LEADER_STORE = open_store(STORE_BACKEND, "auction_leaders", BASE_DIR)
 
-# Pseudonym map file (auction_id:pseudonym -> peer_id)
-MAP_FILE = os.path.join(BASE_DIR, "peer_pseudonym.json")
+# Pseudonym map (auction_id:pseudonym -> peer_id)
+PSEUDONYM_STORE = open_store(STORE_BACKEND, "peer_pseudonym", BASE_DIR)
 
 TRACKER = "http://127.0.0.1:5555"
 
 
-# Load auction leaders from disk into AUCTION_LEADERS.
-def load_auction_leaders():
-    print(f"[TRACKER] Loading auction leaders from: {LEADER_FILE}")
+# Return the current leader pseudonym for an auction (None if unknown).
+def get_auction_leader(auction_id: str):
+    leader_info = LEADER_STORE.get(str(auction_id))
+    if not leader_info:
+        return None
+    return leader_info.get("leader_pseudonym")
 
-    global AUCTION_LEADERS
-    AUCTION_LEADERS.clear()
 
-    if not os.path.exists(LEADER_FILE):
-        print("[TRACKER] Leader file does not exist, using empty dict")
-        return
+# Update the leader for an auction (single keyed write).
+def update_auction_leader(auction_id: str, pseudonym_id: str):
+    auction_id = str(auction_id)
+    LEADER_STORE.set(auction_id, {"leader_pseudonym": pseudonym_id})
+    print(f"[TRACKER] Auction {auction_id}: leader = {pseudonym_id}")
 
-    try:
-        with open(LEADER_FILE, "r") as f:
-            content = f.read().strip()
-            if not content:
-                print("[TRACKER] Leader file empty, using empty dict")
-                return
-            data = json.loads(content)
-            if isinstance(data, dict):
-                AUCTION_LEADERS.update(data)
-                print(f"[TRACKER] Loaded leaders: {AUCTION_LEADERS}")
-            else:
-                print("[TRACKER] Leader file is not a dict, ignoring.")
-    except Exception as e:
-        print(f"[TRACKER] Failed to load auction leaders: {e}")
-        AUCTION_LEADERS.clear()
 
+# Mark a peer active and schedule its expiry (caller holds STATE_LOCK).
+def _touch_peer(peer_id: str, info: dict, now: float):
+    global _PEERS_SNAPSHOT, _PEERS_SNAPSHOT_JSON
+    info["last_seen"] = now
+    public = {"peer_id": peer_id, "host": info["host"], "port": info["port"]}
+    if ACTIVE_PEERS.get(peer_id) != public:
+        ACTIVE_PEERS[peer_id] = public
+        _PEERS_SNAPSHOT = _PEERS_SNAPSHOT_JSON = None
+    if peer_id not in _SCHEDULED:
+        _SCHEDULED.add(peer_id)
+        heapq.heappush(_EXPIRY_HEAP, (now + TIMEOUT_SECONDS, peer_id))
 
-# Persist AUCTION_LEADERS to disk.
-def save_auction_leaders():
-    try:
-        with open(LEADER_FILE, "w") as f:
-            json.dump(AUCTION_LEADERS, f, indent=4)
-    except Exception as e:
-        print(f"[TRACKER] Failed to save auction leaders: {e}")
 
+# Register an authenticated peer (socket connect) as active.
+def register_peer(peer_id: str, host: str, port):
+    with STATE_LOCK:
+        info = PEERS[peer_id] = {"host": host, "port": port, "last_seen": 0.0}
+        _touch_peer(peer_id, info, time.time())
 
-# Update the leader for an auction and save to disk.
-def update_auction_leader(auction_id: str, pseudonym_id: str):
-    global AUCTION_LEADERS
-    auction_id = str(auction_id)
+
+# Forget a peer entirely (socket disconnect); its heap entry is dropped when popped.
+def unregister_peer(peer_id: str):
+    global _PEERS_SNAPSHOT, _PEERS_SNAPSHOT_JSON
     with STATE_LOCK:
-        AUCTION_LEADERS[auction_id] = {"leader_pseudonym": pseudonym_id}
-        save_auction_leaders()
-        print(f"[TRACKER] Auction {auction_id}: leader = {pseudonym_id}")
+        PEERS.pop(peer_id, None)
+        if ACTIVE_PEERS.pop(peer_id, None) is not None:
+            _PEERS_SNAPSHOT = _PEERS_SNAPSHOT_JSON = None
 
 
 # Update last_seen timestamp for a peer.
 def update_peer_heartbeat(peer_id: str):
-    if peer_id in PEERS:
-        PEERS[peer_id]["last_seen"] = time.time()
+    with STATE_LOCK:
+        info = PEERS.get(peer_id)
+        if info is not None:
+            _touch_peer(peer_id, info, time.time())
+
+
+# Drop peers not seen for TIMEOUT_SECONDS from the active index (caller holds STATE_LOCK).
+# Peers whose socket is gone are removed from PEERS too; connected ones stay
+# registered so a later heartbeat makes them active again.
+def _expire_peers(now: float) -> int:
+    global _PEERS_SNAPSHOT, _PEERS_SNAPSHOT_JSON
+    expired = 0
+    while _EXPIRY_HEAP and _EXPIRY_HEAP[0][0] <= now:
+        _, peer_id = heapq.heappop(_EXPIRY_HEAP)
+        info = PEERS.get(peer_id)
+        if info is None:
+            _SCHEDULED.discard(peer_id)
+            continue
+
+        deadline = info["last_seen"] + TIMEOUT_SECONDS
+        if deadline > now:
+            heapq.heappush(_EXPIRY_HEAP, (deadline, peer_id))
+            continue
+
+        _SCHEDULED.discard(peer_id)
+        if ACTIVE_PEERS.pop(peer_id, None) is not None:
+            _PEERS_SNAPSHOT = _PEERS_SNAPSHOT_JSON = None
+            expired += 1
+        if peer_id not in PEER_SIDS:
+            PEERS.pop(peer_id, None)
+            PEER_STATS["evicted"] += 1
+
+    PEER_STATS["expired"] += expired
+    return expired
+
+
+# Run one expiry pass now.
+def sweep_expired_peers() -> int:
+    with STATE_LOCK:
+        return _expire_peers(time.time())
+
 
+# Expire stale peers in a daemon thread every `interval` seconds.
+def start_peer_sweeper(interval: float = SWEEP_INTERVAL_SECONDS) -> None:
+    def sweep_loop():
+        while True:
+            time.sleep(interval)
+            sweep_expired_peers()
 
-# Return list of active peers (not timed out).
+    threading.Thread(target=sweep_loop, daemon=True).start()
+
+
+# Socket.IO room name for an auction.
+def auction_room(auction_id) -> str:
+    return f"auction_{auction_id}"
+
+
+# Track a sid joining a room (used to report receivers per broadcast).
+def add_room_member(room: str, sid: str):
+    with STATE_LOCK:
+        ROOM_MEMBERS.setdefault(room, set()).add(sid)
+
+
+# Track a sid leaving a room.
+def remove_room_member(room: str, sid: str):
+    with STATE_LOCK:
+        members = ROOM_MEMBERS.get(room)
+        if members is not None:
+            members.discard(sid)
+            if not members:
+                ROOM_MEMBERS.pop(room, None)
+
+
+# Remove a disconnected sid from every room.
+def remove_sid_from_rooms(sid: str):
+    with STATE_LOCK:
+        for room in list(ROOM_MEMBERS):
+            ROOM_MEMBERS[room].discard(sid)
+            if not ROOM_MEMBERS[room]:
+                ROOM_MEMBERS.pop(room, None)
+
+
+# Number of sids currently in a room.
+def room_size(room: str) -> int:
+    return len(ROOM_MEMBERS.get(room, ()))
+
+
+# Cached active-peer list, rebuilt after a change (caller holds STATE_LOCK).
+def _active_snapshot():
+    global _PEERS_SNAPSHOT
+    _expire_peers(time.time())
+    if _PEERS_SNAPSHOT is None:
+        _PEERS_SNAPSHOT = list(ACTIVE_PEERS.values())
+        PEER_STATS["snapshots"] += 1
+    return _PEERS_SNAPSHOT
+
+
+# Return list of active peers (not timed out); shared snapshot, do not modify.
 def get_active_peers():
-    now = time.time()
-    return [
-        {"peer_id": pid, "host": info["host"], "port": info["port"]}
-        for pid, info in PEERS.items()
-        if now - info["last_seen"] < TIMEOUT_SECONDS
-    ]
+    with STATE_LOCK:
+        return _active_snapshot()
 
 
-# Load pseudonym map (auction_id:pseudonym -> peer_id) from disk.
-def load_map() -> dict:
-    if not os.path.exists(MAP_FILE):
-        return {}
+# The active-peer list serialized once per change (body of GET /peers).
+def get_active_peers_json() -> str:
+    global _PEERS_SNAPSHOT_JSON
+    with STATE_LOCK:
+        peers = _active_snapshot()
+        if _PEERS_SNAPSHOT_JSON is None:
+            _PEERS_SNAPSHOT_JSON = json.dumps(peers)
+        return _PEERS_SNAPSHOT_JSON
 
-    try:
-        with open(MAP_FILE, "r") as f:
-            content = f.read().strip()
-            if not content:
-                return {}
-            data = json.loads(content)
-            if isinstance(data, dict):
-                return data
-            return {}
-    except Exception as e:
-        print(f"[TRACKER] Failed to load pseudonym map: {e}")
-        return {}
 
+# Peer index counters for /metrics.
+def get_peer_stats():
+    with STATE_LOCK:
+        return {
+            "registered": len(PEERS),
+            "active": len(ACTIVE_PEERS),
+            "scheduled": len(_EXPIRY_HEAP),
+            **PEER_STATS,
+        }
 
-# Persist pseudonym map to disk.
-def save_map(data: dict) -> None:
-    try:
-        with open(MAP_FILE, "w") as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        print(f"[TRACKER] Failed to save pseudonym map: {e}")
+
+# Associate (auction_id, pseudonym) with a peer_id.
+def associate_pseudonym(auction_id: str, pseudonym: str, peer_id: str) -> None:
+    PSEUDONYM_STORE.set(f"{auction_id}:{pseudonym}", peer_id)
+
+
+# Resolve (auction_id, pseudonym) to a peer_id (None if unknown).
+def resolve_pseudonym(auction_id: str, pseudonym: str):
+    return PSEUDONYM_STORE.get(f"{auction_id}:{pseudonym}")
 
 
 # Client helper: resolve (auction_id, pseudonym) to peer_id via /resolve.
@@ -0,0 +1,172 @@
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+
+# Write a JSON file atomically (temp file + fsync + rename), so a crash never leaves it half-written.
+def atomic_write_json(path: str, data: dict) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Read a JSON dict from disk ({} if missing, empty or invalid).
+def read_json_dict(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            content = f.read().strip()
+            if not content:
+                return {}
+            data = json.loads(content)
+            return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"[STORE] Failed to read {path}: {e}")
+        return {}
+
+
+class KeyValueStore:
+    """Interface of the tracker's persistent maps (string key -> JSON value)."""
+
+    def get(self, key: str, default=None):
+        raise NotImplementedError
+
+    def set(self, key: str, value) -> None:
+        raise NotImplementedError
+
+    def items(self) -> dict:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteStore(KeyValueStore):
+    """
+    One SQLite table per map, in WAL mode: keyed reads and single-row writes,
+    instead of loading and rewriting a whole JSON file per request.
+    The legacy JSON file (if any) is imported the first time the table is created.
+    """
+
+    def __init__(self, db_path: str, table: str, import_json_path: str = None):
+        self.table = table
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+
+        with self._db:
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+        empty = self._db.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None
+        if empty and import_json_path:
+            legacy = read_json_dict(import_json_path)
+            if legacy:
+                with self._db:
+                    self._db.executemany(
+                        f"INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)",
+                        [(str(k), json.dumps(v)) for k, v in legacy.items()],
+                    )
+                print(f"[STORE] Imported {len(legacy)} entries from {import_json_path}")
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (str(key),)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                (str(key), json.dumps(value)),
+            )
+
+    def items(self) -> dict:
+        with self._lock:
+            rows = self._db.execute(f"SELECT key, value FROM {self.table}").fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class WriteBehindStore(KeyValueStore):
+    """
+    In-memory map backed by a JSON file.
+    Reads and writes only touch memory; a background thread flushes the whole map
+    atomically at most once per `flush_interval` seconds when something changed.
+    """
+
+    def __init__(self, json_path: str, flush_interval: float = 1.0):
+        self.json_path = json_path
+        self.flush_interval = flush_interval
+        self._data = read_json_dict(json_path)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            return self._data.get(str(key), default)
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._data[str(key)] = value
+            self._dirty = True
+
+    def items(self) -> dict:
+        with self._lock:
+            return dict(self._data)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._data)
+            self._dirty = False
+        try:
+            atomic_write_json(self.json_path, snapshot)
+        except Exception as e:
+            print(f"[STORE] Failed to flush {self.json_path}: {e}")
+            with self._lock:
+                self._dirty = True
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._closed.set()
+        self.flush()
+
+
+# Build the store for one tracker map ("sqlite" or "memory").
+def open_store(backend: str, name: str, base_dir: str) -> KeyValueStore:
+    json_path = os.path.join(base_dir, f"{name}.json")
+    if backend == "sqlite":
+        return SQLiteStore(os.path.join(base_dir, "tracker_state.sqlite3"), name, json_path)
+    if backend == "memory":
+        store = WriteBehindStore(json_path)
+        atexit.register(store.close)
+        return store
+    raise ValueError(f"Unknown store backend: {backend}")
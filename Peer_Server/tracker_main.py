@@ -1,8 +1,9 @@
 from flask import Flask
 from flask_socketio import SocketIO
-from auth_utils import fetch_ca_public_key
+from auth_utils import fetch_ca_public_key, start_ca_key_refresher
 from routes import register_http_routes
 from socket_events import register_socket_events
+from state import start_peer_sweeper
 
 def create_app():
     app = Flask(__name__)
@@ -19,5 +20,7 @@ def create_app():
 if __name__ == "__main__":
     print("[TRACKER] Starting SocketIO server on port 5555...")
     fetch_ca_public_key()
+    start_ca_key_refresher()
+    start_peer_sweeper()
     app, socketio = create_app()
     socketio.run(app, host="0.0.0.0", port=5555, debug=True)
@@ -0,0 +1,314 @@
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock
+
+import requests
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding, rsa
+from cryptography.x509 import load_pem_x509_certificate
+
+
+TSA_SERVER_BASE = "http://127.0.0.1:7100"
+TSA_CERT_ENDPOINT = "/tsa_cert"
+TSA_REQUEST_TIMEOUT = 3
+
+# Accepted age of a TSA token when its bid reaches the tracker
+TSA_TOKEN_MAX_AGE_SECONDS = 600
+TSA_CLOCK_SKEW_SECONDS = 30
+# Width of one replay-index time bucket
+REPLAY_BUCKET_SECONDS = 60
+# Don't ask the TSA again for an unknown certificate fingerprint before this
+UNKNOWN_FP_RETRY_SECONDS = 60
+# Verified Merkle batch signatures (one entry per TSA batch)
+ROOT_CACHE_MAX_ENTRIES = 1024
+
+PSS_PADDING = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+
+
+class TSAReplayIndex:
+    """
+    Seen TSA tokens, bucketed by the token's (signed) timestamp.
+
+    A replayed token carries the same timestamp, so it always lands in the same
+    bucket: lookup and insert are O(1). Tokens older than the accepted age are
+    rejected before reaching the index, so whole buckets can be dropped once
+    they fall out of that window, which bounds memory to the recent bid rate.
+    """
+
+    def __init__(self, bucket_seconds: int = REPLAY_BUCKET_SECONDS,
+                 max_age_seconds: int = TSA_TOKEN_MAX_AGE_SECONDS + TSA_CLOCK_SKEW_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.max_age_seconds = max_age_seconds
+        self._buckets = {}
+        self._oldest_kept = 0
+        self._lock = Lock()
+        self.replays = 0
+
+    @staticmethod
+    def token_key(token: dict) -> bytes:
+        return hashlib.blake2b(
+            f"{token['serial']}\0{token['nonce']}".encode("utf-8"),
+            digest_size=12,
+        ).digest()
+
+    def _prune(self, now: float) -> None:
+        oldest = int((now - self.max_age_seconds) // self.bucket_seconds)
+        if oldest <= self._oldest_kept:
+            return
+        for bucket in [b for b in self._buckets if b < oldest]:
+            del self._buckets[bucket]
+        self._oldest_kept = oldest
+
+    def seen(self, key: bytes, token_time: float) -> bool:
+        """Read-only lookup (counts a replay when found)."""
+        with self._lock:
+            entries = self._buckets.get(int(token_time // self.bucket_seconds))
+            if entries is not None and key in entries:
+                self.replays += 1
+                return True
+            return False
+
+    def check_and_add(self, key: bytes, token_time: float) -> bool:
+        """Returns False if the token was already seen, otherwise records it."""
+        bucket = int(token_time // self.bucket_seconds)
+        with self._lock:
+            self._prune(time.time())
+            entries = self._buckets.setdefault(bucket, set())
+            if key in entries:
+                self.replays += 1
+                return False
+            entries.add(key)
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "replays": self.replays,
+                "buckets": len(self._buckets),
+                "size": sum(len(entries) for entries in self._buckets.values()),
+            }
+
+
+REPLAY_INDEX = TSAReplayIndex()
+
+# TSA public keys by certificate fingerprint (sha256 of the DER cert, hex)
+TSA_KEYS = {}
+_UNKNOWN_FPS = {}
+# Digests of Merkle batch signatures that already verified
+VERIFIED_ROOTS = OrderedDict()
+TSA_STATS = {"verified": 0, "rejected": 0, "root_cache_hits": 0}
+_TSA_LOCK = Lock()
+
+
+# Fingerprint of a PEM certificate, as used in tsa_cert_fp.
+def _cert_fingerprint(cert_pem: str) -> str:
+    cert = load_pem_x509_certificate(cert_pem.encode("utf-8"))
+    return hashlib.sha256(cert.public_bytes(serialization.Encoding.DER)).hexdigest()
+
+
+# Fetch a certificate from the TSA by fingerprint.
+def _fetch_tsa_certificate(fp: str):
+    try:
+        resp = requests.get(
+            TSA_SERVER_BASE + TSA_CERT_ENDPOINT,
+            params={"fp": fp},
+            timeout=TSA_REQUEST_TIMEOUT,
+        )
+        if resp.status_code != 200:
+            print(f"[TSA] Unknown TSA certificate {fp[:16]}...: {resp.status_code}")
+            return None
+        return resp.text
+    except Exception as e:
+        print(f"[TSA] Error contacting TSA server: {e}")
+        return None
+
+
+# Return the TSA public key the token was signed with (only keys the TSA itself serves).
+def _get_tsa_public_key(token: dict):
+    fp = token.get("tsa_cert_fp")
+    if fp is None and token.get("tsa_cert_pem"):
+        # Older tokens embed the PEM: trust it only if the TSA knows that certificate
+        try:
+            fp = _cert_fingerprint(token["tsa_cert_pem"])
+        except Exception as e:
+            print(f"[TSA] Invalid embedded TSA certificate: {e}")
+            return None
+    if not fp:
+        print("[TSA] Token has no TSA certificate reference")
+        return None
+
+    key = TSA_KEYS.get(fp)
+    if key is not None:
+        return key
+
+    if time.monotonic() - _UNKNOWN_FPS.get(fp, float("-inf")) < UNKNOWN_FP_RETRY_SECONDS:
+        return None
+
+    cert_pem = _fetch_tsa_certificate(fp)
+    try:
+        if cert_pem is None or _cert_fingerprint(cert_pem) != fp:
+            raise ValueError("certificate does not match fingerprint")
+        key = load_pem_x509_certificate(cert_pem.encode("utf-8")).public_key()
+    except Exception as e:
+        print(f"[TSA] Rejecting TSA certificate {fp[:16]}...: {e}")
+        with _TSA_LOCK:
+            _UNKNOWN_FPS[fp] = time.monotonic()
+        return None
+
+    with _TSA_LOCK:
+        TSA_KEYS[fp] = key
+        _UNKNOWN_FPS.pop(fp, None)
+    return key
+
+
+# Seed the key cache (e.g. at startup or in benchmarks) without a network call.
+def register_tsa_certificate(cert_pem: str) -> str:
+    fp = _cert_fingerprint(cert_pem)
+    with _TSA_LOCK:
+        TSA_KEYS[fp] = load_pem_x509_certificate(cert_pem.encode("utf-8")).public_key()
+    return fp
+
+
+# Recompute the batch Merkle root from the token's leaf data and inclusion proof.
+def _merkle_root(token: dict, digest_bytes: bytes) -> bytes:
+    node = hashlib.sha256(
+        b"\x00" + digest_bytes + token["nonce"].encode("utf-8") + token["serial"].encode("utf-8")
+    ).digest()
+
+    for step in token["merkle_path"]:
+        sibling = base64.b64decode(step["hash_b64"])
+        if step["side"] == "left":
+            node = hashlib.sha256(b"\x01" + sibling + node).digest()
+        elif step["side"] == "right":
+            node = hashlib.sha256(b"\x01" + node + sibling).digest()
+        else:
+            raise ValueError(f"Invalid Merkle path side: {step['side']}")
+    return node
+
+
+# Bytes covered by the TSA signature (single token or Merkle batch root).
+def _signed_bytes(token: dict, digest_bytes: bytes) -> bytes:
+    timestamp = token["timestamp"].encode("utf-8")
+    if token.get("mode") == "merkle":
+        root = _merkle_root(token, digest_bytes)
+        if root != base64.b64decode(token["merkle_root_b64"]):
+            raise ValueError("Merkle proof does not lead to the signed root")
+        return b"merkle" + root + timestamp + token["batch_id"].encode("utf-8")
+
+    return digest_bytes + timestamp + token["nonce"].encode("utf-8") + token["serial"].encode("utf-8")
+
+
+# Check the TSA signature with the scheme named by sig_alg.
+def _verify_tsa_signature(public_key, token: dict, signed: bytes) -> None:
+    signature = base64.b64decode(token["signature_b64"])
+    sig_alg = token.get("sig_alg", "rsa-pss-sha256")
+
+    if sig_alg == "ed25519" and isinstance(public_key, ed25519.Ed25519PublicKey):
+        public_key.verify(signature, signed)
+    elif sig_alg == "rsa-pss-sha256" and isinstance(public_key, rsa.RSAPublicKey):
+        public_key.verify(signature, signed, PSS_PADDING, hashes.SHA256())
+    else:
+        raise ValueError(f"sig_alg {sig_alg} does not match the TSA key type")
+
+
+# Verify a Merkle root signature once per batch; later tokens of the batch only hash.
+def _verify_with_root_cache(public_key, token: dict, signed: bytes) -> None:
+    if token.get("mode") != "merkle":
+        _verify_tsa_signature(public_key, token, signed)
+        return
+
+    cache_key = hashlib.sha256(
+        signed + token["signature_b64"].encode("utf-8") + str(token.get("tsa_cert_fp")).encode("utf-8")
+    ).digest()
+    with _TSA_LOCK:
+        if cache_key in VERIFIED_ROOTS:
+            VERIFIED_ROOTS.move_to_end(cache_key)
+            TSA_STATS["root_cache_hits"] += 1
+            return
+
+    _verify_tsa_signature(public_key, token, signed)
+
+    with _TSA_LOCK:
+        VERIFIED_ROOTS[cache_key] = True
+        while len(VERIFIED_ROOTS) > ROOT_CACHE_MAX_ENTRIES:
+            VERIFIED_ROOTS.popitem(last=False)
+
+
+# Digest the bidder sent to the TSA (see auction_room: msg_obj_for_tsa).
+def _expected_bid_digest(msg_data: dict) -> bytes:
+    msg_obj = {
+        "auction_id": msg_data.get("auction_id"),
+        "amount": msg_data.get("amount"),
+        "pseudonym_id": msg_data.get("pseudonym_id"),
+    }
+    return hashlib.sha256(json.dumps(msg_obj, sort_keys=True).encode("utf-8")).digest()
+
+
+def _reject(reason: str) -> bool:
+    print(f"[TSA] {reason}")
+    with _TSA_LOCK:
+        TSA_STATS["rejected"] += 1
+    return False
+
+
+# High-level validation for the tsa_token attached to NEW_BID.
+def validate_bid_timestamp(msg_data: dict) -> bool:
+    token = msg_data.get("tsa_token")
+    if not isinstance(token, dict):
+        return _reject("NEW_BID without tsa_token")
+
+    try:
+        digest_bytes = base64.b64decode(token["digest_b64"])
+        if token.get("digest_algo", "sha256").lower() != "sha256":
+            return _reject("Unsupported TSA digest algorithm")
+        if digest_bytes != _expected_bid_digest(msg_data):
+            return _reject("TSA token does not match this bid")
+
+        stamped_at = datetime.fromisoformat(token["timestamp"].replace("Z", "+00:00"))
+        if stamped_at.tzinfo is None:
+            stamped_at = stamped_at.replace(tzinfo=timezone.utc)
+        token_time = stamped_at.timestamp()
+    except Exception as e:
+        return _reject(f"Malformed TSA token: {e}")
+
+    age = time.time() - token_time
+    if age > TSA_TOKEN_MAX_AGE_SECONDS or age < -TSA_CLOCK_SKEW_SECONDS:
+        return _reject(f"TSA token outside the accepted time window ({age:.0f}s old)")
+
+    try:
+        replay_key = TSAReplayIndex.token_key(token)
+    except Exception as e:
+        return _reject(f"Malformed TSA token: {e}")
+
+    # Cheap early exit for replays, before any signature work
+    if REPLAY_INDEX.seen(replay_key, token_time):
+        return _reject(f"Replayed TSA token (serial {token['serial']})")
+
+    public_key = _get_tsa_public_key(token)
+    if public_key is None:
+        return _reject("TSA certificate unavailable or unknown")
+
+    try:
+        _verify_with_root_cache(public_key, token, _signed_bytes(token, digest_bytes))
+    except Exception as e:
+        return _reject(f"TSA token signature invalid: {e}")
+
+    # Last step, so a bid rejected for another reason does not burn its serial
+    if not REPLAY_INDEX.check_and_add(replay_key, token_time):
+        return _reject(f"Replayed TSA token (serial {token['serial']})")
+
+    with _TSA_LOCK:
+        TSA_STATS["verified"] += 1
+    return True
+
+
+# Counters for TSA token validation and the replay index.
+def get_tsa_validation_stats() -> dict:
+    with _TSA_LOCK:
+        stats = {**TSA_STATS, "known_tsa_keys": len(TSA_KEYS), "verified_roots": len(VERIFIED_ROOTS)}
+    stats["replay_index"] = REPLAY_INDEX.stats()
+    return stats
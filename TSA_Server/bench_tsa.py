@@ -0,0 +1,103 @@
+"""
+Benchmark: TSA stamps/sec with one signature per digest vs Merkle-batched signing,
+for each supported signature algorithm (Ed25519 and RSA-2048 PSS).
+
+Runs in-process against the TSA key in storage/ (created on first import),
+so no server needs to be running.
+
+Usage (from the repository root):
+    python TSA_Server/bench_tsa.py --stamps 2000 --batch-sizes 16 64 256 --threads 64
+"""
+import argparse
+import base64
+import hashlib
+import os
+import sys
+import threading
+import time
+
+TSA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TSA_DIR)
+sys.path.insert(0, os.path.dirname(TSA_DIR))
+
+import tsa_server
+from Login_Client.timestamp import get_tsa_public_key, verify_tsa_token
+
+
+def make_digests(n: int) -> list:
+    digests = []
+    for i in range(n):
+        digest = hashlib.sha256(f"bid-{i}".encode()).digest()
+        digests.append((digest, base64.b64encode(digest).decode()))
+    return digests
+
+
+def report(label: str, n: int, elapsed: float) -> None:
+    print(f"{label:<34} {n / elapsed:>10.1f} stamps/s  ({elapsed:.3f} s)")
+
+
+def bench_single(digests: list, alg: str) -> None:
+    t0 = time.perf_counter()
+    for digest_bytes, digest_b64 in digests:
+        tsa_server.issue_token(digest_bytes, digest_b64, alg)
+    report(f"[{alg}] single (/timestamp)", len(digests), time.perf_counter() - t0)
+
+
+def bench_batched(digests: list, batch_size: int, alg: str) -> None:
+    t0 = time.perf_counter()
+    for i in range(0, len(digests), batch_size):
+        tsa_server.issue_batch_tokens(digests[i:i + batch_size], alg)
+    report(f"[{alg}] batched, {batch_size} per root", len(digests), time.perf_counter() - t0)
+
+
+def bench_concurrent(digests: list, threads: int, alg: str) -> None:
+    """Concurrent callers going through the same batcher the /timestamp_batch route uses."""
+    batcher = tsa_server.MerkleBatcher(alg)
+    chunks = [digests[i::threads] for i in range(threads)]
+
+    def worker(chunk):
+        for digest_bytes, digest_b64 in chunk:
+            batcher.submit(digest_bytes, digest_b64)
+
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    t0 = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    report(f"[{alg}] MerkleBatcher, {threads} callers", len(digests), elapsed)
+    print(f"{'':<34} {batcher.batches} signatures, avg {batcher.stamps / max(batcher.batches, 1):.1f} stamps/root")
+
+
+def check_proofs(alg: str) -> None:
+    # Seed the client's certificate cache so verification does not call /tsa_cert
+    get_tsa_public_key(tsa_server.TSA_CERT_FPS[alg], tsa_server.TSA_CERTS[alg])
+    data = [f"proof-check-{i}".encode() for i in range(5)]
+    items = [(hashlib.sha256(d).digest(), base64.b64encode(hashlib.sha256(d).digest()).decode()) for d in data]
+    tokens = tsa_server.issue_batch_tokens(items, alg)
+    assert all(verify_tsa_token(t, d) for t, d in zip(tokens, data))
+    assert not verify_tsa_token(tokens[0], data[1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stamps", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--algs", nargs="+", default=list(tsa_server.ALGORITHMS))
+    args = parser.parse_args()
+
+    digests = make_digests(args.stamps)
+
+    for alg in args.algs:
+        check_proofs(alg)
+        bench_single(digests, alg)
+        for size in args.batch_sizes:
+            bench_batched(digests, size, alg)
+        bench_concurrent(digests, args.threads, alg)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import datetime as dt
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process only
+    fcntl = None
+
+# last issued timestamp (µs since epoch) + last issued serial, shared by all workers
+_STATE = struct.Struct(">QQ")
+_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+
+class MonotonicStampClock:
+    """
+    Hands out (timestamp, serial) pairs that are strictly increasing across
+    every TSA worker process, so (timestamp, serial) totally orders tokens.
+
+    The last issued values live in a small state file guarded by flock();
+    each process opens its own descriptor (flock locks are per open file, so
+    a descriptor inherited through fork() would not exclude siblings).
+    If the wall clock steps back, timestamps keep advancing by 1 µs.
+    """
+
+    def __init__(self, state_path: str):
+        self.state_path = state_path
+        self._fd = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _descriptor(self) -> int:
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o600)
+            self._pid = os.getpid()
+        return self._fd
+
+    def next_stamps(self, count: int = 1) -> tuple:
+        """Reserves `count` serials sharing one timestamp. Returns (timestamp_iso, [serial, ...])."""
+        with self._lock:
+            fd = self._descriptor()
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                os.lseek(fd, 0, os.SEEK_SET)
+                raw = os.read(fd, _STATE.size)
+                last_us, last_serial = _STATE.unpack(raw) if len(raw) == _STATE.size else (0, 0)
+
+                now_us = time.time_ns() // 1000
+                stamp_us = max(now_us, last_us + 1)
+                first_serial = last_serial + 1
+                last_serial += count
+
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, _STATE.pack(stamp_us, last_serial))
+            finally:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+        timestamp_iso = (_EPOCH + dt.timedelta(microseconds=stamp_us)).isoformat(timespec="microseconds")
+        serials = [f"{s:032x}" for s in range(first_serial, last_serial + 1)]
+        return timestamp_iso, serials
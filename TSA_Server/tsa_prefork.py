@@ -0,0 +1,107 @@
+"""
+Production entry point for the TSA: a pre-fork pool of WSGI workers.
+
+The master binds the listening socket and forks N workers that all accept on
+it. Each worker loads the TSA private keys once (lazily, after the fork) and
+serves requests with its own thread pool, so signing throughput scales with
+cores. Timestamps and serials stay strictly ordered across workers through
+the shared MonotonicStampClock state file.
+
+Usage (from TSA_Server/, Unix only):
+    python tsa_prefork.py --workers 4 --port 7100
+
+The app also runs unchanged under gunicorn, e.g.
+    gunicorn -w 4 -b 127.0.0.1:7100 tsa_server:app
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+from werkzeug.serving import make_server
+
+import tsa_server
+
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+def run_worker(listen_sock: socket.socket, host: str, port: int, index: int) -> None:
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    tsa_server.load_signing_keys()
+    server = make_server(host, port, tsa_server.app, threaded=True, fd=listen_sock.fileno())
+    print(f"[TSA] Worker {index} ready (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    finally:
+        os._exit(0)
+
+
+def spawn(listen_sock, host, port, index) -> int:
+    pid = os.fork()
+    if pid == 0:
+        run_worker(listen_sock, host, port, index)
+    return pid
+
+
+def serve(host: str, port: int, workers: int) -> None:
+    listen_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listen_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listen_sock.bind((host, port))
+    listen_sock.listen(1024)
+    listen_sock.set_inheritable(True)
+
+    children = {spawn(listen_sock, host, port, i): i for i in range(workers)}
+    print(f"[TSA] Listening on {host}:{port} with {workers} workers")
+
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+
+        print(f"[TSA] Worker {index} (pid {pid}) exited with status {status}, restarting")
+        time.sleep(RESPAWN_DELAY_SECONDS)
+        children[spawn(listen_sock, host, port, index)] = index
+
+    listen_sock.close()
+
+
+def main():
+    if not hasattr(os, "fork"):
+        sys.exit("Pre-fork mode needs a Unix platform; use `python tsa_server.py` instead.")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
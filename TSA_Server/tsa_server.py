@@ -2,110 +2,373 @@ import os
 import base64
 import uuid
 import datetime as dt
+import hashlib
+import threading
 from flask import Flask, request, jsonify
 from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa, padding
 from cryptography import x509
 from cryptography.x509.oid import NameOID
 
+from tsa_clock import MonotonicStampClock
+
 BASE = os.path.dirname(os.path.abspath(__file__))
 STORAGE = os.path.join(BASE, "storage")
 os.makedirs(STORAGE, exist_ok=True)
 
 TSA_KEY_PATH = os.path.join(STORAGE, "tsa_private_key.pem")
 TSA_CERT_PATH = os.path.join(STORAGE, "tsa_cert.pem")
+TSA_ED25519_KEY_PATH = os.path.join(STORAGE, "tsa_ed25519_private_key.pem")
+TSA_ED25519_CERT_PATH = os.path.join(STORAGE, "tsa_ed25519_cert.pem")
+TSA_CLOCK_PATH = os.path.join(STORAGE, "tsa_clock.state")
+
+# Signature algorithms this TSA can stamp with, in server preference order
+ALG_ED25519 = "ed25519"
+ALG_RSA_PSS = "rsa-pss-sha256"
+ALGORITHMS = (ALG_ED25519, ALG_RSA_PSS)
+# Used when a client does not ask for an algorithm (older clients only verify RSA-PSS)
+DEFAULT_ALGORITHM = ALG_RSA_PSS
+
+KEY_PATHS = {
+    ALG_RSA_PSS: (TSA_KEY_PATH, TSA_CERT_PATH),
+    ALG_ED25519: (TSA_ED25519_KEY_PATH, TSA_ED25519_CERT_PATH),
+}
+
+def _generate_key(alg: str):
+    if alg == ALG_ED25519:
+        return ed25519.Ed25519PrivateKey.generate()
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
 
 def bootstrap_tsa():
-    if os.path.exists(TSA_KEY_PATH) and os.path.exists(TSA_CERT_PATH):
-        return
-
-    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
-    with open(TSA_KEY_PATH, "wb") as f:
-        f.write(key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
-        ))
-
-    subject = issuer = x509.Name([
-        x509.NameAttribute(NameOID.COUNTRY_NAME, u"PT"),
-        x509.NameAttribute(NameOID.ORGANIZATION_NAME, u"MyAuctionTSA"),
-        x509.NameAttribute(NameOID.COMMON_NAME, u"myauction.tsa"),
-    ])
-    now = dt.datetime.utcnow()
-    cert = (
-        x509.CertificateBuilder()
-        .subject_name(subject)
-        .issuer_name(issuer)
-        .public_key(key.public_key())
-        .serial_number(x509.random_serial_number())
-        .not_valid_before(now - dt.timedelta(days=1))
-        .not_valid_after(now + dt.timedelta(days=3650))
-        .add_extension(x509.BasicConstraints(ca=False, path_length=None), critical=True)
-        .sign(key, hashes.SHA256())
-    )
-    with open(TSA_CERT_PATH, "wb") as f:
-        f.write(cert.public_bytes(serialization.Encoding.PEM))
-    print("TSA bootstrapped (key+cert created in storage/)")
+    for alg, (key_path, cert_path) in KEY_PATHS.items():
+        if os.path.exists(key_path) and os.path.exists(cert_path):
+            continue
+
+        key = _generate_key(alg)
+        with open(key_path, "wb") as f:
+            f.write(key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()
+            ))
+
+        subject = issuer = x509.Name([
+            x509.NameAttribute(NameOID.COUNTRY_NAME, u"PT"),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, u"MyAuctionTSA"),
+            x509.NameAttribute(NameOID.COMMON_NAME, u"myauction.tsa"),
+        ])
+        now = dt.datetime.utcnow()
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(subject)
+            .issuer_name(issuer)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - dt.timedelta(days=1))
+            .not_valid_after(now + dt.timedelta(days=3650))
+            .add_extension(x509.BasicConstraints(ca=False, path_length=None), critical=True)
+            # Ed25519 certificates are signed without a separate hash algorithm
+            .sign(key, None if alg == ALG_ED25519 else hashes.SHA256())
+        )
+        with open(cert_path, "wb") as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        print(f"TSA bootstrapped ({alg} key+cert created in storage/)")
 
 bootstrap_tsa()
 
-with open(TSA_KEY_PATH, "rb") as f:
-    tsa_key = serialization.load_pem_private_key(f.read(), password=None)
-with open(TSA_CERT_PATH, "rb") as f:
-    tsa_cert_pem = f.read().decode()
+def cert_fingerprint(cert_pem: str) -> str:
+    """sha256 of the DER certificate, hex; tokens reference the TSA cert by this value."""
+    cert = x509.load_pem_x509_certificate(cert_pem.encode("utf-8"))
+    return hashlib.sha256(cert.public_bytes(serialization.Encoding.DER)).hexdigest()
+
+TSA_CERTS = {}
+TSA_CERT_FPS = {}
+for _alg, (_, _cert_path) in KEY_PATHS.items():
+    with open(_cert_path, "rb") as f:
+        TSA_CERTS[_alg] = f.read().decode()
+    TSA_CERT_FPS[_alg] = cert_fingerprint(TSA_CERTS[_alg])
+CERTS_BY_FP = {TSA_CERT_FPS[alg]: TSA_CERTS[alg] for alg in TSA_CERTS}
+
+# Loaded once per process on first use (each pre-fork worker loads its own copy)
+TSA_KEYS = {}
+_KEY_LOCK = threading.Lock()
+
+# Strictly increasing (timestamp, serial) across all worker processes
+CLOCK = MonotonicStampClock(TSA_CLOCK_PATH)
+
+def load_signing_key(alg: str = DEFAULT_ALGORITHM):
+    key = TSA_KEYS.get(alg)
+    if key is None:
+        with _KEY_LOCK:
+            key = TSA_KEYS.get(alg)
+            if key is None:
+                with open(KEY_PATHS[alg][0], "rb") as f:
+                    key = serialization.load_pem_private_key(f.read(), password=None)
+                TSA_KEYS[alg] = key
+                print(f"[TSA] {alg} signing key loaded (pid {os.getpid()})")
+    return key
+
+def load_signing_keys() -> None:
+    for alg in ALGORITHMS:
+        load_signing_key(alg)
+
+def choose_algorithm(requested) -> str:
+    """Picks the first algorithm of the client's preference list that we support."""
+    if not requested:
+        return DEFAULT_ALGORITHM
+    if isinstance(requested, str):
+        requested = [requested]
+    for alg in requested:
+        if alg in ALGORITHMS:
+            return alg
+    return None
 
 app = Flask(__name__)
 
+# Max time a /timestamp_batch request waits for other digests to join its batch
+BATCH_WINDOW_SECONDS = 0.01
+# A batch is sealed early once it holds this many digests
+BATCH_MAX_SIZE = 256
+
+PSS_PADDING = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+
 def _make_token_bytes(digest_bytes: bytes, timestamp_iso: str, nonce: str, serial: str) -> bytes:
     # canonical deterministic encoding: digest || timestamp || nonce || serial
     return digest_bytes + timestamp_iso.encode("utf-8") + nonce.encode("utf-8") + serial.encode("utf-8")
 
-@app.route("/tsa_cert", methods=["GET"])
-def get_tsa_cert():
-    return tsa_cert_pem, 200, {"Content-Type": "application/x-pem-file"}
+def _make_batch_bytes(root: bytes, timestamp_iso: str, batch_id: str) -> bytes:
+    # signed once per batch: "merkle" || root || timestamp || batch_id
+    return b"merkle" + root + timestamp_iso.encode("utf-8") + batch_id.encode("utf-8")
 
-@app.route("/timestamp", methods=["POST"])
-def timestamp():
+def _sign(data: bytes, alg: str) -> str:
+    key = load_signing_key(alg)
+    if alg == ALG_ED25519:
+        signature = key.sign(data)
+    else:
+        signature = key.sign(data, PSS_PADDING, hashes.SHA256())
+    return base64.b64encode(signature).decode()
 
-    data = request.get_json()
-    if not data or "digest_b64" not in data or "digest_algo" not in data:
-        return jsonify({"error": "Provide digest_b64 and digest_algo"}), 400
+# ---------- Merkle tree ----------
 
-    if data["digest_algo"].lower() != "sha256":
-        return jsonify({"error": "Only sha256 supported"}), 400
+def merkle_leaf(digest_bytes: bytes, nonce: str, serial: str) -> bytes:
+    # 0x00 / 0x01 prefixes keep leaves and inner nodes from being confused
+    return hashlib.sha256(b"\x00" + digest_bytes + nonce.encode("utf-8") + serial.encode("utf-8")).digest()
 
-    try:
-        digest_bytes = base64.b64decode(data["digest_b64"])
-    except Exception:
-        return jsonify({"error": "Invalid base64 digest_b64"}), 400
+def merkle_node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
 
-    now = dt.datetime.utcnow().replace(tzinfo=dt.timezone.utc)
-    timestamp_iso = now.isoformat(timespec="microseconds")
+def build_merkle_tree(leaves: list) -> tuple:
+    """
+    Returns (root, paths) where paths[i] is the inclusion proof of leaves[i]:
+    a list of (side, sibling_hash) from the leaf up to the root.
+    An odd node at the end of a level is promoted unchanged (no duplication).
+    """
+    paths = [[] for _ in leaves]
+    positions = list(range(len(leaves)))
+    level = list(leaves)
+
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level), 2):
+            if i + 1 < len(level):
+                next_level.append(merkle_node(level[i], level[i + 1]))
+            else:
+                next_level.append(level[i])
+
+        for leaf, pos in enumerate(positions):
+            sibling = pos ^ 1
+            if sibling < len(level):
+                side = "left" if sibling < pos else "right"
+                paths[leaf].append((side, level[sibling]))
+            positions[leaf] = pos // 2
+
+        level = next_level
+
+    return level[0], paths
+
+# ---------- Token issuing ----------
+
+def issue_token(digest_bytes: bytes, digest_b64: str, alg: str = DEFAULT_ALGORITHM) -> dict:
+    """One signature per digest (the /timestamp endpoint)."""
+    timestamp_iso, (serial,) = CLOCK.next_stamps()
     nonce = uuid.uuid4().hex
-    serial = uuid.uuid4().hex
 
     token_bytes = _make_token_bytes(digest_bytes, timestamp_iso, nonce, serial)
 
-    signature = tsa_key.sign(
-        token_bytes,
-        padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
-        hashes.SHA256()
-    )
-    signature_b64 = base64.b64encode(signature).decode()
-
-    resp = {
+    return {
         "digest_algo": "sha256",
-        "digest_b64": data["digest_b64"],
+        "digest_b64": digest_b64,
         "timestamp": timestamp_iso,
         "nonce": nonce,
         "serial": serial,
-        "signature_b64": signature_b64,
-        "tsa_cert_pem": tsa_cert_pem
+        "sig_alg": alg,
+        "signature_b64": _sign(token_bytes, alg),
+        "tsa_cert_fp": TSA_CERT_FPS[alg]
     }
 
-    return jsonify(resp), 200
+def issue_batch_tokens(items: list, alg: str = DEFAULT_ALGORITHM) -> list:
+    """
+    One signature for a whole batch of (digest_bytes, digest_b64):
+    the Merkle root is signed and every token carries its inclusion proof.
+    """
+    timestamp_iso, serials = CLOCK.next_stamps(len(items))
+    batch_id = uuid.uuid4().hex
 
-if __name__ == "__main__":
-    app.run(port=7100, debug=True)
+    # All tokens of a batch share the timestamp; their serials keep them ordered
+    stamps = [(uuid.uuid4().hex, serial) for serial in serials]
+    leaves = [
+        merkle_leaf(digest_bytes, nonce, serial)
+        for (digest_bytes, _), (nonce, serial) in zip(items, stamps)
+    ]
+    root, paths = build_merkle_tree(leaves)
+    signature_b64 = _sign(_make_batch_bytes(root, timestamp_iso, batch_id), alg)
+    root_b64 = base64.b64encode(root).decode()
 
+    tokens = []
+    for index, ((_, digest_b64), (nonce, serial)) in enumerate(zip(items, stamps)):
+        tokens.append({
+            "digest_algo": "sha256",
+            "digest_b64": digest_b64,
+            "timestamp": timestamp_iso,
+            "nonce": nonce,
+            "serial": serial,
+            "mode": "merkle",
+            "batch_id": batch_id,
+            "batch_size": len(items),
+            "leaf_index": index,
+            "merkle_root_b64": root_b64,
+            "merkle_path": [
+                {"side": side, "hash_b64": base64.b64encode(h).decode()}
+                for side, h in paths[index]
+            ],
+            "sig_alg": alg,
+            "signature_b64": signature_b64,
+            "tsa_cert_fp": TSA_CERT_FPS[alg]
+        })
+    return tokens
+
+class _Batch:
+    def __init__(self):
+        self.items = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.tokens = None
+        self.error = None
+
+class MerkleBatcher:
+    """
+    Groups concurrent /timestamp_batch requests into one signature.
+
+    The first request of a batch waits up to `window` seconds (or until the
+    batch is full), then builds the tree and signs it for everybody; the
+    other requests just wait for their token.
+    """
+
+    def __init__(self, alg: str = DEFAULT_ALGORITHM,
+                 window: float = BATCH_WINDOW_SECONDS, max_size: int = BATCH_MAX_SIZE):
+        self.alg = alg
+        self.window = window
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._current = _Batch()
+        self.batches = 0
+        self.stamps = 0
+
+    def submit(self, digest_bytes: bytes, digest_b64: str) -> dict:
+        with self._lock:
+            batch = self._current
+            index = len(batch.items)
+            batch.items.append((digest_bytes, digest_b64))
+            if len(batch.items) >= self.max_size:
+                batch.full.set()
+                self._current = _Batch()
+
+        if index == 0:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._current is batch:
+                    self._current = _Batch()
+                self.batches += 1
+                self.stamps += len(batch.items)
+            try:
+                batch.tokens = issue_batch_tokens(batch.items, self.alg)
+            except Exception as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.tokens[index]
+
+# One batcher per algorithm: a Merkle root is signed with a single key
+BATCHERS = {alg: MerkleBatcher(alg) for alg in ALGORITHMS}
+
+# ---------- HTTP ----------
+
+def _parse_digest_request():
+    """Returns (digest_bytes, digest_b64, sig_alg, None) or (None, None, None, error_response)."""
+    data = request.get_json()
+    if not data or "digest_b64" not in data or "digest_algo" not in data:
+        return None, None, None, (jsonify({"error": "Provide digest_b64 and digest_algo"}), 400)
+
+    if data["digest_algo"].lower() != "sha256":
+        return None, None, None, (jsonify({"error": "Only sha256 supported"}), 400)
+
+    try:
+        digest_bytes = base64.b64decode(data["digest_b64"])
+    except Exception:
+        return None, None, None, (jsonify({"error": "Invalid base64 digest_b64"}), 400)
+
+    # "sig_algs": client preference list, e.g. ["ed25519", "rsa-pss-sha256"]
+    alg = choose_algorithm(data.get("sig_algs"))
+    if alg is None:
+        return None, None, None, (jsonify({
+            "error": "No supported signature algorithm",
+            "algorithms": list(ALGORITHMS),
+        }), 400)
+
+    return digest_bytes, data["digest_b64"], alg, None
+
+@app.route("/tsa_cert", methods=["GET"])
+def get_tsa_cert():
+    advertised = {"X-TSA-Algorithms": ", ".join(ALGORITHMS)}
+
+    if request.args.get("format") == "json":
+        return jsonify({
+            "algorithms": list(ALGORITHMS),
+            "default": DEFAULT_ALGORITHM,
+            "certificates": TSA_CERTS,
+            "fingerprints": TSA_CERT_FPS,
+        }), 200, advertised
+
+    # Clients resolve a token's tsa_cert_fp with ?fp=<fingerprint>
+    fp = request.args.get("fp")
+    if fp:
+        if fp not in CERTS_BY_FP:
+            return jsonify({"error": f"Unknown certificate fingerprint {fp}"}), 404
+        return CERTS_BY_FP[fp], 200, {"Content-Type": "application/x-pem-file", **advertised}
+
+    alg = request.args.get("alg", DEFAULT_ALGORITHM)
+    if alg not in TSA_CERTS:
+        return jsonify({"error": f"Unsupported algorithm {alg}", "algorithms": list(ALGORITHMS)}), 404
+    return TSA_CERTS[alg], 200, {"Content-Type": "application/x-pem-file", **advertised}
+
+@app.route("/timestamp", methods=["POST"])
+def timestamp():
+    digest_bytes, digest_b64, alg, error = _parse_digest_request()
+    if error:
+        return error
+    return jsonify(issue_token(digest_bytes, digest_b64, alg)), 200
+
+@app.route("/timestamp_batch", methods=["POST"])
+def timestamp_batch():
+    digest_bytes, digest_b64, alg, error = _parse_digest_request()
+    if error:
+        return error
+    return jsonify(BATCHERS[alg].submit(digest_bytes, digest_b64)), 200
+
+if __name__ == "__main__":
+    app.run(port=7100, debug=True, threaded=True)